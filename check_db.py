@@ -1,10 +1,17 @@
 import sqlite3
 import os
+import sys
+from pathlib import Path
 
-# Connect to the database
+# Connect to the database read-only so the check never takes write locks
+# and can run alongside the generator
 db_path = os.path.join("generated_answers", "processing_state.db")
-conn = sqlite3.connect(db_path)
+conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
 cursor = conn.cursor()
+cursor.execute("PRAGMA query_only=1")
+# Read pages through a memory map; the journal mode (WAL) is set by the writers
+cursor.execute("PRAGMA temp_store=MEMORY")
+cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
 
 print("=" * 80)
 print("DATABASE STATE")
@@ -25,17 +32,25 @@ for col in schema:
 # Check all entries
 print("\nALL ENTRIES:")
 cursor.execute("SELECT id, file_path, stage, status, processed_file_path, attempts, created_at, updated_at FROM processing_state")
-entries = cursor.fetchall()
-for entry in entries:
-    print(f"ID: {entry[0]}")
-    print(f"  File Path: {entry[1]}")
-    print(f"  Stage: {entry[2]}")
-    print(f"  Status: {entry[3]}")
-    print(f"  Processed File Path: {entry[4]}")
-    print(f"  Attempts: {entry[5]}")
-    print(f"  Created: {entry[6]}")
-    print(f"  Updated: {entry[7]}")
-    print("-" * 40)
+# Iterate the cursor directly so rows are streamed rather than loaded all at once,
+# and write the formatted rows in batches to keep the number of writes small
+out = []
+for entry in cursor:
+    out.append(
+        f"ID: {entry[0]}\n"
+        f"  File Path: {entry[1]}\n"
+        f"  Stage: {entry[2]}\n"
+        f"  Status: {entry[3]}\n"
+        f"  Processed File Path: {entry[4]}\n"
+        f"  Attempts: {entry[5]}\n"
+        f"  Created: {entry[6]}\n"
+        f"  Updated: {entry[7]}\n"
+        f"{'-' * 40}\n"
+    )
+    if len(out) >= 1000:
+        sys.stdout.write("".join(out))
+        out.clear()
+sys.stdout.write("".join(out))
 
 # Count by stage and status
 print("\nCOUNTS BY STAGE AND STATUS:")
@@ -9,11 +9,87 @@ import os
 import shutil
 import sqlite3
 import argparse
-from pathlib import Path
+import functools
+from concurrent.futures import ThreadPoolExecutor
 
 from logger_setup import setup_logging, logger
 from config import load_config
 
+# Stage values written by each phase, as SQL literals. The set is fixed, so the
+# stage-filtered deletes can be spliced into one script instead of bound per call
+_STAGE_LITERALS = {
+    'sub_prompt': "'sub_prompt'",
+    'star_answer': "'star_answer'",
+    'conversation': "'conversation'",
+}
+
+@functools.lru_cache(maxsize=256)
+def _path_exists(path):
+    """
+    Cached os.path.exists for paths checked repeatedly during cleanup.
+    
+    Call _path_exists.cache_clear() after anything that removes a path.
+    
+    Args:
+        path (str): Path to check
+        
+    Returns:
+        bool: True if the path exists
+    """
+    return os.path.exists(path)
+
+def _unlink_files(directory):
+    """
+    Remove the regular files directly inside a directory.
+    
+    scandir reports each entry's type from the directory listing, so no
+    extra stat is needed. Where the platform supports it, files are
+    unlinked relative to an open directory descriptor so each unlink
+    resolves a single name instead of walking the full path again.
+    
+    Args:
+        directory (str): Directory whose files should be removed
+    """
+    if os.scandir in os.supports_fd and os.unlink in os.supports_dir_fd:
+        dir_fd = os.open(directory, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        try:
+            with os.scandir(dir_fd) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        os.unlink(entry.name, dir_fd=dir_fd)
+                        logger.debug(f"Removed file: {os.path.join(directory, entry.name)}")
+        finally:
+            os.close(dir_fd)
+    else:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    os.unlink(entry.path)
+                    logger.debug(f"Removed file: {entry.path}")
+
+def _clean_one_dir(directory, remove_dirs):
+    """
+    Remove the files in a single output directory.
+    
+    Args:
+        directory (str): Directory to clean
+        remove_dirs (bool): Whether to remove the directory itself
+    """
+    if _path_exists(directory):
+        logger.info(f"Cleaning directory: {directory}")
+        try:
+            if remove_dirs:
+                # Removing the directory takes its files with it
+                shutil.rmtree(directory)
+                _path_exists.cache_clear()
+                logger.info(f"Removed directory: {directory}")
+            else:
+                _unlink_files(directory)
+        except Exception as e:
+            logger.error(f"Error cleaning directory {directory}: {e}")
+    else:
+        logger.info(f"Directory does not exist, skipping: {directory}")
+
 def cleanup_generated_files(config, args):
     """
     Clean up generated files based on the configuration.
@@ -22,55 +98,44 @@ def cleanup_generated_files(config, args):
         config (dict): Configuration dictionary
         args (argparse.Namespace): Command-line arguments
     """
-    # Get output directories from config
+    if not (args.all or args.sub_prompts or args.star_answers or args.conversational):
+        logger.info("No cleanup flags set, skipping file cleanup")
+        return
+    
     base_dir = config.get('output', {}).get('base_dir', 'generated_answers')
-    subprompts_dir = os.path.join(base_dir, config.get('subprompts_dir', 'sub_prompts'))
-    star_answers_dir = os.path.join(base_dir, config.get('star_answers_dir', 'star_answers'))
-    conversations_dir = os.path.join(base_dir, config.get('conversations_dir', 'conversations'))
-    prompt_logs_dir = os.path.join(base_dir, config.get('prompt_logs_dir', 'prompt_logs'))
-    test_dir = os.path.join(base_dir, 'test')
+    
+    # Output directory config key and default for each phase flag; only the
+    # directories that were asked for get their paths built
+    flag_to_key = {
+        'sub_prompts': ('subprompts_dir', 'sub_prompts'),
+        'star_answers': ('star_answers_dir', 'star_answers'),
+        'conversational': ('conversations_dir', 'conversations'),
+    }
     
     dirs_to_clean = []
     
     # Determine which directories to clean based on args
-    if args.all or args.sub_prompts:
-        dirs_to_clean.append(subprompts_dir)
-    
-    if args.all or args.star_answers:
-        dirs_to_clean.append(star_answers_dir)
-    
-    if args.all or args.conversational:
-        dirs_to_clean.append(conversations_dir)
+    for flag, (config_key, default) in flag_to_key.items():
+        if args.all or getattr(args, flag):
+            dirs_to_clean.append(os.path.join(base_dir, config.get(config_key, default)))
     
     # Always clean the test directory and prompt logs if --all is specified
     if args.all:
-        dirs_to_clean.append(test_dir)
-        dirs_to_clean.append(prompt_logs_dir)
+        dirs_to_clean.append(os.path.join(base_dir, 'test'))
+        dirs_to_clean.append(os.path.join(base_dir, config.get('prompt_logs_dir', 'prompt_logs')))
     
-    # Clean each directory
-    for directory in dirs_to_clean:
-        if os.path.exists(directory):
-            logger.info(f"Cleaning directory: {directory}")
-            try:
-                # Remove all files in the directory
-                for file_path in Path(directory).glob('*'):
-                    if file_path.is_file():
-                        os.remove(file_path)
-                        logger.debug(f"Removed file: {file_path}")
-                
-                # Optionally remove the directory itself
-                if args.remove_dirs:
-                    shutil.rmtree(directory)
-                    logger.info(f"Removed directory: {directory}")
-            except Exception as e:
-                logger.error(f"Error cleaning directory {directory}: {e}")
-        else:
-            logger.info(f"Directory does not exist, skipping: {directory}")
+    # Directories are independent, so clean them concurrently; unlink
+    # releases the GIL and the threads overlap their filesystem waits
+    with ThreadPoolExecutor(max_workers=min(8, len(dirs_to_clean))) as executor:
+        list(executor.map(lambda directory: _clean_one_dir(directory, args.remove_dirs), dirs_to_clean))
 
 def reset_state_database(config, args):
     """
     Reset the state database.
     
+    All deletes run inside a single transaction so the reset costs one
+    journal flush instead of one per statement.
+    
     Args:
         config (dict): Configuration dictionary
         args (argparse.Namespace): Command-line arguments
@@ -78,50 +143,81 @@ def reset_state_database(config, args):
     if not args.reset_db:
         return
     
+    # Without a phase flag there is nothing to drop or delete
+    if not (args.all or args.sub_prompts or args.star_answers or args.conversational or args.remove_db):
+        logger.info("No reset flags set, skipping database reset")
+        return
+    
     # Get database path
     base_dir = config.get('output', {}).get('base_dir', 'generated_answers')
     db_path = os.path.join(base_dir, 'processing_state.db')
     
-    if os.path.exists(db_path):
+    # Stages selected by the per-phase flags
+    stages = [stage for flag, stage in (
+        (args.sub_prompts, 'sub_prompt'),
+        (args.star_answers, 'star_answer'),
+        (args.conversational, 'conversation'),
+    ) if flag]
+    
+    if _path_exists(db_path):
         logger.info(f"Resetting state database: {db_path}")
         try:
-            # Connect to the database
-            conn = sqlite3.connect(db_path)
+            # Connect in autocommit mode so the transaction is managed explicitly
+            conn = sqlite3.connect(db_path, isolation_level=None)
             cursor = conn.cursor()
             
-            # Get table names
+            # WAL with relaxed syncing avoids an fsync of the main file per commit
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+            
+            # Get table names, keeping only plain identifiers since they are
+            # interpolated into the SQL text
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
+            table_names = [
+                table[0] for table in cursor.fetchall()
+                if not table[0].startswith('sqlite_') and table[0].isidentifier()
+            ]
             
-            # Delete all rows from each table
-            for table in tables:
-                table_name = table[0]
+            try:
                 if args.all:
-                    # Delete all rows
-                    cursor.execute(f"DELETE FROM {table_name};")
-                    logger.debug(f"Deleted all rows from table: {table_name}")
-                else:
-                    # Delete rows based on stage filter
-                    if args.sub_prompts:
-                        cursor.execute(f"DELETE FROM {table_name} WHERE file_type = 'sub_prompt';")
-                        logger.debug(f"Deleted sub_prompt rows from table: {table_name}")
+                    # A full reset drops the tables outright instead of deleting
+                    # row by row; StateManager recreates the schema on next open
+                    cursor.executescript(
+                        "BEGIN IMMEDIATE;\n"
+                        + "".join(f"DROP TABLE IF EXISTS {table_name};\n" for table_name in table_names)
+                        + "COMMIT;"
+                    )
+                    logger.debug(f"Dropped tables: {', '.join(table_names)}")
                     
-                    if args.star_answers:
-                        cursor.execute(f"DELETE FROM {table_name} WHERE file_type = 'star_answer';")
-                        logger.debug(f"Deleted star_answer rows from table: {table_name}")
+                    # Return the freed pages to the filesystem
+                    cursor.execute("VACUUM")
+                elif stages:
+                    # Run every table's delete as one script so SQLite executes
+                    # the batch without returning to Python between statements
+                    stage_list = ', '.join(_STAGE_LITERALS[stage] for stage in stages)
+                    cursor.executescript(
+                        "BEGIN IMMEDIATE;\n"
+                        + "".join(f"DELETE FROM {table_name} WHERE stage IN ({stage_list});\n" for table_name in table_names)
+                        + "COMMIT;"
+                    )
+                    logger.debug(f"Deleted {', '.join(stages)} rows from tables: {', '.join(table_names)}")
                     
-                    if args.conversational:
-                        cursor.execute(f"DELETE FROM {table_name} WHERE file_type = 'conversations';")
-                        logger.debug(f"Deleted conversations rows from table: {table_name}")
-            
-            # Commit changes
-            conn.commit()
-            conn.close()
+                    # Refresh planner statistics once after the batch
+                    cursor.execute("PRAGMA optimize")
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                conn.close()
             logger.info("State database reset successfully")
             
             # Optionally remove the database file
             if args.remove_db:
                 os.remove(db_path)
+                _path_exists.cache_clear()
                 logger.info(f"Removed database file: {db_path}")
                 
         except Exception as e:
@@ -5,9 +5,9 @@ This module handles loading and validating configuration from YAML files and env
 """
 
 import os
-import yaml
-from dotenv import load_dotenv
+import copy
 import logging
+import functools
 
 # Default configuration file path
 DEFAULT_CONFIG_PATH = 'config.yaml'
@@ -16,6 +16,9 @@ def load_config(config_path=None):
     """
     Load configuration from a YAML file and environment variables.
     
+    The parsed result is cached per file path and modification time, so
+    repeated calls within a run only pay for a stat and a copy.
+    
     Args:
         config_path (str, optional): Path to the configuration YAML file.
             Defaults to DEFAULT_CONFIG_PATH.
@@ -25,13 +28,56 @@ def load_config(config_path=None):
     """
     if config_path is None:
         config_path = DEFAULT_CONFIG_PATH
-        
+    
+    abs_path = os.path.abspath(config_path)
+    try:
+        mtime_ns = os.stat(abs_path).st_mtime_ns
+    except OSError:
+        print(f"Error: Configuration file not found at {config_path}")
+        return None
+    
+    # Copy so callers can modify their config without touching the cached one
+    return copy.deepcopy(_cached_load(abs_path, mtime_ns))
+
+@functools.lru_cache(maxsize=4)
+def _cached_load(abs_path, mtime_ns):
+    """
+    Load a configuration file, cached on its path and modification time.
+    
+    Args:
+        abs_path (str): Absolute path to the configuration YAML file
+        mtime_ns (int): Modification time of the file, part of the cache key
+    
+    Returns:
+        dict: The loaded configuration dictionary, or None if loading failed.
+    """
+    return _load_config_uncached(abs_path)
+
+def _load_config_uncached(config_path):
+    """
+    Parse the configuration YAML file and merge in environment variables.
+    
+    Args:
+        config_path (str): Path to the configuration YAML file.
+    
+    Returns:
+        dict: The loaded configuration dictionary, or None if loading failed.
+    """
+    # Imported here so scripts that only import this module skip the cost
+    import yaml
+    from dotenv import load_dotenv
+    try:
+        # libyaml-backed C parser, shipped with the PyYAML wheels on most platforms
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    
     # Load environment variables from .env file
     load_dotenv()
     
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         print(f"Configuration loaded successfully from {config_path}")
         
@@ -39,30 +85,39 @@ def load_config(config_path=None):
         gemini_api_key = os.getenv(config.get('gemini_api_key_env_var', 'GEMINI_API_KEY'))
         anthropic_api_key = os.getenv(config.get('claude_api_key_env_var', 'ANTHROPIC_API_KEY'))
         
-        # Create nested structure if it doesn't exist
-        if 'llm' not in config:
-            config['llm'] = {}
-        if 'gemini' not in config['llm']:
-            config['llm']['gemini'] = {}
-        if 'anthropic' not in config['llm']:
-            config['llm']['anthropic'] = {}
-            
-        # Store API keys in config
-        config['llm']['gemini']['api_key'] = gemini_api_key
-        config['llm']['anthropic']['api_key'] = anthropic_api_key
+        # The Claude variable may hold several comma-separated keys to rotate across
+        anthropic_api_keys = [key.strip() for key in (anthropic_api_key or '').split(',') if key.strip()]
+        anthropic_api_key = anthropic_api_keys[0] if anthropic_api_keys else None
         
-        # Set model names
-        config['llm']['gemini']['model'] = config.get('gemini_model', 'gemini-2.5-pro-exp-03-25')
-        config['llm']['anthropic']['model'] = config.get('claude_model', 'claude-3-7-sonnet-20250219')
-        
-        # Set primary and fallback providers
-        config['llm']['primary_provider'] = 'gemini'
-        config['llm']['fallback_provider'] = 'anthropic' if config.get('use_secondary_fallback', True) else None
-        
-        # Set retry configuration
-        config['llm']['max_retries'] = config.get('max_retries', 3)
-        config['llm']['retry_delay_seconds'] = config.get('retry_initial_backoff_seconds', 2)
-        config['llm']['request_timeout_seconds'] = config.get('request_timeout_seconds', 120)
+        # Build the LLM settings in one pass
+        config['llm'] = {
+            'gemini': {
+                'api_key': gemini_api_key,
+                'model': config.get('gemini_model', 'gemini-2.5-pro-exp-03-25')
+            },
+            'anthropic': {
+                'api_key': anthropic_api_key,
+                'api_keys': anthropic_api_keys,
+                'model': config.get('claude_model', 'claude-3-7-sonnet-20250219')
+            },
+            # Primary and fallback providers
+            'primary_provider': 'gemini',
+            'fallback_provider': 'anthropic' if config.get('use_secondary_fallback', True) else None,
+            # Retry configuration
+            'max_retries': config.get('max_retries', 3),
+            'retry_delay_seconds': config.get('retry_initial_backoff_seconds', 2),
+            'request_timeout_seconds': config.get('request_timeout_seconds', 120),
+            'min_request_timeout_seconds': config.get('min_request_timeout_seconds', 30),
+            'prewarm_connections': config.get('prewarm_connections', True),
+            # Response cache (stored in llm_cache.db in the output directory)
+            'use_response_cache': config.get('use_response_cache', False),
+            'response_cache_ttl_seconds': config.get('response_cache_ttl_seconds', 0),
+            'response_cache_max_entries': config.get('response_cache_max_entries', 0),
+            'response_cache_similarity_threshold': config.get('response_cache_similarity_threshold', 0),
+            # Send STAR answer requests through the Claude Message Batches API
+            'use_batch_api': config.get('use_batch_api', False),
+            'batch_timeout_seconds': config.get('batch_timeout_seconds', 21600)
+        }
         
         # Validate API keys
         if not config['llm']['gemini']['api_key']:
@@ -13,20 +13,181 @@ The module follows the same resilient design principles as the rest of the syste
 """
 
 import os
+import re
 import json
 import time
-from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+import queue
+import atexit
+import hashlib
+import itertools
+import functools
+import collections
+import threading
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
 
+import json_utils
 from logger_setup import logger
 from state_manager import StateManager, STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_COMPLETE, STATUS_FAILED
 from llm_client import LLMClient
 from prompt_processor import load_prompt_template, substitute_parameters
 
-# Print statements alongside logger calls for critical operations
-print("Initializing Conversational Transformer module")
 logger.info("Initializing Conversational Transformer module")
 
+# One speaker turn: a line starting with "Interviewer:" or "Candidate:" and
+# everything up to the next such line or the end of the response
+_SPEAKER_RE = re.compile(
+    r'^[ \t]*(Interviewer|Candidate):(.*?)(?=^[ \t]*(?:Interviewer|Candidate):|\Z)',
+    re.S | re.M
+)
+
+# LLM clients and state managers shared across process_conversations calls,
+# keyed by a hash of the LLM settings and by database path
+_LLM_CLIENTS: Dict[str, LLMClient] = {}
+_STATE_MANAGERS: Dict[str, StateManager] = {}
+
+def _shared_llm_client(config: Dict[str, Any]) -> LLMClient:
+    """
+    Get the shared LLM client for a configuration, creating it on first use.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        LLMClient: Client for the configuration's LLM settings
+    """
+    llm_settings = json.dumps(config.get('llm', {}), sort_keys=True, default=str)
+    key = hashlib.blake2b(llm_settings.encode('utf-8'), digest_size=8).hexdigest()
+    llm_client = _LLM_CLIENTS.get(key)
+    if llm_client is None:
+        llm_client = _LLM_CLIENTS[key] = LLMClient(config)
+    return llm_client
+
+def _shared_state_manager(db_path: str) -> StateManager:
+    """
+    Get the shared state manager for a database, opening it on first use.
+    
+    Args:
+        db_path (str): Path to the state database
+        
+    Returns:
+        StateManager: State manager for the database
+    """
+    state_manager = _STATE_MANAGERS.get(db_path)
+    if state_manager is None:
+        state_manager = _STATE_MANAGERS[db_path] = StateManager(db_path)
+    return state_manager
+
+@atexit.register
+def _close_shared_clients():
+    """Close the shared LLM clients and state managers at interpreter exit."""
+    for llm_client in _LLM_CLIENTS.values():
+        llm_client.close()
+    for state_manager in _STATE_MANAGERS.values():
+        state_manager.close()
+    _LLM_CLIENTS.clear()
+    _STATE_MANAGERS.clear()
+
+# Output subdirectories already created during this process
+_MKDIR_CACHE = set()
+
+@functools.lru_cache(maxsize=1024)
+def _slugify(role: str, industry: str) -> Tuple[str, str]:
+    """
+    Get the output directory names for a role and industry.
+    
+    Args:
+        role (str): Role name from the STAR answer metadata
+        industry (str): Industry name from the STAR answer metadata
+        
+    Returns:
+        Tuple[str, str]: The role and industry directory names
+    """
+    role_dir = role.split(' ')[0].lower()  # Just use first word of role
+    industry_dir = industry.replace(' ', '_').replace('/', '_').lower()
+    return role_dir, industry_dir
+
+# (second, formatted timestamp) for the last second _now_ts formatted
+_TS_CACHE = (0, "")
+
+def _now_ts() -> str:
+    """
+    Get the current local time as "%Y-%m-%d %H:%M:%S", formatted at most once per second.
+    
+    The cache is swapped as a single tuple, so concurrent callers at worst
+    format the same second twice.
+    
+    Returns:
+        str: The formatted timestamp
+    """
+    global _TS_CACHE
+    now = int(time.time())
+    cached_second, cached_ts = _TS_CACHE
+    if cached_second != now:
+        cached_ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _TS_CACHE = (now, cached_ts)
+    return cached_ts
+
+# A line break together with the whitespace and blank lines around it
+_LINE_BREAK_RE = re.compile(r'\s*\n\s*')
+
+# Result fields filled by the first and second turn of each speaker
+_SPEAKER_FIELDS = {
+    "Interviewer": ("interviewer_question", "follow_up_question"),
+    "Candidate": ("candidate_answer", "follow_up_answer")
+}
+
+# Parsed conversation with no turns found, copied for each response
+_EMPTY_CONVERSATION = {
+    "interviewer_question": "",
+    "candidate_answer": "",
+    "follow_up_question": "",
+    "follow_up_answer": ""
+}
+
+# Bytes read from the start of a STAR answer file when only its metadata is needed
+METADATA_PREFIX_SIZE = 4096
+
+def read_star_answer_metadata(star_answer_file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read only the metadata object of a STAR answer JSON file.
+    
+    The STAR answer writer puts "metadata" first, so it is usually decoded
+    from a short prefix of the file without parsing the full answer. The
+    whole file is parsed if the metadata does not fit in the prefix.
+    
+    Args:
+        star_answer_file_path (str): Path to the STAR answer JSON file
+        
+    Returns:
+        Optional[Dict[str, Any]]: The metadata dictionary, or None if the file could not be read
+    """
+    try:
+        with open(star_answer_file_path, 'r', encoding='utf-8') as f:
+            head = f.read(METADATA_PREFIX_SIZE)
+            
+            key_pos = head.find('"metadata"')
+            colon_pos = head.find(':', key_pos + len('"metadata"')) if key_pos != -1 else -1
+            if colon_pos != -1:
+                value_pos = colon_pos + 1
+                while value_pos < len(head) and head[value_pos].isspace():
+                    value_pos += 1
+                try:
+                    metadata, _ = json.JSONDecoder().raw_decode(head, value_pos)
+                    if isinstance(metadata, dict):
+                        return metadata
+                except json.JSONDecodeError:
+                    pass  # Metadata runs past the prefix
+            
+            # Fall back to parsing the whole file
+            data = json_utils.loads(head + f.read())
+        return data.get('metadata', {})
+    except Exception as e:
+        logger.error("Error reading file %s for filtering: %s", star_answer_file_path, e)
+        return None
+
 def load_star_answer(star_answer_file_path: str) -> Dict[str, Any]:
     """
     Load a STAR answer from a JSON file.
@@ -38,63 +199,67 @@ def load_star_answer(star_answer_file_path: str) -> Dict[str, Any]:
         Dict[str, Any]: The STAR answer with metadata, or empty dict if loading failed
     """
     try:
-        with open(star_answer_file_path, 'r', encoding='utf-8') as f:
-            star_answer = json.load(f)
+        star_answer = json_utils.load_file(star_answer_file_path)
         
-        print(f"Loaded STAR answer from {star_answer_file_path}")
-        logger.info(f"Loaded STAR answer from {star_answer_file_path}")
+        logger.info("Loaded STAR answer from %s", star_answer_file_path)
         return star_answer
     except FileNotFoundError:
-        print(f"STAR answer file not found: {star_answer_file_path}")
-        logger.error(f"STAR answer file not found: {star_answer_file_path}")
+        logger.error("STAR answer file not found: %s", star_answer_file_path)
         return {}
-    except json.JSONDecodeError as e:
-        print(f"Error parsing STAR answer file {star_answer_file_path}: {e}")
-        logger.error(f"Error parsing STAR answer file {star_answer_file_path}: {e}")
+    except json_utils.JSONDecodeError as e:
+        logger.error("Error parsing STAR answer file %s: %s", star_answer_file_path, e)
         return {}
     except Exception as e:
-        print(f"Error loading STAR answer from {star_answer_file_path}: {e}")
-        logger.error(f"Error loading STAR answer from {star_answer_file_path}: {e}")
+        logger.error("Error loading STAR answer from %s: %s", star_answer_file_path, e)
         return {}
 
-def generate_conversational_parameters(star_answer: Dict[str, Any]) -> Dict[str, str]:
+def _extract_meta(star_answer: Dict[str, Any]) -> Tuple[Dict[str, Any], str, str, str, str]:
     """
-    Generate parameters for the conversational prompt template.
+    Extract the metadata fields used by the conversational stage in one pass.
     
     Args:
         star_answer (Dict[str, Any]): The STAR answer with metadata
         
     Returns:
-        Dict[str, str]: Parameters for the prompt template
+        Tuple[Dict[str, Any], str, str, str, str]: The metadata dictionary and
+            its role, industry, question and prompt ID
     """
-    # Extract metadata
     metadata = star_answer.get('metadata', {})
-    role_name = metadata.get('role', 'Unknown Role')
-    industry = metadata.get('industry', 'Unknown Industry')
-    question = metadata.get('question', 'Unknown Question')
+    return (
+        metadata,
+        metadata.get('role', 'Unknown Role'),
+        metadata.get('industry', 'Unknown Industry'),
+        metadata.get('question', 'Unknown Question'),
+        metadata.get('prompt_id', 'unknown')
+    )
+
+def generate_conversational_parameters(
+    meta: Tuple[Dict[str, Any], str, str, str, str],
+    full_answer: str
+) -> Dict[str, str]:
+    """
+    Generate parameters for the conversational prompt template.
     
-    # Extract STAR sections
-    answer = star_answer.get('answer', {})
-    situation = answer.get('situation', '')
-    task = answer.get('task', '')
-    action = answer.get('action', '')
-    result = answer.get('result', '')
+    Args:
+        meta (Tuple[Dict[str, Any], str, str, str, str]): Metadata fields from _extract_meta
+        full_answer (str): The full text of the STAR answer
+        
+    Returns:
+        Dict[str, str]: Parameters for the prompt template
+    """
+    _, role_name, industry, question, _ = meta
     
     # Create parameters dictionary with placeholders that match the template
     params = {
         "ROLE": role_name,
         "INDUSTRY": industry,
         "QUESTION": question,
-        "STAR_ANSWER": answer.get('full_answer', '')
+        "STAR_ANSWER": full_answer
     }
     
     # Add debug logging
-    print(f"Generated parameters for conversational prompt:") 
-    print(f"  ROLE: {role_name[:30]}...")
-    print(f"  INDUSTRY: {industry}")
-    print(f"  QUESTION: {question}")
-    print(f"  STAR_ANSWER length: {len(answer.get('full_answer', ''))} characters")
-    logger.info(f"Generated parameters for conversational prompt: ROLE={role_name}, INDUSTRY={industry}, QUESTION={question}")
+    logger.info("Generated parameters for conversational prompt: ROLE=%s, INDUSTRY=%s, QUESTION=%s", role_name, industry, question)
+    logger.debug("STAR_ANSWER length: %s characters", len(full_answer))
     
     return params
 
@@ -109,81 +274,30 @@ def parse_conversational_response(response_text: str) -> Dict[str, str]:
         Dict[str, str]: Parsed conversational response
     """
     # Initialize the result dictionary
-    result = {
-        "interviewer_question": "",
-        "candidate_answer": "",
-        "follow_up_question": "",
-        "follow_up_answer": "",
-        "full_conversation": response_text
-    }
+    result = dict(_EMPTY_CONVERSATION, full_conversation=response_text)
     
     # Try to extract the conversation parts
     try:
-        # Look for Interviewer and Candidate parts
-        lines = response_text.split('\n')
-        current_speaker = None
-        current_text = []
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-                
-            # Check for speaker changes
-            if line.startswith("Interviewer:"):
-                # If we were collecting text for a previous speaker, save it
-                if current_speaker == "Interviewer" and current_text:
-                    if not result["interviewer_question"]:
-                        result["interviewer_question"] = "\n".join(current_text)
-                    elif not result["follow_up_question"]:
-                        result["follow_up_question"] = "\n".join(current_text)
-                
-                # Start collecting for the interviewer
-                current_speaker = "Interviewer"
-                current_text = [line[len("Interviewer:"):].strip()]
+        for match in _SPEAKER_RE.finditer(response_text):
+            # Keep each turn's non-empty lines, stripped, in one C-level pass
+            text = _LINE_BREAK_RE.sub("\n", match.group(2).strip())
             
-            elif line.startswith("Candidate:"):
-                # If we were collecting text for a previous speaker, save it
-                if current_speaker == "Candidate" and current_text:
-                    if not result["candidate_answer"]:
-                        result["candidate_answer"] = "\n".join(current_text)
-                    elif not result["follow_up_answer"]:
-                        result["follow_up_answer"] = "\n".join(current_text)
-                
-                # Start collecting for the candidate
-                current_speaker = "Candidate"
-                current_text = [line[len("Candidate:"):].strip()]
-            
-            else:
-                # Continue collecting for the current speaker
-                if current_speaker:
-                    current_text.append(line)
-        
-        # Save any remaining text
-        if current_speaker == "Interviewer" and current_text:
-            if not result["interviewer_question"]:
-                result["interviewer_question"] = "\n".join(current_text)
-            elif not result["follow_up_question"]:
-                result["follow_up_question"] = "\n".join(current_text)
-        
-        elif current_speaker == "Candidate" and current_text:
-            if not result["candidate_answer"]:
-                result["candidate_answer"] = "\n".join(current_text)
-            elif not result["follow_up_answer"]:
-                result["follow_up_answer"] = "\n".join(current_text)
+            first, follow_up = _SPEAKER_FIELDS[match.group(1)]
+            if not result[first]:
+                result[first] = text
+            elif not result[follow_up]:
+                result[follow_up] = text
     
     except Exception as e:
-        print(f"Error parsing conversational response: {e}")
-        logger.error(f"Error parsing conversational response: {e}")
+        logger.error("Error parsing conversational response: %s", e)
     
     return result
 
 def save_conversational_response(
     response: Dict[str, str], 
     output_path: str, 
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any],
+    ensure_dir: bool = True
 ) -> bool:
     """
     Save the generated conversational response to a JSON file.
@@ -192,13 +306,16 @@ def save_conversational_response(
         response (Dict[str, str]): The parsed conversational response
         output_path (str): Path to save the response
         metadata (Dict[str, Any]): Additional metadata to include
+        ensure_dir (bool, optional): Whether to create the output directory first.
+            Callers that already created it can pass False.
         
     Returns:
         bool: True if saved successfully, False otherwise
     """
     try:
         # Create the output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if ensure_dir:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         # Combine the response and metadata
         output_data = {
@@ -206,118 +323,84 @@ def save_conversational_response(
             "conversation": response
         }
         
-        # Save to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2)
+        # Encoded up front so the file gets a single write instead of one per token
+        json_utils.dump_file(output_data, output_path)
         
-        print(f"Saved conversational response to {output_path}")
-        logger.info(f"Saved conversational response to {output_path}")
+        logger.info("Saved conversational response to %s", output_path)
         return True
     
     except Exception as e:
-        print(f"Error saving conversational response to {output_path}: {e}")
-        logger.error(f"Error saving conversational response to {output_path}: {e}")
+        logger.error("Error saving conversational response to %s: %s", output_path, e)
         return False
 
-def generate_conversation(
-    llm_client: LLMClient,
+def _prepare_conversation(
     state_manager: StateManager,
-    template_path: str,
+    template: str,
     star_answer_path: str,
-    output_dir: str,
     config: Dict[str, Any]
-) -> Tuple[bool, Optional[str]]:
+) -> Dict[str, Any]:
     """
-    Generate a conversational response for a single STAR answer.
+    Check state and build the prompt for a single STAR answer.
     
     Args:
-        llm_client (LLMClient): The LLM client to use
         state_manager (StateManager): The state manager
-        template_path (str): Path to the conversational prompt template
+        template (str): The loaded conversational prompt template
         star_answer_path (str): Path to the STAR answer JSON file
-        output_dir (str): Directory to save the response
         config (Dict[str, Any]): Configuration dictionary
         
     Returns:
-        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+        Dict[str, Any]: Either {'result': (success, output_file)} when no LLM call
+            is needed, or the 'conversation_id', 'metadata' and 'prompt' to send
     """
     # Create a unique file ID for this conversation that matches the state database entry
     # Extract information from the filename to construct the same ID used in previous stages
     filename = os.path.basename(star_answer_path)
     file_base = os.path.splitext(filename)[0]  # Remove .json extension
     
-    print(f"Processing STAR answer file: {filename}")
-    logger.info(f"Processing STAR answer file: {filename}")
+    logger.info("Processing STAR answer file: %s", filename)
     
-    # First, load the STAR answer to get the metadata
-    try:
-        with open(star_answer_path, 'r', encoding='utf-8') as f:
-            star_data = json.load(f)
-            
-        metadata = star_data.get('metadata', {})
-        role_name = metadata.get('role', '')
-        industry = metadata.get('industry', '')
-        question = metadata.get('question', 'Question 1')
-        prompt_id = metadata.get('prompt_id', 'unknown')
-        
-        # Print metadata for debugging
-        print(f"Metadata: Role={role_name}, Industry={industry}, Question={question}, Prompt ID={prompt_id}")
-        logger.info(f"Metadata: Role={role_name}, Industry={industry}, Question={question}, Prompt ID={prompt_id}")
-        
-        # Extract key components directly from the filename since that's what we used in star_answer_generator.py
-        # The filename format from star_answer_generator is: role_slug_q{question_number}_{prompt_number}.json
-        
-        # Create the conversation file ID by appending "_conv" to the star answer file ID
-        # This ensures a unique ID while maintaining the relationship to the source file
-        conversation_id = f"{file_base}_conv"
-        
-        print(f"Using conversation ID: {conversation_id}")
-        logger.info(f"Using conversation ID: {conversation_id}")
-    except Exception as e:
-        # Fallback to using the filename if there's an error
-        print(f"Error reading STAR answer metadata: {e}, using filename instead")
-        logger.error(f"Error reading STAR answer metadata: {e}, using filename instead")
-        conversation_id = f"{file_base}_conv"
+    # Load the STAR answer once and pull out the metadata fields used below
+    star_answer = load_star_answer(star_answer_path)
+    meta = _extract_meta(star_answer)
+    if star_answer:
+        # Log metadata for debugging
+        logger.info("Metadata: Role=%s, Industry=%s, Question=%s, Prompt ID=%s", *meta[1:])
+    
+    # The filename format from star_answer_generator is: role_slug_q{question_number}_{prompt_number}.json
+    # Create the conversation file ID by appending "_conv" to the star answer file ID
+    # This ensures a unique ID while maintaining the relationship to the source file
+    conversation_id = f"{file_base}_conv"
+    
+    logger.info("Using conversation ID: %s", conversation_id)
     
     # Check if this file has already been processed
     status = state_manager.get_file_status(conversation_id)
-    print(f"Status for {conversation_id}: {status}")
-    logger.info(f"Status for {conversation_id}: {status}")
+    logger.info("Status for %s: %s", conversation_id, status)
     
     # Add more detailed logging about the state check
-    print(f"===== STATUS CHECK: Looking for conversation ID '{conversation_id}' in database =====")
+    logger.debug("===== STATUS CHECK: Looking for conversation ID '%s' in database =====", conversation_id)
     
     # Only force reprocessing if explicitly configured
     # Default to not reprocessing files that are already marked as complete
     force_processing = False
     
     if status == STATUS_COMPLETE and not force_processing:
-        print(f"Conversational response for {conversation_id} already generated, skipping")
-        logger.info(f"Conversational response for {conversation_id} already generated, skipping")
-        return True, state_manager.get_processed_file_path(conversation_id)
+        logger.info("Conversational response for %s already generated, skipping", conversation_id)
+        return {'result': (True, state_manager.get_processed_file_path(conversation_id))}
     
-    # Add to state manager with in-progress status
-    state_manager.add_file(conversation_id, 'conversation')
-    state_manager.update_status(conversation_id, STATUS_IN_PROGRESS)
+    # Add to state manager with in-progress status, in one commit
+    with state_manager.deferred_updates():
+        state_manager.add_file(conversation_id, 'conversation')
+        state_manager.update_status(conversation_id, STATUS_IN_PROGRESS)
     
-    # Load the STAR answer
-    star_answer = load_star_answer(star_answer_path)
+    # A STAR answer that failed to load is recorded as failed
     if not star_answer:
-        print(f"Failed to load STAR answer from {star_answer_path}")
-        logger.error(f"Failed to load STAR answer from {star_answer_path}")
+        logger.error("Failed to load STAR answer from %s", star_answer_path)
         state_manager.update_status(conversation_id, STATUS_FAILED, error_message=f"Failed to load STAR answer from {star_answer_path}")
-        return False, None
-    
-    # Load the conversational prompt template
-    template = load_prompt_template(template_path)
-    if not template:
-        print(f"Failed to load template from {template_path}")
-        logger.error(f"Failed to load template from {template_path}")
-        state_manager.update_status(conversation_id, STATUS_FAILED, error_message=f"Failed to load template from {template_path}")
-        return False, None
+        return {'result': (False, None)}
     
     # Generate parameters for this STAR answer
-    params = generate_conversational_parameters(star_answer)
+    params = generate_conversational_parameters(meta, star_answer.get('answer', {}).get('full_answer', ''))
     
     # Add STAR_ANSWER_FILE parameter explicitly to help with prompt logging
     params['STAR_ANSWER_FILE'] = os.path.basename(star_answer_path)
@@ -325,94 +408,503 @@ def generate_conversation(
     # Generate the prompt by substituting parameters with config for logging
     prompt = substitute_parameters(template, params, stage_name='conversational', config=config)
     
+    return {
+        'conversation_id': conversation_id,
+        'metadata': meta[0],
+        'prompt': prompt
+    }
+
+def _conversation_output(
+    star_metadata: Dict[str, Any],
+    star_answer_path: str,
+    response: Dict[str, Any],
+    output_dir: str
+) -> Tuple[Dict[str, Any], str, str]:
+    """
+    Build the metadata and output paths for a finished conversation.
+    
+    Args:
+        star_metadata (Dict[str, Any]): Metadata of the loaded STAR answer
+        star_answer_path (str): Path to the STAR answer JSON file
+        response (Dict[str, Any]): The LLM response
+        output_dir (str): Directory to save the response
+        
+    Returns:
+        Tuple[Dict[str, Any], str, str]: Metadata, JSON output path and markdown output path
+    """
+    # Create metadata
+    metadata = star_metadata.copy()
+    metadata.update({
+        "conversation_timestamp": _now_ts(),
+        "conversation_llm_provider": response.get('provider', 'unknown')
+    })
+    
+    # Create the output file path with a clear folder structure
+    filename = os.path.basename(star_answer_path)
+    filename_no_ext = os.path.splitext(filename)[0]
+    
+    # Create a more organized folder structure
+    role_dir, industry_dir = _slugify(metadata.get('role', 'unknown'), metadata.get('industry', 'unknown'))
+    
+    # Create subdirectories for better organization, once per role/industry.
+    # Queue worker threads share the cache without a lock: set membership and
+    # add are atomic under the GIL and makedirs with exist_ok is idempotent, so
+    # a race only means two threads both create the same directory
+    output_subdir = os.path.join(output_dir, role_dir, industry_dir)
+    if output_subdir not in _MKDIR_CACHE:
+        os.makedirs(output_subdir, exist_ok=True)
+        _MKDIR_CACHE.add(output_subdir)
+    
+    # Use same base filename but in the conversational directory
+    output_file = os.path.join(output_subdir, f"{filename_no_ext}_conversation.json")
+    
+    logger.info("Will save conversation to: %s", output_file)
+    
+    # Also create a markdown file for direct viewing
+    markdown_file = os.path.join(output_subdir, f"{filename_no_ext}_conversation.md")
+    
+    return metadata, output_file, markdown_file
+
+def _save_markdown(conversation: Dict[str, str], markdown_file: str) -> None:
+    """
+    Save the raw conversation to a .md file for easy viewing.
+    
+    Args:
+        conversation (Dict[str, str]): The parsed conversational response
+        markdown_file (str): Path to the markdown file
+    """
+    try:
+        with open(markdown_file, 'w', encoding='utf-8') as f:
+            f.write(conversation['full_conversation'])
+        logger.info("Saved markdown conversation to %s", markdown_file)
+    except Exception as e:
+        logger.warning("Failed to save markdown conversation: %s", e)
+
+def _record_saved(
+    state_manager: StateManager,
+    conversation_id: str,
+    output_file: str,
+    saved: bool
+) -> Tuple[bool, Optional[str]]:
+    """
+    Record the outcome of saving a conversation in the state database.
+    
+    Args:
+        state_manager (StateManager): The state manager
+        conversation_id (str): ID of the conversation in the state database
+        output_file (str): Path the conversation was saved to
+        saved (bool): Whether save_conversational_response succeeded
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+    """
+    if saved:
+        state_manager.update_status(conversation_id, STATUS_COMPLETE, processed_file_path=output_file)
+        logger.info("Successfully saved conversation to %s", output_file)
+        return True, output_file
+    else:
+        state_manager.update_status(conversation_id, STATUS_FAILED, error_message=f"Failed to save conversational response to {output_file}")
+        logger.error("Failed to save conversation to %s", output_file)
+        return False, None
+
+def _finish_conversation(
+    state_manager: StateManager,
+    conversation_id: str,
+    star_metadata: Dict[str, Any],
+    star_answer_path: str,
+    response: Dict[str, Any],
+    output_dir: str,
+    conversation: Optional[Dict[str, str]] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Parse the LLM response for a STAR answer and save the conversation.
+    
+    Args:
+        state_manager (StateManager): The state manager
+        conversation_id (str): ID of the conversation in the state database
+        star_metadata (Dict[str, Any]): Metadata of the loaded STAR answer
+        star_answer_path (str): Path to the STAR answer JSON file
+        response (Dict[str, Any]): The LLM response
+        output_dir (str): Directory to save the response
+        conversation (Dict[str, str], optional): The response already parsed by
+            parse_conversational_response; parsed here if not given
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+    """
+    # Parse the conversational response
+    if conversation is None:
+        conversation = parse_conversational_response(response['text'])
+    
+    metadata, output_file, markdown_file = _conversation_output(
+        star_metadata, star_answer_path, response, output_dir
+    )
+    
+    _save_markdown(conversation, markdown_file)
+    
+    # Save the conversational response
+    saved = save_conversational_response(conversation, output_file, metadata, ensure_dir=False)
+    return _record_saved(state_manager, conversation_id, output_file, saved)
+
+async def _afinish_conversation(
+    state_manager: StateManager,
+    conversation_id: str,
+    star_metadata: Dict[str, Any],
+    star_answer_path: str,
+    response: Dict[str, Any],
+    output_dir: str,
+    conversation: Optional[Dict[str, str]] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async version of _finish_conversation that writes the two output files concurrently.
+    
+    The markdown and JSON files are independent, so both writes run in the
+    loop's default thread pool at once. The state update stays on the event
+    loop thread.
+    
+    Args:
+        state_manager (StateManager): The state manager
+        conversation_id (str): ID of the conversation in the state database
+        star_metadata (Dict[str, Any]): Metadata of the loaded STAR answer
+        star_answer_path (str): Path to the STAR answer JSON file
+        response (Dict[str, Any]): The LLM response
+        output_dir (str): Directory to save the response
+        conversation (Dict[str, str], optional): The response already parsed by
+            parse_conversational_response; parsed here if not given
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+    """
+    if conversation is None:
+        conversation = parse_conversational_response(response['text'])
+    
+    metadata, output_file, markdown_file = _conversation_output(
+        star_metadata, star_answer_path, response, output_dir
+    )
+    
+    loop = asyncio.get_running_loop()
+    _, saved = await asyncio.gather(
+        loop.run_in_executor(None, _save_markdown, conversation, markdown_file),
+        loop.run_in_executor(
+            None, functools.partial(save_conversational_response, conversation, output_file, metadata, ensure_dir=False)
+        )
+    )
+    return _record_saved(state_manager, conversation_id, output_file, saved)
+
+def generate_conversation(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template: str,
+    star_answer_path: str,
+    output_dir: str,
+    config: Dict[str, Any]
+) -> Tuple[bool, Optional[str]]:
+    """
+    Generate a conversational response for a single STAR answer.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template (str): The loaded conversational prompt template
+        star_answer_path (str): Path to the STAR answer JSON file
+        output_dir (str): Directory to save the response
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+    """
+    prepared = _prepare_conversation(state_manager, template, star_answer_path, config)
+    if 'result' in prepared:
+        return prepared['result']
+    
+    conversation_id = prepared['conversation_id']
+    
     # Call the LLM to generate the conversational response
     try:
-        print(f"Generating conversational response for {conversation_id}...")
-        logger.info(f"Generating conversational response for {conversation_id}...")
+        logger.info("Generating conversational response for %s...", conversation_id)
         
         response = llm_client.generate_response(
-            prompt=prompt,
+            prompt=prepared['prompt'],
             max_tokens=config.get('step3_max_tokens', 4000),
             temperature=0.7
         )
         
         if not response:
-            print(f"Failed to get response from LLM for {conversation_id}")
-            logger.error(f"Failed to get response from LLM for {conversation_id}")
+            logger.error("Failed to get response from LLM for %s", conversation_id)
             state_manager.update_status(conversation_id, STATUS_FAILED, error_message="No response from LLM")
             return False, None
         
-        # Parse the conversational response
-        conversation = parse_conversational_response(response['text'])
-        
-        # Create metadata
-        metadata = star_answer.get('metadata', {}).copy()
-        metadata.update({
-            "conversation_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "conversation_llm_provider": response.get('provider', 'unknown')
-        })
-        
-        # Create the output file path with a clear folder structure
-        filename = os.path.basename(star_answer_path)
-        filename_no_ext = os.path.splitext(filename)[0]
+        return _finish_conversation(
+            state_manager, conversation_id, prepared['metadata'], star_answer_path, response, output_dir
+        )
         
-        # Create a more organized folder structure
-        role_dir = metadata.get('role', 'unknown').split(' ')[0].lower()  # Just use first word of role
-        industry_dir = metadata.get('industry', 'unknown').replace(' ', '_').replace('/', '_').lower()
+    except Exception as e:
+        logger.error("Error generating conversational response for %s: %s", conversation_id, e)
+        state_manager.update_status(conversation_id, STATUS_FAILED, error_message=str(e))
+        return False, None
+
+async def agenerate_conversation(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template: str,
+    star_answer_path: str,
+    output_dir: str,
+    config: Dict[str, Any],
+    parse_executor: Optional[ProcessPoolExecutor] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async version of generate_conversation that awaits the LLM call.
+    
+    State updates stay synchronous; they run on the event loop thread between
+    awaits, so concurrent calls never overlap on SQLite. The output files are
+    written concurrently in the loop's default thread pool.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template (str): The loaded conversational prompt template
+        star_answer_path (str): Path to the STAR answer JSON file
+        output_dir (str): Directory to save the response
+        config (Dict[str, Any]): Configuration dictionary
+        parse_executor (ProcessPoolExecutor, optional): Process pool to parse the
+            response in, keeping CPU-bound parsing off the event loop
         
-        # Create subdirectories for better organization
-        output_subdir = os.path.join(output_dir, role_dir, industry_dir)
-        os.makedirs(output_subdir, exist_ok=True)
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved response file
+    """
+    prepared = _prepare_conversation(state_manager, template, star_answer_path, config)
+    if 'result' in prepared:
+        return prepared['result']
+    
+    conversation_id = prepared['conversation_id']
+    
+    try:
+        logger.info("Generating conversational response for %s...", conversation_id)
         
-        # Use same base filename but in the conversational directory
-        output_file = os.path.join(output_subdir, f"{filename_no_ext}_conversation.json")
+        response = await llm_client.agenerate_response(
+            prompt=prepared['prompt'],
+            max_tokens=config.get('step3_max_tokens', 4000),
+            temperature=0.7
+        )
         
-        print(f"Will save conversation to: {output_file}")
-        logger.info(f"Will save conversation to: {output_file}")
+        if not response:
+            logger.error("Failed to get response from LLM for %s", conversation_id)
+            state_manager.update_status(conversation_id, STATUS_FAILED, error_message="No response from LLM")
+            return False, None
         
-        # Create the output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        conversation = None
+        if parse_executor is not None:
+            conversation = await asyncio.get_running_loop().run_in_executor(
+                parse_executor, parse_conversational_response, response['text']
+            )
         
-        # Also create a markdown file for direct viewing
-        markdown_file = os.path.join(
-            os.path.dirname(output_file),
-            f"{os.path.splitext(os.path.basename(output_file))[0]}.md"
+        return await _afinish_conversation(
+            state_manager, conversation_id, prepared['metadata'], star_answer_path, response, output_dir,
+            conversation=conversation
         )
         
-        # Save the raw conversation to a .md file for easy viewing
-        try:
-            with open(markdown_file, 'w', encoding='utf-8') as f:
-                f.write(conversation['full_conversation'])
-            logger.info(f"Saved markdown conversation to {markdown_file}")
-            print(f"Saved markdown conversation to {markdown_file}")
-        except Exception as e:
-            logger.warning(f"Failed to save markdown conversation: {e}")
-            print(f"Failed to save markdown conversation: {e}")
-        
-        # Save the conversational response
-        if save_conversational_response(conversation, output_file, metadata):
-            state_manager.update_status(conversation_id, STATUS_COMPLETE, processed_file_path=output_file)
-            print(f"Successfully saved conversation to {output_file}")
-            logger.info(f"Successfully saved conversation to {output_file}")
-            return True, output_file
-        else:
-            state_manager.update_status(conversation_id, STATUS_FAILED, error_message=f"Failed to save conversational response to {output_file}")
-            print(f"Failed to save conversation to {output_file}")
-            logger.error(f"Failed to save conversation to {output_file}")
-            return False, None
-        
     except Exception as e:
-        print(f"Error generating conversational response for {conversation_id}: {e}")
-        logger.error(f"Error generating conversational response for {conversation_id}: {e}")
+        logger.error("Error generating conversational response for %s: %s", conversation_id, e)
         state_manager.update_status(conversation_id, STATUS_FAILED, error_message=str(e))
         return False, None
 
-def process_conversations(config: Dict[str, Any]) -> Dict[str, int]:
+def iter_star_answer_files(answers_dir: str) -> Iterator[str]:
+    """
+    Lazily yield the paths of the STAR answer JSON files in a directory.
+    
+    Args:
+        answers_dir (str): Directory containing the STAR answer files
+        
+    Yields:
+        str: Path to each STAR answer JSON file
+    """
+    try:
+        with os.scandir(answers_dir) as entries:
+            for entry in entries:
+                # The entry type comes from the directory listing, without a stat per file
+                if entry.name.endswith('.json') and entry.is_file():
+                    yield entry.path
+    except FileNotFoundError:
+        logger.warning("STAR answers directory not found: %s", answers_dir)
+
+def filter_star_answer_files(
+    star_answer_files: Iterable[Any],
+    role_filter: Optional[str] = None,
+    industry_filter: Optional[str] = None,
+    question_filter: Optional[str] = None
+) -> Iterator[Any]:
+    """
+    Lazily yield the STAR answer files whose metadata matches the filters.
+    
+    Metadata is read on a thread pool and results are yielded in input
+    order as they become available, so processing can start before every
+    file has been checked.
+    
+    Args:
+        star_answer_files (Iterable[Any]): Paths to the STAR answer JSON files
+        role_filter (str, optional): Case-insensitive substring the role must contain
+        industry_filter (str, optional): Case-insensitive substring the industry must contain
+        question_filter (str, optional): Case-insensitive substring the question must contain
+        
+    Yields:
+        Any: Paths of the files that passed all filters
+    """
+    role_filter = role_filter.lower() if role_filter else None
+    industry_filter = industry_filter.lower() if industry_filter else None
+    question_filter = question_filter.lower() if question_filter else None
+    
+    # The reads are I/O bound, so threads overlap them. Only a window of
+    # reads is submitted ahead of the consumer, since Executor.map would
+    # submit the whole input up front
+    max_workers = 32
+    star_answer_iter = iter(star_answer_files)
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_path in itertools.islice(star_answer_iter, 2 * max_workers):
+            pending.append((file_path, executor.submit(read_star_answer_metadata, file_path)))
+        
+        while pending:
+            file_path, future = pending.popleft()
+            metadata = future.result()
+            
+            # Refill the window before handing this file to the consumer
+            for next_path in itertools.islice(star_answer_iter, 1):
+                pending.append((next_path, executor.submit(read_star_answer_metadata, next_path)))
+            
+            if metadata is None:
+                continue
+            
+            # Apply filters
+            if role_filter and role_filter not in metadata.get('role', '').lower():
+                continue
+                
+            if industry_filter and industry_filter not in metadata.get('industry', '').lower():
+                continue
+                
+            if question_filter and question_filter not in metadata.get('question', '').lower():
+                continue
+            
+            # All filters passed
+            yield file_path
+
+def _create_parse_executor(config: Dict[str, Any]) -> Optional[ProcessPoolExecutor]:
+    """
+    Create the process pool for parsing LLM responses, if one is configured.
+    
+    Parsing runs inline by default. With a local LLM the per-file work can
+    become CPU bound, and parse_workers > 0 moves it onto separate cores.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        Optional[ProcessPoolExecutor]: The pool, or None to parse inline
+    """
+    workers = config.get('parse_workers', 0)
+    if not workers:
+        return None
+    
+    # forkserver starts workers from a clean process instead of forking the event loop
+    context = None
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+def _load_conversation_template(config: Dict[str, Any]) -> Optional[str]:
+    """
+    Load the conversational prompt template named in the configuration.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        Optional[str]: The template text, or None if it could not be loaded
+    """
+    template_path = config['prompts'].get('conversation_prompt', config.get('conversation_prompt_path', 'prompt_templates/stage3_conversational_transformer.md'))
+    template = load_prompt_template(template_path)
+    if not template:
+        logger.error("Failed to load template from %s", template_path)
+    return template
+
+async def _agenerate_conversations(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template: str,
+    star_answer_files: Iterable[Any],
+    output_dir: str,
+    config: Dict[str, Any]
+) -> List[Tuple[Any, Any]]:
+    """
+    Generate conversational responses for many STAR answers concurrently.
+    
+    A fixed number of workers pull paths from star_answer_files as they go,
+    so a lazy iterable is consumed only as fast as files are processed.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template (str): The loaded conversational prompt template
+        star_answer_files (Iterable[Any]): Paths to the STAR answer JSON files
+        output_dir (str): Directory to save the responses
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        List[Tuple[Any, Any]]: (path, result) pairs in completion order, where result
+            is the (success, output_file) tuple or the exception that was raised
+    """
+    star_answer_iter = iter(star_answer_files)
+    results = []
+    parse_executor = _create_parse_executor(config)
+    loop = asyncio.get_running_loop()
+    iter_lock = asyncio.Lock()
+    
+    async def next_path():
+        # Advancing the iterator can block on directory listing or metadata
+        # reads, so it runs off the event loop thread, one worker at a time
+        async with iter_lock:
+            return await loop.run_in_executor(None, next, star_answer_iter, None)
+    
+    async def worker():
+        # Workers share the iterator; each takes the next path when it is free
+        while (star_answer_path := await next_path()) is not None:
+            try:
+                result = await agenerate_conversation(
+                    llm_client=llm_client,
+                    state_manager=state_manager,
+                    template=template,
+                    star_answer_path=str(star_answer_path),
+                    output_dir=output_dir,
+                    config=config,
+                    parse_executor=parse_executor
+                )
+            except Exception as e:
+                result = e
+            results.append((star_answer_path, result))
+    
+    try:
+        # Bound the number of requests in flight to stay within provider rate limits
+        await asyncio.gather(*(worker() for _ in range(config.get('max_concurrency', 8))))
+        return results
+    finally:
+        # The async HTTP clients are tied to this event loop
+        await llm_client.aclose()
+        if parse_executor is not None:
+            parse_executor.shutdown()
+
+def process_conversations(
+    config: Dict[str, Any],
+    state_manager: Optional[StateManager] = None,
+    llm_client: Optional[LLMClient] = None
+) -> Dict[str, int]:
     """
     Process all STAR answers to generate conversational responses.
     
     Args:
         config (Dict[str, Any]): Configuration dictionary
+        state_manager (StateManager, optional): State manager to use. Defaults to
+            one shared across calls for the configured database.
+        llm_client (LLMClient, optional): LLM client to use. Defaults to one
+            shared across calls with the same LLM settings.
         
     Returns:
         Dict[str, int]: Statistics about the processing
@@ -437,81 +929,59 @@ def process_conversations(config: Dict[str, Any]) -> Dict[str, int]:
     # Create output directory
     os.makedirs(conversations_dir, exist_ok=True)
     
-    # Initialize state manager
-    db_path = os.path.join(output_dir, 'processing_state.db')
-    state_manager = StateManager(db_path)
-    
-    # Initialize LLM client
-    llm_client = LLMClient(config)
+    # Use the caller's state manager and LLM client, or the shared ones
+    if state_manager is None:
+        state_manager = _shared_state_manager(os.path.join(output_dir, 'processing_state.db'))
+    if llm_client is None:
+        llm_client = _shared_llm_client(config)
     
-    # Get the conversational prompt template path
-    template_path = config['prompts'].get('conversation_prompt', config.get('conversation_prompt_path', 'prompt_templates/stage3_conversational_transformer.md'))
+    # Load the conversational prompt template once for all files
+    template = _load_conversation_template(config)
+    if not template:
+        return stats
     
     # Apply filters if specified
     role_filter = config.get('role_filter', None)
     industry_filter = config.get('industry_filter', None)
     question_filter = config.get('question_filter', None)
     
-    # Find all STAR answer files
-    star_answer_files = list(Path(answers_dir).glob("*.json"))
+    # Find all STAR answer files, lazily so processing starts with the first one
+    star_answer_files = iter_star_answer_files(answers_dir)
     
     # Filter files if needed
     if role_filter or industry_filter or question_filter:
-        filtered_files = []
-        
-        for file_path in star_answer_files:
-            # Load the file to check metadata
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                metadata = data.get('metadata', {})
-                role = metadata.get('role', '')
-                industry = metadata.get('industry', '')
-                question = metadata.get('question', '')
-                
-                # Apply filters
-                if role_filter and role_filter.lower() not in role.lower():
-                    continue
-                    
-                if industry_filter and industry_filter.lower() not in industry.lower():
-                    continue
-                    
-                if question_filter and question_filter.lower() not in question.lower():
-                    continue
-                
-                # All filters passed
-                filtered_files.append(file_path)
-                
-            except Exception as e:
-                print(f"Error reading file {file_path} for filtering: {e}")
-                logger.error(f"Error reading file {file_path} for filtering: {e}")
-        
-        star_answer_files = filtered_files
-        
-        print(f"Applied filters: {len(star_answer_files)} files remaining")
+        star_answer_files = filter_star_answer_files(
+            star_answer_files, role_filter, industry_filter, question_filter
+        )
     
-    # Process each STAR answer file
-    for star_answer_path in star_answer_files:
+    # Process the STAR answer files concurrently. Each file's state is committed
+    # as it changes, so no transaction stays open while requests are in flight
+    # and a finished conversation is never lost to an interrupted run
+    results = asyncio.run(_agenerate_conversations(
+        llm_client=llm_client,
+        state_manager=state_manager,
+        template=template,
+        star_answer_files=star_answer_files,
+        output_dir=conversations_dir,
+        config=config
+    ))
+    
+    for star_answer_path, result in results:
         stats["total"] += 1
         
-        # Generate the conversational response
-        success, output_file = generate_conversation(
-            llm_client=llm_client,
-            state_manager=state_manager,
-            template_path=template_path,
-            star_answer_path=str(star_answer_path),
-            output_dir=conversations_dir,
-            config=config
-        )
-        
-        if success:
+        if isinstance(result, BaseException):
+            logger.error("Error generating conversational response for %s: %s", star_answer_path, result)
+            stats["failed"] += 1
+        elif result[0]:
             stats["processed"] += 1
         else:
             stats["failed"] += 1
     
-    # Don't close the state manager here, it will be closed by the main script
-    # state_manager.close()
+    if role_filter or industry_filter or question_filter:
+        logger.info("Applied filters: %s files matched", stats["total"])
+    
+    # Don't close the state manager or LLM client here; they belong to the
+    # caller or are shared and closed at exit
     
     # Print statistics
     print("\nConversational Transformation Statistics:")
@@ -522,9 +992,92 @@ def process_conversations(config: Dict[str, Any]) -> Dict[str, int]:
     
     return stats
 
+def process_conversation_queue(
+    config: Dict[str, Any],
+    star_answer_queue: queue.Queue,
+    db_path: str,
+    llm_client: LLMClient,
+    max_workers: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Generate conversational responses for STAR answers as they arrive on a queue.
+    
+    Worker threads each take the next STAR answer path from the queue and stop
+    at the None sentinel, which each puts back for the others. Every worker
+    opens its own state manager, since the StateManager cursor cannot be
+    shared between threads, and each answer's state is committed as soon as
+    it is done.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        star_answer_queue (queue.Queue): Paths to the STAR answer JSON files, ended by None
+        db_path (str): Path to the state database
+        llm_client (LLMClient): LLM client to use
+        max_workers (int, optional): Number of worker threads. Defaults to max_concurrency.
+        
+    Returns:
+        Dict[str, int]: Statistics about the processing
+    """
+    stats = {
+        "total": 0,
+        "processed": 0,
+        "skipped": 0,
+        "failed": 0
+    }
+    stats_lock = threading.Lock()
+    
+    output_dir = config.get('output', {}).get('base_dir', 'generated_answers')
+    conversations_dir = os.path.join(output_dir, config.get('conversations_dir', 'conversations'))
+    os.makedirs(conversations_dir, exist_ok=True)
+    
+    template = _load_conversation_template(config)
+    
+    def worker():
+        state_manager = StateManager(db_path)
+        try:
+            while True:
+                star_answer_path = star_answer_queue.get()
+                if star_answer_path is None:
+                    star_answer_queue.put(None)
+                    return
+                
+                # Without a template nothing can be generated, but the queue is
+                # still drained so the stage feeding it is never blocked
+                if not template:
+                    continue
+                
+                try:
+                    success, _ = generate_conversation(
+                        llm_client=llm_client,
+                        state_manager=state_manager,
+                        template=template,
+                        star_answer_path=star_answer_path,
+                        output_dir=conversations_dir,
+                        config=config
+                    )
+                except Exception as e:
+                    logger.error("Error generating conversational response for %s: %s", star_answer_path, e)
+                    success = False
+                
+                with stats_lock:
+                    stats["total"] += 1
+                    stats["processed" if success else "failed"] += 1
+        finally:
+            state_manager.close()
+    
+    workers = max_workers or config.get('max_concurrency', 8)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(worker) for _ in range(workers)]:
+            future.result()
+    
+    return stats
+
 if __name__ == "__main__":
     # This allows the module to be run directly for testing
     from config import load_config
+    from logger_setup import setup_logging
+    
+    setup_logging(log_to_file=False)
     
     # Load configuration
     config = load_config('config.yaml')
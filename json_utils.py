@@ -0,0 +1,74 @@
+"""
+JSON Utilities Module
+
+This module provides JSON encoding and decoding helpers for the pipeline's
+input and output files. orjson is used when it is installed, which is several
+times faster than the standard library; otherwise the standard json module
+is used with equivalent output.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# catch this for either backend
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data):
+    """
+    Decode a JSON document.
+
+    Args:
+        data (bytes or str): The JSON document
+
+    Returns:
+        Any: The decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj, indent=False):
+    """
+    Encode an object as UTF-8 JSON bytes.
+
+    Args:
+        obj (Any): The object to encode
+        indent (bool, optional): Whether to indent the output by two spaces
+
+    Returns:
+        bytes: The encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+def load_file(file_path):
+    """
+    Read and decode a JSON file.
+
+    Args:
+        file_path (str): Path to the JSON file
+
+    Returns:
+        Any: The decoded object
+    """
+    with open(file_path, 'rb') as f:
+        return loads(f.read())
+
+def dump_file(obj, file_path, indent=True):
+    """
+    Encode an object and write it to a JSON file with a single write.
+
+    Args:
+        obj (Any): The object to encode
+        file_path (str): Path to the output file
+        indent (bool, optional): Whether to indent the output by two spaces
+    """
+    data = dumps(obj, indent=indent)
+    with open(file_path, 'wb') as f:
+        f.write(data)
@@ -0,0 +1,253 @@
+"""
+LLM Response Cache Module
+
+This module provides a persistent exact-match cache for LLM responses, so a
+prompt that has already been answered with the same generation settings is
+served from disk instead of calling the API again. An optional similarity
+lookup also serves prompts that differ from a stored one only in small details,
+within a namespace chosen by the caller.
+"""
+
+import os
+import re
+import math
+import time
+import hashlib
+import sqlite3
+from collections import Counter
+
+import json_utils
+from logger_setup import logger
+
+# Words compared by the similarity lookup
+_TERM_RE = re.compile(r'\w+')
+
+class ResponseCache:
+    """
+    SQLite-backed cache of LLM response dictionaries keyed by prompt hash.
+    """
+
+    def __init__(self, db_path, max_entries=0):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path (str): Path to the SQLite cache file
+            max_entries (int, optional): Evict the least recently used responses
+                beyond this many (0 keeps every response)
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key TEXT PRIMARY KEY,               -- Hash of the prompt and settings
+            response TEXT NOT NULL,             -- JSON-encoded response dictionary
+            created_at REAL NOT NULL,           -- Unix epoch of insertion
+            last_used REAL NOT NULL DEFAULT 0   -- Unix epoch of the last hit, for eviction
+        )
+        ''')
+        # Caches created before eviction was added lack the last_used column
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(llm_cache)')}
+        if 'last_used' not in columns:
+            self.conn.execute('ALTER TABLE llm_cache ADD COLUMN last_used REAL NOT NULL DEFAULT 0')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used)')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_cache_terms (
+            key TEXT PRIMARY KEY,               -- Key of the response in llm_cache
+            namespace TEXT NOT NULL,            -- Responses are only compared within a namespace
+            terms TEXT NOT NULL                 -- JSON-encoded word counts of the prompt
+        )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_terms_namespace ON llm_cache_terms (namespace)')
+        self.conn.commit()
+        logger.debug(f"Opened LLM response cache: {db_path}")
+
+    @staticmethod
+    def make_key(prompt, **settings):
+        """
+        Build the cache key for a prompt and its generation settings.
+
+        Args:
+            prompt (str): The prompt sent to the LLM
+            **settings: Generation settings that affect the response (e.g. max_tokens, temperature)
+
+        Returns:
+            str: Hex digest identifying the request
+        """
+        digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16)
+        for name in sorted(settings):
+            digest.update(f"\0{name}={settings[name]!r}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key, max_age=None):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_key
+            max_age (float, optional): Ignore responses stored more than this many seconds ago
+
+        Returns:
+            dict or None: The cached response dictionary, or None on a miss
+        """
+        try:
+            row = self.conn.execute('SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading LLM response cache: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        if max_age and time.time() - row[1] > max_age:
+            logger.debug(f"LLM response cache entry expired: {key}")
+            return None
+
+        if self.max_entries:
+            # Only eviction needs the time of use, so unbounded caches skip this write
+            try:
+                self.conn.execute('UPDATE llm_cache SET last_used = ? WHERE key = ?', (time.time(), key))
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error updating LLM response cache: {e}")
+
+        logger.debug(f"LLM response cache hit: {key}")
+        return json_utils.loads(row[0])
+
+    def set(self, key, response):
+        """
+        Store a response.
+
+        Args:
+            key (str): Cache key from make_key
+            response (dict): The response from LLMClient, as LLMResult.to_dict() returns it
+        """
+        now = time.time()
+        try:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used) VALUES (?, ?, ?, ?)',
+                (key, json_utils.dumps(response).decode('utf-8'), now, now)
+            )
+            if self.max_entries:
+                # Keep the max_entries most recently used responses
+                self.conn.execute(
+                    'DELETE FROM llm_cache WHERE key IN '
+                    '(SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                    (self.max_entries,)
+                )
+                self.conn.execute('DELETE FROM llm_cache_terms WHERE key NOT IN (SELECT key FROM llm_cache)')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing LLM response cache: {e}")
+
+    @staticmethod
+    def _term_counts(text):
+        """
+        Count the lowercase words of a prompt.
+
+        Args:
+            text (str): The prompt
+
+        Returns:
+            Counter: Occurrences of each word
+        """
+        return Counter(_TERM_RE.findall(text.lower()))
+
+    @staticmethod
+    def _cosine(a, b):
+        """
+        Cosine similarity of two word-count vectors.
+
+        Args:
+            a (Mapping): Word counts
+            b (Mapping): Word counts
+
+        Returns:
+            float: Similarity from 0 (no shared words) to 1 (same proportions)
+        """
+        if len(a) > len(b):
+            a, b = b, a
+        dot = sum(count * b.get(term, 0) for term, count in a.items())
+        if not dot:
+            return 0.0
+        norm_a = math.sqrt(sum(count * count for count in a.values()))
+        norm_b = math.sqrt(sum(count * count for count in b.values()))
+        return dot / (norm_a * norm_b)
+
+    def get_similar(self, prompt, namespace, threshold, max_age=None):
+        """
+        Look up the stored response whose prompt is most similar to this one.
+
+        Prompts are compared as word-count vectors by cosine similarity, and
+        only against prompts stored with set_similar under the same namespace.
+
+        Args:
+            prompt (str): The prompt sent to the LLM
+            namespace (str): Namespace to search, e.g. from make_key over the
+                request context and generation settings
+            threshold (float): Minimum similarity, between 0 and 1, for a match
+            max_age (float, optional): Ignore responses stored more than this many seconds ago
+
+        Returns:
+            dict or None: The most similar cached response dictionary, or None if
+                no stored prompt reaches the threshold
+        """
+        try:
+            rows = self.conn.execute(
+                'SELECT t.key, t.terms, c.response, c.created_at FROM llm_cache_terms t '
+                'JOIN llm_cache c ON c.key = t.key WHERE t.namespace = ?',
+                (namespace,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Error reading LLM response cache: {e}")
+            return None
+
+        terms = self._term_counts(prompt)
+        now = time.time()
+        best_key, best_response, best_score = None, None, threshold
+        for key, stored_terms, response, created_at in rows:
+            if max_age and now - created_at > max_age:
+                continue
+            score = self._cosine(terms, json_utils.loads(stored_terms))
+            if score >= best_score:
+                best_key, best_response, best_score = key, response, score
+
+        if best_response is None:
+            return None
+
+        logger.debug(f"LLM response cache similarity hit: {best_key} (similarity {best_score:.3f})")
+        if self.max_entries:
+            try:
+                self.conn.execute('UPDATE llm_cache SET last_used = ? WHERE key = ?', (now, best_key))
+                self.conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Error updating LLM response cache: {e}")
+        return json_utils.loads(best_response)
+
+    def set_similar(self, key, prompt, namespace):
+        """
+        Make a stored response available to get_similar.
+
+        Args:
+            key (str): Cache key the response was stored under with set
+            prompt (str): The prompt the response answers
+            namespace (str): Namespace to file the prompt under
+        """
+        try:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO llm_cache_terms (key, namespace, terms) VALUES (?, ?, ?)',
+                (key, namespace, json_utils.dumps(self._term_counts(prompt)).decode('utf-8'))
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Error writing LLM response cache: {e}")
+
+    def close(self):
+        """Closes the cache database connection."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
@@ -7,16 +7,189 @@ This module provides a unified client for interacting with multiple LLM provider
 
 import os
 import time
-import json
 import random
+import asyncio
+import inspect
+import functools
+import threading
+import itertools
+import importlib.util
 from typing import Dict, List, Optional, Union, Any
 
 # Import LLM-specific libraries
-import google.generativeai as genai
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, APIError, RateLimitError
 
 # Import project modules
+import json_utils
 from logger_setup import logger, setup_logging
+from llm_cache import ResponseCache
+
+# Connection pool limits for the HTTP clients; connections are kept alive and
+# reused across requests instead of paying a TCP+TLS handshake per call
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=64, max_connections=128, keepalive_expiry=60.0)
+HTTP_CONNECT_TIMEOUT = 10.0
+
+# google.generativeai is slow to import, so it is loaded by _import_genai only
+# when a Gemini key is configured
+genai = None
+
+def _import_genai():
+    """
+    Import google.generativeai on first use.
+    
+    Returns:
+        module: The google.generativeai module
+    """
+    global genai
+    if genai is None:
+        import google.generativeai as genai_module
+        genai = genai_module
+    return genai
+
+@functools.lru_cache(maxsize=1)
+def _gemini_accepts_request_options():
+    """
+    Check whether the installed google.generativeai takes per-request options.
+    
+    Older releases, including the pinned 0.3.2, pass unknown keyword arguments
+    into the request message, which rejects request_options.
+    
+    Returns:
+        bool: True if generate_content has a request_options parameter
+    """
+    return 'request_options' in inspect.signature(_import_genai().GenerativeModel.generate_content).parameters
+
+# Gemini safety settings (default moderate), applied to every model
+GEMINI_SAFETY_SETTINGS = (
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+)
+
+# Gemini sampling settings that do not vary between requests
+GEMINI_GENERATION_DEFAULTS = {"top_p": 0.95, "top_k": 40}
+
+# Adaptive per-attempt timeouts: an attempt may take this many times the
+# provider's smoothed latency, and each success moves the average this far
+ADAPTIVE_TIMEOUT_FACTOR = 3.0
+LATENCY_EWMA_WEIGHT = 0.2
+
+# Per-thread random generators for retry jitter, so concurrent retries do not
+# share the random module's generator
+_thread_local = threading.local()
+
+def _thread_random():
+    """
+    Get the random generator for the current thread, creating it on first use.
+    
+    Returns:
+        random.Random: This thread's generator
+    """
+    rng = getattr(_thread_local, 'random', None)
+    if rng is None:
+        rng = _thread_local.random = random.Random()
+    return rng
+
+# Seconds a Claude API key is skipped in the rotation after it is rate limited
+KEY_COOLDOWN_SECONDS = 60.0
+
+# Environment variable that, when set, turns the response cache off for a run
+# without editing the configuration
+CACHE_BYPASS_ENV_VAR = 'STAR_SKIP_LLM_CACHE'
+
+# Characters that open the JSON in a JSON-mode response (an object or an
+# array); any preamble or code fence before them is stripped when parsing
+JSON_START_CHARS = ('{', '[')
+
+# Characters of a streamed JSON-mode response read before giving up on
+# finding JSON, so a short preamble such as "Here are the sub-prompts:" is kept
+JSON_PREFIX_LIMIT = 512
+
+class MalformedJSONError(ValueError):
+    """Raised when a streamed JSON-mode response is clearly not JSON."""
+
+# Cheap endpoint requested on startup to open a pooled Claude connection
+ANTHROPIC_PREWARM_URL = "https://api.anthropic.com/v1/models"
+
+# Multiplex requests over one connection when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+class LLMResult:
+    """
+    A response returned by LLMClient.
+    
+    Fields are slots rather than dictionary entries, so results are cheaper
+    to create and hold. They can also be read by key (result['text'],
+    result.get('parsed')) as with the dictionaries used previously.
+    """
+    
+    __slots__ = ('text', 'provider', 'model', 'tokens', 'parsed')
+    
+    def __init__(self, text, provider, model, tokens=None, parsed=None):
+        """
+        Create a result.
+        
+        Args:
+            text (str): The generated text response
+            provider (str): The provider that generated the response, or 'cache'
+            model (str): The model used to generate the response
+            tokens (dict, optional): Input, output and total token counts, if available
+            parsed (Any, optional): The decoded response, for valid JSON-mode responses
+        """
+        self.text = text
+        self.provider = provider
+        self.model = model
+        self.tokens = tokens
+        self.parsed = parsed
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key, default=None):
+        """
+        Get a field by name.
+        
+        Args:
+            key (str): Field name
+            default (Any, optional): Value returned for unknown fields or unset parsed values
+            
+        Returns:
+            Any: The field value, or default
+        """
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+    
+    def to_dict(self):
+        """
+        Convert the result to a JSON-serializable dictionary.
+        
+        Returns:
+            dict: The result fields, without parsed when it is unset
+        """
+        data = {'text': self.text, 'provider': self.provider, 'model': self.model, 'tokens': self.tokens}
+        if self.parsed is not None:
+            data['parsed'] = self.parsed
+        return data
+    
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a result from a dictionary produced by to_dict.
+        
+        Args:
+            data (dict): Result fields
+            
+        Returns:
+            LLMResult: The result
+        """
+        return cls(data['text'], data['provider'], data['model'], data.get('tokens'), data.get('parsed'))
+    
+    def __repr__(self):
+        return f"LLMResult(provider={self.provider!r}, model={self.model!r}, text={self.text[:40]!r}...)"
 
 class LLMClient:
     """
@@ -42,13 +215,63 @@ class LLMClient:
         self.max_retries = self.llm_config.get('max_retries', 3)
         self.retry_delay = self.llm_config.get('retry_delay_seconds', 2)
         self.request_timeout = self.llm_config.get('request_timeout_seconds', 120)
+        self.min_request_timeout = self.llm_config.get('min_request_timeout_seconds', 30)
+        
+        # Smoothed latency of successful calls by (provider, max_tokens), for
+        # adaptive timeouts; short and long completions are averaged apart so
+        # quick calls do not shorten the timeout of long ones
+        self._latency_ewma = {}
+        
+        # Sync Claude clients, one per API key, set up by _initialize_clients;
+        # anthropic_client is the first of them
+        self.anthropic_client = None
+        self.anthropic_clients = []
+        
+        # Requests rotate over the keys, skipping any key that is cooling down
+        # after a rate limit error until the monotonic time stored for it
+        self._anthropic_key_cycle = None
+        self._anthropic_key_cooldown = {}
+        self._anthropic_key_lock = threading.Lock()
+        
+        # Async Claude clients by event loop, created on first use inside the loop:
+        # (shared httpx.AsyncClient, {key index: AsyncAnthropic}). Keeping them per
+        # loop lets one loop reuse its connections across many batches while
+        # another thread's loop, e.g. a pipeline stage, has its own
+        self._async_clients = {}
+        
+        # Shared HTTP connection pool for the Claude clients
+        self._http_client = None
         
         # Initialize provider-specific clients
         self._initialize_clients()
         
-        print(f"LLM Client initialized with primary provider: {self.primary_provider}")
+        # Display name, availability check, and sync and async generators for each provider
+        self._providers = {
+            'gemini': ('Gemini', self._gemini_configured, self._generate_with_gemini, self._agenerate_with_gemini),
+            'anthropic': ('Claude', self._anthropic_configured, self._generate_with_claude, self._agenerate_with_claude),
+        }
+        
+        # Optional persistent cache of responses to identical requests
+        self._response_cache = None
+        self.response_cache_ttl = self.llm_config.get('response_cache_ttl_seconds', 0)
+        self.response_cache_similarity = self.llm_config.get('response_cache_similarity_threshold', 0)
+        if os.getenv(CACHE_BYPASS_ENV_VAR):
+            logger.info(f"{CACHE_BYPASS_ENV_VAR} is set, not using the LLM response cache")
+        elif self.llm_config.get('use_response_cache', False):
+            base_dir = config.get('output', {}).get('base_dir', 'generated_answers')
+            self._response_cache = ResponseCache(
+                os.path.join(base_dir, 'llm_cache.db'),
+                max_entries=self.llm_config.get('response_cache_max_entries', 0)
+            )
+        
+        logger.info(f"LLM Client initialized with primary provider: {self.primary_provider}")
         if self.fallback_provider:
-            print(f"Fallback provider configured: {self.fallback_provider}")
+            logger.info(f"Fallback provider configured: {self.fallback_provider}")
+        
+        # Open connections while the caller is still setting up, so the first
+        # real request skips the TCP+TLS handshake
+        if self.llm_config.get('prewarm_connections', True):
+            threading.Thread(target=self._prewarm_connections, daemon=True).start()
     
     def _initialize_clients(self):
         """Initialize provider-specific clients based on configuration."""
@@ -57,34 +280,146 @@ class LLMClient:
         self.gemini_api_key = gemini_config.get('api_key')
         self.gemini_model = gemini_config.get('model', 'gemini-2.5-pro-exp-03-25')
         
+        # GenerativeModel objects by model name, reused across requests
+        self._gemini_models = {}
+        
         if self.gemini_api_key:
             try:
-                genai.configure(api_key=self.gemini_api_key)
-                print(f"Gemini client initialized with model: {self.gemini_model}")
+                _import_genai().configure(api_key=self.gemini_api_key)
+                logger.info(f"Gemini client initialized with model: {self.gemini_model}")
             except Exception as e:
-                print(f"Failed to initialize Gemini client: {e}")
+                logger.error(f"Failed to initialize Gemini client: {e}")
                 if self.primary_provider == 'gemini':
-                    print("Primary provider initialization failed!")
+                    logger.error("Primary provider initialization failed!")
         else:
-            print("Gemini API key not provided. Gemini client not initialized.")
+            logger.warning("Gemini API key not provided. Gemini client not initialized.")
         
         # Initialize Claude client if configured
         anthropic_config = self.llm_config.get('anthropic', {})
         self.anthropic_api_key = anthropic_config.get('api_key')
+        self.anthropic_api_keys = anthropic_config.get('api_keys') or ([self.anthropic_api_key] if self.anthropic_api_key else [])
         self.anthropic_model = anthropic_config.get('model', 'claude-3-7-sonnet-20250219')
         
         if self.anthropic_api_key:
             try:
-                self.anthropic_client = Anthropic(api_key=self.anthropic_api_key)
-                print(f"Claude client initialized with model: {self.anthropic_model}")
+                self._http_client = httpx.Client(
+                    limits=HTTP_POOL_LIMITS, timeout=self._http_timeout(), http2=HTTP2_AVAILABLE
+                )
+                # The clients share one connection pool; each request carries its own key
+                self.anthropic_clients = [
+                    Anthropic(api_key=api_key, http_client=self._http_client)
+                    for api_key in self.anthropic_api_keys
+                ]
+                self.anthropic_client = self.anthropic_clients[0]
+                self._anthropic_key_cycle = itertools.cycle(range(len(self.anthropic_clients)))
+                logger.info(f"Claude client initialized with model: {self.anthropic_model} ({len(self.anthropic_clients)} API key(s))")
             except Exception as e:
-                print(f"Failed to initialize Claude client: {e}")
+                logger.error(f"Failed to initialize Claude client: {e}")
                 if self.primary_provider == 'anthropic':
-                    print("Primary provider initialization failed!")
+                    logger.error("Primary provider initialization failed!")
         else:
-            print("Claude API key not provided. Claude client not initialized.")
+            logger.warning("Claude API key not provided. Claude client not initialized.")
     
-    def generate_response(self, prompt, max_tokens=None, temperature=0.7, system_prompt=None, json_mode=False):
+    def _prewarm_connections(self):
+        """
+        Open a connection to each configured provider with a cheap request.
+        
+        Runs in a background thread; failures only mean the first real
+        request pays the handshake, so they are logged and ignored.
+        """
+        if self._http_client is not None:
+            try:
+                self._http_client.head(
+                    ANTHROPIC_PREWARM_URL,
+                    headers={"x-api-key": self.anthropic_api_key, "anthropic-version": "2023-06-01"}
+                )
+                logger.debug("Pre-warmed Claude connection")
+            except Exception as e:
+                logger.debug(f"Failed to pre-warm Claude connection: {e}")
+        
+        if self.gemini_api_key:
+            try:
+                # Fetching one model listing opens the SDK's gRPC channel
+                next(iter(genai.list_models(page_size=1)), None)
+                logger.debug("Pre-warmed Gemini connection")
+            except Exception as e:
+                logger.debug(f"Failed to pre-warm Gemini connection: {e}")
+    
+    def _http_timeout(self):
+        """Get the HTTP timeout for LLM requests."""
+        return httpx.Timeout(self.request_timeout, connect=HTTP_CONNECT_TIMEOUT)
+    
+    def close(self):
+        """Close the pooled HTTP connections held by the sync client and the response cache."""
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+        if self._response_cache is not None:
+            self._response_cache.close()
+            self._response_cache = None
+    
+    def _cached_response(self, prompt, max_tokens, temperature, system_prompt, json_mode, no_cache, cache_context=None):
+        """
+        Look up an earlier response to an identical request.
+        
+        The key covers the prompt and every setting that affects the response,
+        including the configured providers and models. When a similarity
+        threshold is configured and the caller passes a cache context, a miss
+        falls back to the most similar earlier prompt with the same context
+        and settings.
+        
+        Args:
+            prompt (str): The prompt to send to the LLM
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float): Sampling temperature
+            system_prompt (str, optional): System prompt
+            json_mode (bool): Whether JSON output was requested
+            no_cache (bool): Whether the caller asked to bypass the cache
+            cache_context (str, optional): What the prompt is about; only prompts
+                with the same context are compared for similarity
+            
+        Returns:
+            tuple: (cached LLMResult or None, cache key to store a fresh
+                response under or None if caching is off, similarity namespace
+                or None if the similarity lookup is off)
+        """
+        if self._response_cache is None or no_cache:
+            return None, None, None
+        
+        settings = dict(
+            primary_provider=self.primary_provider,
+            fallback_provider=self.fallback_provider,
+            gemini_model=self.gemini_model,
+            anthropic_model=self.anthropic_model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system_prompt=system_prompt,
+            json_mode=json_mode
+        )
+        cache_key = ResponseCache.make_key(prompt, **settings)
+        namespace = None
+        cached = self._response_cache.get(cache_key, max_age=self.response_cache_ttl)
+        if cached is None and self.response_cache_similarity and cache_context is not None:
+            namespace = ResponseCache.make_key(cache_context, **settings)
+            cached = self._response_cache.get_similar(
+                prompt, namespace, self.response_cache_similarity, max_age=self.response_cache_ttl
+            )
+        if cached is None:
+            return None, cache_key, namespace
+        
+        logger.info("Using cached LLM response")
+        response = LLMResult.from_dict(cached)
+        response.provider = 'cache'
+        return response, cache_key, namespace
+    
+    def _store_response(self, cache_key, response, prompt=None, namespace=None):
+        """Store a fresh response under the key and similarity namespace from _cached_response."""
+        if cache_key and response is not None and self._response_cache is not None:
+            self._response_cache.set(cache_key, response.to_dict())
+            if namespace:
+                self._response_cache.set_similar(cache_key, prompt, namespace)
+    
+    def generate_response(self, prompt, max_tokens=None, temperature=0.7, system_prompt=None, json_mode=False, no_cache=False, stream=False, cache_context=None):
         """
         Generate a response using the primary LLM, falling back to the secondary LLM if needed.
         
@@ -94,14 +429,28 @@ class LLMClient:
             temperature (float, optional): Sampling temperature (0.0 to 1.0)
             system_prompt (str, optional): System prompt for models that support it
             json_mode (bool, optional): Whether to request JSON output
+            no_cache (bool, optional): Skip the response cache for this request
+            stream (bool, optional): Stream Claude responses; in JSON mode a response
+                that does not start like JSON is abandoned and retried early
+            cache_context (str, optional): What the prompt is about, e.g. the role,
+                industry and question; enables the similarity lookup of the
+                response cache for this request
             
         Returns:
-            dict: A dictionary containing:
+            LLMResult: The response, with fields readable as attributes or by key:
                 - 'text': The generated text response
-                - 'provider': The provider that generated the response
+                - 'provider': The provider that generated the response, or 'cache'
+                  if it was reused from the response cache
                 - 'model': The model used to generate the response
                 - 'tokens': Approximate token count (if available)
+                - 'parsed': The decoded response, for valid JSON-mode responses
         """
+        response, cache_key, namespace = self._cached_response(
+            prompt, max_tokens, temperature, system_prompt, json_mode, no_cache, cache_context
+        )
+        if response is not None:
+            return response
+        
         # Try with primary provider
         response = self._generate_with_provider(
             self.primary_provider, 
@@ -109,7 +458,8 @@ class LLMClient:
             max_tokens, 
             temperature, 
             system_prompt,
-            json_mode
+            json_mode,
+            stream
         )
         
         # If primary provider failed and fallback is configured, try fallback
@@ -121,46 +471,392 @@ class LLMClient:
                 max_tokens, 
                 temperature, 
                 system_prompt,
-                json_mode
+                json_mode,
+                stream
             )
         
+        self._store_response(cache_key, response, prompt, namespace)
         return response
     
-    def _generate_with_provider(self, provider, prompt, max_tokens, temperature, system_prompt, json_mode):
+    async def agenerate_response(self, prompt, max_tokens=None, temperature=0.7, system_prompt=None, json_mode=False, no_cache=False, stream=False, cache_context=None, on_text=None):
         """
-        Generate a response using a specific provider with retry logic.
+        Async version of generate_response for running many requests concurrently.
         
         Args:
-            provider (str): The provider to use ('gemini' or 'anthropic')
             prompt (str): The prompt to send to the LLM
             max_tokens (int, optional): Maximum number of tokens in the response
             temperature (float, optional): Sampling temperature (0.0 to 1.0)
             system_prompt (str, optional): System prompt for models that support it
             json_mode (bool, optional): Whether to request JSON output
+            no_cache (bool, optional): Skip the response cache for this request
+            stream (bool, optional): Stream Claude responses; in JSON mode a response
+                that does not start like JSON is abandoned and retried early
+            cache_context (str, optional): As for generate_response
+            on_text (callable, optional): Called with each piece of the response text
+                as it arrives; Claude responses are then streamed, while Gemini and
+                cached responses arrive in one piece. Text from an attempt that
+                fails is not withdrawn, so compare the result's text with what was
+                received if that matters
             
         Returns:
-            dict or None: Response dictionary or None if all attempts failed
+            LLMResult: The response, as returned by generate_response,
+                or None if all providers failed
         """
-        if provider not in ['gemini', 'anthropic']:
-            logger.error(f"Unknown provider: {provider}")
+        response, cache_key, namespace = self._cached_response(
+            prompt, max_tokens, temperature, system_prompt, json_mode, no_cache, cache_context
+        )
+        if response is not None:
+            if on_text is not None:
+                on_text(response.text)
+            return response
+        
+        # Try with primary provider
+        response = await self._agenerate_with_provider(
+            self.primary_provider,
+            prompt,
+            max_tokens,
+            temperature,
+            system_prompt,
+            json_mode,
+            stream,
+            on_text
+        )
+        
+        # If primary provider failed and fallback is configured, try fallback
+        if response is None and self.fallback_provider:
+            logger.warning(f"Primary provider {self.primary_provider} failed. Trying fallback provider {self.fallback_provider}")
+            response = await self._agenerate_with_provider(
+                self.fallback_provider,
+                prompt,
+                max_tokens,
+                temperature,
+                system_prompt,
+                json_mode,
+                stream,
+                on_text
+            )
+        
+        self._store_response(cache_key, response, prompt, namespace)
+        return response
+    
+    async def generate_response_batch(self, requests, max_concurrency=8):
+        """
+        Generate responses for many prompts concurrently.
+        
+        Requests are sent through agenerate_response, so each one gets the same
+        retries and fallback as a single call, and all of them share the async
+        clients' connection pools.
+        
+        Args:
+            requests (list): Dictionaries of agenerate_response keyword arguments,
+                each with at least a 'prompt'
+            max_concurrency (int, optional): Maximum number of requests in flight
+            
+        Returns:
+            list: LLMResults in the order of the requests, with None
+                for any request that failed on all providers
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def run(request):
+            async with semaphore:
+                try:
+                    return await self.agenerate_response(**request)
+                except Exception as e:
+                    logger.error(f"Batch request failed: {e}")
+                    return None
+        
+        return await asyncio.gather(*(run(request) for request in requests))
+    
+    def generate_responses(self, requests, max_concurrency=8):
+        """
+        Synchronous wrapper around generate_response_batch.
+        
+        Runs the batch in its own event loop and closes the async clients
+        before the loop ends. Do not call this from inside a running loop.
+        
+        Args:
+            requests (list): Dictionaries of generate_response keyword arguments,
+                each with at least a 'prompt'
+            max_concurrency (int, optional): Maximum number of requests in flight
+            
+        Returns:
+            list: LLMResults in the order of the requests, with None
+                for any request that failed on all providers
+        """
+        async def run_batch():
+            try:
+                return await self.generate_response_batch(requests, max_concurrency)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run_batch())
+    
+    async def aclose(self):
+        """
+        Close the async Claude clients of the running event loop.
+        
+        The clients' connection pool belongs to the event loop it was used in,
+        so call this before that loop ends; new clients are created on next use.
+        Clients used in other event loops are left open.
+        """
+        async_clients = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if async_clients is None:
+            return
+        
+        http_client, clients = async_clients
+        for client in clients.values():
+            await client.close()
+        await http_client.aclose()
+    
+    def _next_anthropic_key(self):
+        """
+        Pick the Claude API key for the next request.
+        
+        Keys are used in turn, skipping any key still cooling down after a
+        rate limit error. If every key is cooling down, the one that becomes
+        available soonest is used.
+        
+        Returns:
+            int: Index of the key in anthropic_api_keys
+        """
+        with self._anthropic_key_lock:
+            now = time.monotonic()
+            for _ in range(len(self.anthropic_clients)):
+                index = next(self._anthropic_key_cycle)
+                if self._anthropic_key_cooldown.get(index, 0) <= now:
+                    return index
+            return min(self._anthropic_key_cooldown, key=self._anthropic_key_cooldown.get)
+    
+    def _cool_down_anthropic_key(self, index):
+        """
+        Take a rate-limited Claude API key out of the rotation for KEY_COOLDOWN_SECONDS.
+        
+        Args:
+            index (int): Index of the key in anthropic_api_keys
+        """
+        with self._anthropic_key_lock:
+            self._anthropic_key_cooldown[index] = time.monotonic() + KEY_COOLDOWN_SECONDS
+        if len(self.anthropic_clients) > 1:
+            logger.warning(f"Claude API key {index + 1}/{len(self.anthropic_clients)} rate limited; skipping it for {KEY_COOLDOWN_SECONDS:.0f} seconds")
+    
+    def submit_batch(self, requests):
+        """
+        Submit requests to the Claude Message Batches API.
+        
+        Batched requests are billed at a discount and are not subject to the
+        per-minute rate limits, at the cost of results arriving asynchronously.
+        
+        Args:
+            requests (list): Dictionaries with a unique 'custom_id' (letters, digits,
+                '-' and '_', up to 64 characters) plus 'prompt' and optionally
+                'max_tokens', 'temperature', 'system_prompt' and 'json_mode'
+            
+        Returns:
+            str or None: The batch ID, or None if the batch could not be submitted
+        """
+        if not self.anthropic_api_key or self.anthropic_client is None:
+            logger.error("Claude client not configured; cannot submit a batch")
             return None
         
-        # Check if the provider is properly initialized
-        if provider == 'gemini' and not self.gemini_api_key:
-            logger.error("Gemini API key not configured")
+        batch_requests = [
+            {
+                "custom_id": request['custom_id'],
+                "params": self._build_claude_params(
+                    request['prompt'],
+                    request.get('max_tokens'),
+                    request.get('temperature', 0.7),
+                    request.get('system_prompt'),
+                    request.get('json_mode', False)
+                )
+            }
+            for request in requests
+        ]
+        
+        try:
+            batch = self.anthropic_client.messages.batches.create(requests=batch_requests)
+        except Exception as e:
+            logger.error(f"Failed to submit batch of {len(batch_requests)} requests: {e}")
             return None
         
-        if provider == 'anthropic' and not self.anthropic_api_key:
-            logger.error("Claude API key not configured")
+        logger.info(f"Submitted batch {batch.id} with {len(batch_requests)} requests")
+        return batch.id
+    
+    def poll_batch(self, batch_id, poll_interval=30, max_poll_interval=300, json_mode=False, timeout=None):
+        """
+        Wait for a submitted batch to finish and collect its results.
+        
+        The batch status is polled with exponential backoff between
+        poll_interval and max_poll_interval seconds. Connection and API errors
+        while polling or reading the results are logged and retried with the
+        same backoff, so a transient failure does not lose the batch.
+        
+        Args:
+            batch_id (str): ID returned by submit_batch
+            poll_interval (float, optional): Seconds to wait before the second poll
+            max_poll_interval (float, optional): Longest wait between polls
+            json_mode (bool, optional): Whether the requests asked for JSON output
+            timeout (float, optional): Seconds to wait for the batch before canceling
+                it; None waits until it ends
+            
+        Returns:
+            dict or None: LLMResult as returned by generate_response by custom_id, with
+                None for requests that errored, expired or were canceled; None if the
+                batch did not end within the timeout
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        delay = poll_interval
+        while True:
+            try:
+                batch = self.anthropic_client.messages.batches.retrieve(batch_id)
+                if batch.processing_status == 'ended':
+                    return self._batch_results(batch_id, json_mode)
+                logger.info(f"Batch {batch_id} is {batch.processing_status}; checking again in {delay} seconds")
+            except (APIError, httpx.HTTPError) as e:
+                logger.warning(f"Error checking batch {batch_id}, retrying in {delay} seconds: {e}")
+            
+            if deadline is not None and time.monotonic() + delay > deadline:
+                logger.error(f"Batch {batch_id} did not finish within {timeout} seconds, canceling it")
+                try:
+                    self.anthropic_client.messages.batches.cancel(batch_id)
+                except (APIError, httpx.HTTPError) as e:
+                    logger.error(f"Failed to cancel batch {batch_id}: {e}")
+                return None
+            time.sleep(delay)
+            delay = min(delay * 2, max_poll_interval)
+    
+    def _batch_results(self, batch_id, json_mode):
+        """
+        Read the results of an ended batch.
+        
+        Args:
+            batch_id (str): ID of the batch
+            json_mode (bool): Whether the requests asked for JSON output
+            
+        Returns:
+            dict: LLMResult by custom_id, or None for requests that did not succeed
+        """
+        results = {}
+        for entry in self.anthropic_client.messages.batches.results(batch_id):
+            if entry.result.type == 'succeeded':
+                results[entry.custom_id] = self._claude_result(entry.result.message, json_mode)
+            else:
+                logger.warning(f"Batch request {entry.custom_id} did not succeed: {entry.result.type}")
+                results[entry.custom_id] = None
+        return results
+    
+    def _gemini_configured(self):
+        """Return True if a Gemini API key is configured."""
+        return bool(self.gemini_api_key)
+    
+    def _anthropic_configured(self):
+        """Return True if a Claude API key is configured."""
+        return bool(self.anthropic_api_key)
+    
+    def _provider_available(self, provider):
+        """
+        Check that a provider is known and has an API key configured.
+        
+        Args:
+            provider (str): The provider to check ('gemini' or 'anthropic')
+            
+        Returns:
+            bool: True if requests can be sent to the provider
+        """
+        if provider not in self._providers:
+            logger.error(f"Unknown provider: {provider}")
+            return False
+        
+        # Check if the provider is properly initialized
+        name, configured, _, _ = self._providers[provider]
+        if not configured():
+            logger.error(f"{name} API key not configured")
+            return False
+        
+        return True
+    
+    def _retry_wait(self, attempt):
+        """
+        Get the exponential backoff delay before the next attempt.
+        
+        Args:
+            attempt (int): The attempt that just failed, starting at 1
+            
+        Returns:
+            float: Seconds to wait
+        """
+        retry_delay = self.retry_delay * (2 ** (attempt - 1))  # Exponential backoff
+        jitter = _thread_random().uniform(0, 0.1 * retry_delay)  # Add jitter (0-10%)
+        return retry_delay + jitter
+    
+    def _attempt_timeout(self, provider, attempt, max_tokens):
+        """
+        Get the timeout for one attempt with a provider.
+        
+        Once a provider has answered requests with the same max_tokens, attempts
+        time out at a multiple of their smoothed latency (never below
+        min_request_timeout_seconds), so a stalled request is retried early
+        instead of waiting out the full request timeout. The last attempt, and
+        any request size not seen yet, gets the full timeout.
+        
+        Args:
+            provider (str): The provider to use
+            attempt (int): The attempt about to be made, starting at 1
+            max_tokens (int, optional): Maximum number of tokens in the response
+            
+        Returns:
+            float: Timeout in seconds
+        """
+        latency = self._latency_ewma.get((provider, max_tokens))
+        if latency is None or attempt == self.max_retries:
+            return self.request_timeout
+        return min(self.request_timeout, max(self.min_request_timeout, ADAPTIVE_TIMEOUT_FACTOR * latency))
+    
+    def _record_latency(self, provider, max_tokens, elapsed):
+        """
+        Fold the latency of a successful call into the moving average for its provider and size.
+        
+        Args:
+            provider (str): The provider that answered
+            max_tokens (int, optional): Maximum number of tokens the call allowed
+            elapsed (float): Seconds the call took
+        """
+        key = (provider, max_tokens)
+        latency = self._latency_ewma.get(key)
+        if latency is None:
+            self._latency_ewma[key] = elapsed
+        else:
+            self._latency_ewma[key] = (1 - LATENCY_EWMA_WEIGHT) * latency + LATENCY_EWMA_WEIGHT * elapsed
+    
+    def _generate_with_provider(self, provider, prompt, max_tokens, temperature, system_prompt, json_mode, stream=False):
+        """
+        Generate a response using a specific provider with retry logic.
+        
+        Args:
+            provider (str): The provider to use ('gemini' or 'anthropic')
+            prompt (str): The prompt to send to the LLM
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for models that support it
+            json_mode (bool, optional): Whether to request JSON output
+            stream (bool, optional): Whether to stream Claude responses
+            
+        Returns:
+            LLMResult or None: The response, or None if all attempts failed
+        """
+        if not self._provider_available(provider):
             return None
         
+        _, _, generate, _ = self._providers[provider]
+        
         # Implement retry logic
         for attempt in range(1, self.max_retries + 1):
+            timeout = self._attempt_timeout(provider, attempt, max_tokens)
+            start_time = time.monotonic()
             try:
-                if provider == 'gemini':
-                    return self._generate_with_gemini(prompt, max_tokens, temperature, system_prompt, json_mode)
-                else:  # anthropic
-                    return self._generate_with_claude(prompt, max_tokens, temperature, system_prompt, json_mode)
+                result = generate(prompt, max_tokens, temperature, system_prompt, json_mode, timeout, stream)
+                self._record_latency(provider, max_tokens, time.monotonic() - start_time)
+                return result
             
             except Exception as e:
                 logger.warning(f"Attempt {attempt}/{self.max_retries} with {provider} failed: {str(e)}")
@@ -171,66 +867,93 @@ class LLMClient:
                     return None
                 
                 # Otherwise, wait before retrying with exponential backoff
-                retry_delay = self.retry_delay * (2 ** (attempt - 1))  # Exponential backoff
-                jitter = random.uniform(0, 0.1 * retry_delay)  # Add jitter (0-10%)
-                wait_time = retry_delay + jitter
+                wait_time = self._retry_wait(attempt)
                 
                 logger.info(f"Retrying in {wait_time:.2f} seconds...")
                 time.sleep(wait_time)
     
-    def _generate_with_gemini(self, prompt, max_tokens, temperature, system_prompt, json_mode):
+    async def _agenerate_with_provider(self, provider, prompt, max_tokens, temperature, system_prompt, json_mode, stream=False, on_text=None):
         """
-        Generate a response using the Gemini API.
+        Async version of _generate_with_provider; waits between retries without blocking the event loop.
         
         Args:
-            prompt (str): The prompt to send to Gemini
+            provider (str): The provider to use ('gemini' or 'anthropic')
+            prompt (str): The prompt to send to the LLM
             max_tokens (int, optional): Maximum number of tokens in the response
             temperature (float, optional): Sampling temperature (0.0 to 1.0)
-            system_prompt (str, optional): System prompt for Gemini
+            system_prompt (str, optional): System prompt for models that support it
             json_mode (bool, optional): Whether to request JSON output
+            stream (bool, optional): Whether to stream Claude responses
+            on_text (callable, optional): Called with the response text as it arrives
             
         Returns:
-            dict: Response dictionary
+            LLMResult or None: The response, or None if all attempts failed
         """
-        logger.debug(f"Generating response with Gemini (model: {self.gemini_model})")
+        if not self._provider_available(provider):
+            return None
         
+        _, _, _, agenerate = self._providers[provider]
+        
+        for attempt in range(1, self.max_retries + 1):
+            timeout = self._attempt_timeout(provider, attempt, max_tokens)
+            start_time = time.monotonic()
+            try:
+                result = await agenerate(prompt, max_tokens, temperature, system_prompt, json_mode, timeout, stream, on_text)
+                self._record_latency(provider, max_tokens, time.monotonic() - start_time)
+                return result
+            
+            except Exception as e:
+                logger.warning(f"Attempt {attempt}/{self.max_retries} with {provider} failed: {str(e)}")
+                
+                if attempt == self.max_retries:
+                    logger.error(f"All {self.max_retries} attempts with {provider} failed")
+                    return None
+                
+                wait_time = self._retry_wait(attempt)
+                
+                logger.info(f"Retrying in {wait_time:.2f} seconds...")
+                await asyncio.sleep(wait_time)
+    
+    def _get_gemini_model(self, model_name):
+        """
+        Get the GenerativeModel for a model name, creating it on first use.
+        
+        Generation settings vary per request and are passed to generate_content,
+        so one model object serves every request for the same model.
+        
+        Args:
+            model_name (str): Name of the Gemini model
+            
+        Returns:
+            genai.GenerativeModel: The model with the default safety settings applied
+        """
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            model = self._gemini_models[model_name] = genai.GenerativeModel(
+                model_name=model_name,
+                safety_settings=list(GEMINI_SAFETY_SETTINGS)
+            )
+        return model
+    
+    def _build_gemini_request(self, prompt, max_tokens, temperature, system_prompt):
+        """
+        Build the Gemini generation settings and content parts for a request.
+        
+        Args:
+            prompt (str): The prompt to send to Gemini
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for Gemini
+            
+        Returns:
+            tuple: The generation config and the list of content parts
+        """
         # Configure generation parameters
-        generation_config = {
-            "temperature": temperature,
-            "top_p": 0.95,
-            "top_k": 40,
-        }
+        generation_config = {**GEMINI_GENERATION_DEFAULTS, "temperature": temperature}
         
         if max_tokens:
             generation_config["max_output_tokens"] = max_tokens
         
-        # Configure safety settings (default moderate)
-        safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            }
-        ]
-        
-        # Initialize model
-        model = genai.GenerativeModel(
-            model_name=self.gemini_model,
-            generation_config=generation_config,
-            safety_settings=safety_settings
-        )
-        
         # Prepare content parts
         content_parts = []
         
@@ -241,33 +964,129 @@ class LLMClient:
         # Add user prompt
         content_parts.append({"role": "user", "parts": [prompt]})
         
-        # Generate response
-        response = model.generate_content(content_parts)
+        return generation_config, content_parts
+    
+    def _parse_json_response(self, text):
+        """
+        Decode a JSON-mode response that starts like a JSON object or array.
         
+        Args:
+            text (str): The response text
+            
+        Returns:
+            Any: The decoded value, or None if the text is not valid JSON
+        """
+        # Peek at the first non-space character instead of stripping the whole
+        # response; a malformed body fails fast in the decoder anyway
+        first = text[:64].lstrip()[:1]
+        if first not in ('{', '['):
+            return None
+        
+        try:
+            return json_utils.loads(text)
+        except json_utils.JSONDecodeError as e:
+            logger.warning(f"Requested JSON output but received invalid JSON: {e}")
+            return None
+    
+    def _gemini_result(self, response, json_mode):
+        """
+        Convert a Gemini response into an LLMResult.
+        
+        Args:
+            response: The response returned by the Gemini API
+            json_mode (bool): Whether JSON output was requested
+            
+        Returns:
+            LLMResult: The response
+        """
         # Extract text from response
         text = response.text
         
-        # Parse JSON if requested and response looks like JSON
-        if json_mode and text.strip().startswith('{') and text.strip().endswith('}'):
-            try:
-                # Try to parse as JSON to validate
-                json.loads(text)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Requested JSON output but received invalid JSON: {e}")
-        
-        # Construct result dictionary
-        result = {
-            'text': text,
-            'provider': 'gemini',
-            'model': self.gemini_model,
-            'tokens': None  # Gemini doesn't provide token count directly
-        }
+        # Parse JSON if requested, handing the decoded value on so callers don't parse it again
+        parsed = self._parse_json_response(text) if json_mode else None
+        
+        # Gemini doesn't provide token count directly
+        return LLMResult(text, 'gemini', self.gemini_model, None, parsed)
+    
+    def _generate_with_gemini(self, prompt, max_tokens, temperature, system_prompt, json_mode, timeout=None, stream=False):
+        """
+        Generate a response using the Gemini API.
+        
+        Args:
+            prompt (str): The prompt to send to Gemini
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for Gemini
+            json_mode (bool, optional): Whether to request JSON output
+            timeout (float, optional): Request timeout in seconds; defaults to the client's
+                request_timeout_seconds
+            stream (bool, optional): Ignored; Gemini responses are returned whole
+            
+        Returns:
+            LLMResult: The response
+        """
+        logger.debug(f"Generating response with Gemini (model: {self.gemini_model})")
+        
+        generation_config, content_parts = self._build_gemini_request(prompt, max_tokens, temperature, system_prompt)
+        
+        # Generate response; SDK releases without request_options use their own timeout
+        options = {}
+        if _gemini_accepts_request_options():
+            options['request_options'] = {"timeout": timeout or self.request_timeout}
+        response = self._get_gemini_model(self.gemini_model).generate_content(
+            content_parts,
+            generation_config=generation_config,
+            **options
+        )
         
+        return self._gemini_result(response, json_mode)
+    
+    async def _agenerate_with_gemini(self, prompt, max_tokens, temperature, system_prompt, json_mode, timeout=None, stream=False, on_text=None):
+        """
+        Generate a response using the Gemini async API.
+        
+        Args:
+            prompt (str): The prompt to send to Gemini
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for Gemini
+            json_mode (bool, optional): Whether to request JSON output
+            timeout (float, optional): Request timeout in seconds; defaults to the client's
+                request_timeout_seconds
+            stream (bool, optional): Ignored; Gemini responses are returned whole
+            on_text (callable, optional): Called once with the whole response text
+            
+        Returns:
+            LLMResult: The response
+        """
+        logger.debug(f"Generating async response with Gemini (model: {self.gemini_model})")
+        
+        generation_config, content_parts = self._build_gemini_request(prompt, max_tokens, temperature, system_prompt)
+        
+        # SDK releases without request_options get the timeout from wait_for instead
+        if _gemini_accepts_request_options():
+            response = await self._get_gemini_model(self.gemini_model).generate_content_async(
+                content_parts,
+                generation_config=generation_config,
+                request_options={"timeout": timeout or self.request_timeout}
+            )
+        else:
+            response = await asyncio.wait_for(
+                self._get_gemini_model(self.gemini_model).generate_content_async(
+                    content_parts,
+                    generation_config=generation_config
+                ),
+                timeout or self.request_timeout
+            )
+        
+        result = self._gemini_result(response, json_mode)
+        if on_text is not None:
+            on_text(result.text)
         return result
     
-    def _generate_with_claude(self, prompt, max_tokens, temperature, system_prompt, json_mode):
+    def _build_claude_params(self, prompt, max_tokens, temperature, system_prompt, json_mode):
         """
-        Generate a response using the Claude API.
+        Build the request parameters for the Claude messages API.
         
         Args:
             prompt (str): The prompt to send to Claude
@@ -277,10 +1096,8 @@ class LLMClient:
             json_mode (bool, optional): Whether to request JSON output
             
         Returns:
-            dict: Response dictionary
+            dict: Keyword arguments for messages.create
         """
-        logger.debug(f"Generating response with Claude (model: {self.anthropic_model})")
-        
         # Prepare request parameters
         params = {
             "model": self.anthropic_model,
@@ -304,33 +1121,174 @@ class LLMClient:
             else:
                 params["system"] = json_instruction
         
-        # Generate response
-        response = self.anthropic_client.messages.create(**params)
+        return params
+    
+    def _json_prefix_checked(self, prefix):
+        """
+        Check the start of a streamed JSON-mode response.
+        
+        Args:
+            prefix (str): The text received so far
+            
+        Returns:
+            bool: True once an object or array has opened, False while the
+                first JSON_PREFIX_LIMIT characters have not been read yet
+            
+        Raises:
+            MalformedJSONError: If no object or array opens within JSON_PREFIX_LIMIT characters
+        """
+        head = prefix[:JSON_PREFIX_LIMIT]
+        if any(char in head for char in JSON_START_CHARS):
+            return True
+        if len(prefix) < JSON_PREFIX_LIMIT:
+            return False
+        raise MalformedJSONError(f"Requested JSON output but response starts with {prefix.lstrip()[:40]!r}")
+    
+    def _check_json_stream(self, text_stream):
+        """
+        Read a streamed JSON-mode response until its start shows whether it contains JSON.
         
+        Raising here closes the stream, so no more tokens are generated for a
+        response that would fail validation anyway; the retry loop tries again.
+        
+        Args:
+            text_stream: Iterator over the response's text deltas
+        """
+        prefix = ''
+        for text in text_stream:
+            prefix += text
+            if self._json_prefix_checked(prefix):
+                return
+    
+    def _claude_result(self, response, json_mode):
+        """
+        Convert a Claude response into an LLMResult.
+        
+        Args:
+            response: The message returned by the Claude API
+            json_mode (bool): Whether JSON output was requested
+            
+        Returns:
+            LLMResult: The response
+        """
         # Extract text from response
         text = response.content[0].text
         
-        # Parse JSON if requested and response looks like JSON
-        if json_mode and text.strip().startswith('{') and text.strip().endswith('}'):
-            try:
-                # Try to parse as JSON to validate
-                json.loads(text)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Requested JSON output but received invalid JSON: {e}")
-        
-        # Construct result dictionary
-        result = {
-            'text': text,
-            'provider': 'anthropic',
-            'model': self.anthropic_model,
-            'tokens': {
-                'input': response.usage.input_tokens,
-                'output': response.usage.output_tokens,
-                'total': response.usage.input_tokens + response.usage.output_tokens
-            }
+        # Parse JSON if requested, handing the decoded value on so callers don't parse it again
+        parsed = self._parse_json_response(text) if json_mode else None
+        
+        tokens = {
+            'input': response.usage.input_tokens,
+            'output': response.usage.output_tokens,
+            'total': response.usage.input_tokens + response.usage.output_tokens
         }
+        return LLMResult(text, 'anthropic', self.anthropic_model, tokens, parsed)
+    
+    def _generate_with_claude(self, prompt, max_tokens, temperature, system_prompt, json_mode, timeout=None, stream=False):
+        """
+        Generate a response using the Claude API.
         
-        return result
+        Args:
+            prompt (str): The prompt to send to Claude
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for Claude
+            json_mode (bool, optional): Whether to request JSON output
+            timeout (float, optional): Request timeout in seconds; defaults to the client's
+                request_timeout_seconds
+            stream (bool, optional): Receive the response as a stream, checking
+                JSON-mode output as it arrives
+            
+        Returns:
+            LLMResult: The response
+        """
+        logger.debug(f"Generating response with Claude (model: {self.anthropic_model})")
+        
+        params = self._build_claude_params(prompt, max_tokens, temperature, system_prompt, json_mode)
+        
+        # Generate response with the next API key in the rotation
+        key_index = self._next_anthropic_key()
+        client = self.anthropic_clients[key_index]
+        try:
+            if stream:
+                with client.messages.stream(**params, timeout=timeout or self.request_timeout) as message_stream:
+                    if json_mode:
+                        self._check_json_stream(message_stream.text_stream)
+                    response = message_stream.get_final_message()
+            else:
+                response = client.messages.create(**params, timeout=timeout or self.request_timeout)
+        except RateLimitError:
+            self._cool_down_anthropic_key(key_index)
+            raise
+        
+        return self._claude_result(response, json_mode)
+    
+    async def _agenerate_with_claude(self, prompt, max_tokens, temperature, system_prompt, json_mode, timeout=None, stream=False, on_text=None):
+        """
+        Generate a response using the async Claude client.
+        
+        Args:
+            prompt (str): The prompt to send to Claude
+            max_tokens (int, optional): Maximum number of tokens in the response
+            temperature (float, optional): Sampling temperature (0.0 to 1.0)
+            system_prompt (str, optional): System prompt for Claude
+            json_mode (bool, optional): Whether to request JSON output
+            timeout (float, optional): Request timeout in seconds; defaults to the client's
+                request_timeout_seconds
+            stream (bool, optional): Receive the response as a stream, checking
+                JSON-mode output as it arrives
+            on_text (callable, optional): Called with each text delta as it arrives;
+                implies stream
+            
+        Returns:
+            LLMResult: The response
+        """
+        logger.debug(f"Generating async response with Claude (model: {self.anthropic_model})")
+        
+        key_index = self._next_anthropic_key()
+        loop = asyncio.get_running_loop()
+        async_clients = self._async_clients.get(loop)
+        if async_clients is None:
+            async_clients = self._async_clients[loop] = (
+                httpx.AsyncClient(limits=HTTP_POOL_LIMITS, timeout=self._http_timeout(), http2=HTTP2_AVAILABLE),
+                {}
+            )
+        http_client, clients = async_clients
+        client = clients.get(key_index)
+        if client is None:
+            client = clients[key_index] = AsyncAnthropic(
+                api_key=self.anthropic_api_keys[key_index],
+                http_client=http_client
+            )
+        
+        params = self._build_claude_params(prompt, max_tokens, temperature, system_prompt, json_mode)
+        
+        try:
+            if stream or on_text is not None:
+                async with client.messages.stream(**params, timeout=timeout or self.request_timeout) as message_stream:
+                    if on_text is not None:
+                        # Pass every delta on, checking a JSON-mode prefix as it goes
+                        prefix = '' if json_mode else None
+                        async for text in message_stream.text_stream:
+                            if prefix is not None:
+                                prefix += text
+                                if self._json_prefix_checked(prefix):
+                                    prefix = None
+                            on_text(text)
+                    elif json_mode:
+                        prefix = ''
+                        async for text in message_stream.text_stream:
+                            prefix += text
+                            if self._json_prefix_checked(prefix):
+                                break
+                    response = await message_stream.get_final_message()
+            else:
+                response = await client.messages.create(**params, timeout=timeout or self.request_timeout)
+        except RateLimitError:
+            self._cool_down_anthropic_key(key_index)
+            raise
+        
+        return self._claude_result(response, json_mode)
 
 if __name__ == '__main__':
     # Set up logging
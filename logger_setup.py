@@ -5,18 +5,47 @@ This module provides a consistent logging configuration for the entire applicati
 """
 
 import os
+import queue
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 
 # Global logger instance
 logger = logging.getLogger("star_generator")
 logger.setLevel(logging.INFO)
 
-# Add a default console handler to ensure logging works even before setup_logging is called
-console_handler = logging.StreamHandler()
-console_handler.setFormatter(logging.Formatter('%(message)s'))
-logger.addHandler(console_handler)
+# Records are discarded until setup_logging adds the real handlers, and never
+# passed on to the root logger, so nothing is formatted or written twice
+logger.addHandler(logging.NullHandler())
+logger.propagate = False
+
+# Background thread that writes queued records to the log file
+_queue_listener = None
+
+class LevelFormatter(logging.Formatter):
+    """
+    Formatter that includes the source location only for warnings and errors.
+    
+    Routine INFO and DEBUG lines skip formatting the file name and line number.
+    """
+    
+    def __init__(self, fmt, verbose_fmt, datefmt=None):
+        """
+        Initialize the formatter.
+        
+        Args:
+            fmt (str): Format for records below WARNING
+            verbose_fmt (str): Format for WARNING and above
+            datefmt (str, optional): Date format for both
+        """
+        super().__init__(fmt, datefmt=datefmt)
+        self._verbose = logging.Formatter(verbose_fmt, datefmt=datefmt)
+    
+    def format(self, record):
+        if record.levelno >= logging.WARNING:
+            return self._verbose.format(record)
+        return super().format(record)
 
 def setup_logging(log_level=None, log_dir="logs", log_to_console=True, log_to_file=True):
     """
@@ -34,6 +63,9 @@ def setup_logging(log_level=None, log_dir="logs", log_to_console=True, log_to_fi
     """
     global logger
     
+    # Flush and stop the file writer from any earlier setup
+    stop_logging()
+    
     # Convert string log level to logging constant
     if isinstance(log_level, str):
         numeric_level = getattr(logging, log_level.upper(), None)
@@ -46,7 +78,8 @@ def setup_logging(log_level=None, log_dir="logs", log_to_console=True, log_to_fi
     logger.setLevel(numeric_level)
     
     # Create formatter
-    formatter = logging.Formatter(
+    formatter = LevelFormatter(
+        '%(asctime)s - %(levelname)s - %(message)s',
         '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
@@ -78,7 +111,14 @@ def setup_logging(log_level=None, log_dir="logs", log_to_console=True, log_to_fi
                 backupCount=5
             )
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            
+            # Log calls only enqueue the record; a listener thread formats and
+            # writes it, keeping file I/O and rotation off the calling thread
+            global _queue_listener
+            log_queue = queue.SimpleQueue()
+            _queue_listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+            _queue_listener.start()
+            logger.addHandler(QueueHandler(log_queue))
             
             print(f"Logging to file: {log_file}")
             logger.info(f"Logging to file: {log_file}")
@@ -90,6 +130,18 @@ def setup_logging(log_level=None, log_dir="logs", log_to_console=True, log_to_fi
     logger.info(f"Logging configured with level: {logging.getLevelName(numeric_level)}")
     return logger
 
+@atexit.register
+def stop_logging():
+    """
+    Stop the background log writer, flushing any queued records to the file.
+    
+    Safe to call more than once; setup_logging starts a new writer if called again.
+    """
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
 if __name__ == "__main__":
     # Example usage
     test_logger = setup_logging(log_level="DEBUG")
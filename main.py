@@ -13,9 +13,8 @@ from pathlib import Path
 
 # Import project modules
 from config import load_config
-from logger_setup import setup_logging, logger
+from logger_setup import setup_logging, logger, stop_logging
 from state_manager import StateManager
-from llm_client import LLMClient
 
 def parse_arguments():
     """Parse command-line arguments."""
@@ -95,7 +94,9 @@ def initialize_system(args):
     )
     state_manager = StateManager(db_path)
     
-    # Initialize LLM client
+    # Initialize LLM client; the provider SDKs are slow to import, so this
+    # waits until configuration and logging are in place
+    from llm_client import LLMClient
     llm_client = LLMClient(config)
     
     return config, state_manager, llm_client
@@ -104,7 +105,7 @@ def process_sub_prompts(config, state_manager, llm_client, args):
     """
     Process Stage 1: Generate sub-prompts for each role/question/industry combination.
     """
-    print("Stage 1: Sub-prompt generation")
+    logger.info("Stage 1: Sub-prompt generation")
     
     # Import the subprompt_generator module
     from subprompt_generator import generate_subprompts
@@ -118,7 +119,7 @@ def process_star_answers(config, state_manager, llm_client, args):
     """
     Process Stage 2: Generate STAR-format answers based on sub-prompts.
     """
-    print("Stage 2: STAR answer generation")
+    logger.info("Stage 2: STAR answer generation")
     
     # Import the star_answer_generator module
     from star_answer_generator import process_star_answers as generate_answers
@@ -140,13 +141,13 @@ def process_conversational(config, state_manager, llm_client, args):
     """
     Process Stage 3: Transform STAR answers into conversational format.
     """
-    print("Stage 3: Conversational transformation")
+    logger.info("Stage 3: Conversational transformation")
     
     # Import the conversational_transformer module
     from conversational_transformer import process_conversations as transform_conversations
     
     # Transform STAR answers to conversational format
-    success = transform_conversations(config)
+    success = transform_conversations(config, state_manager=state_manager, llm_client=llm_client)
     
     # Check if any conversational responses were successfully generated
     if success.get('processed', 0) > 0:
@@ -188,14 +189,16 @@ def main():
     )
     state_manager = StateManager(db_path)
     
-    # Initialize LLM client
+    # Initialize LLM client; the provider SDKs are slow to import, so this
+    # waits until configuration and logging are in place
+    from llm_client import LLMClient
     llm_client = LLMClient(config)
     
     # Display initialization information
-    print("STAR Answer Generation System initialized")
-    print(f"Running stage: {args.stage}")
+    logger.info("STAR Answer Generation System initialized")
+    logger.info(f"Running stage: {args.stage}")
     if args.resume:
-        print("Resuming from last successful point")
+        logger.info("Resuming from last successful point")
     
     # Apply filters if specified
     filters = []
@@ -207,7 +210,7 @@ def main():
         filters.append(f"industry={args.industry}")
     
     if filters:
-        print(f"Applying filters: {', '.join(filters)}")
+        logger.info(f"Applying filters: {', '.join(filters)}")
     
     try:
         # Process stages based on command-line argument
@@ -216,7 +219,15 @@ def main():
         # Track success of each stage
         stage_success = True
         
-        if args.stage in ['all', 'sub_prompts']:
+        # Run the stages concurrently, each item moving on as soon as it is done
+        pipelined = args.stage == 'all' and config.get('pipeline_stages', False)
+        
+        if pipelined:
+            logger.info("Running all stages as a pipeline")
+            from pipeline import run_pipeline
+            stage_success = run_pipeline(config, db_path, llm_client, args)
+        
+        elif args.stage in ['all', 'sub_prompts']:
             sub_prompts_success = process_sub_prompts(config, state_manager, llm_client, args)
             stage_success = stage_success and sub_prompts_success
             
@@ -225,7 +236,7 @@ def main():
                 logger.warning("Skipping subsequent stages due to errors in sub-prompt generation")
                 stage_success = False
             
-        if stage_success and args.stage in ['all', 'star_answers']:
+        if stage_success and args.stage in ['all', 'star_answers'] and not pipelined:
             star_answers_success = process_star_answers(config, state_manager, llm_client, args)
             stage_success = stage_success and star_answers_success
             
@@ -234,33 +245,33 @@ def main():
                 logger.warning("Skipping conversational stage due to errors in STAR answer generation")
                 stage_success = False
         
-        if stage_success and args.stage in ['all', 'conversational']:
+        if stage_success and args.stage in ['all', 'conversational'] and not pipelined:
             conversational_success = process_conversational(config, state_manager, llm_client, args)
         
         # Display completion information
         elapsed_time = time.time() - start_time
-        print(f"Processing completed in {elapsed_time:.2f} seconds")
+        logger.info(f"Processing completed in {elapsed_time:.2f} seconds")
         
         # Display processing summary
         if args.stage == 'all':
-            print("Overall processing summary:")
+            logger.info("Overall processing summary:")
             summary = state_manager.get_summary()
             if summary:
                 for status, count in summary.items():
                     if status != 'total':
-                        print(f"  {status}: {count}")
-                print(f"  Total: {summary.get('total', 0)}")
+                        logger.info(f"  {status}: {count}")
+                logger.info(f"  Total: {summary.get('total', 0)}")
         
     except KeyboardInterrupt:
-        print("Processing interrupted by user")
+        logger.warning("Processing interrupted by user")
     except Exception as e:
-        print(f"An error occurred during processing: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"An error occurred during processing: {e}")
     finally:
         # Clean up resources
+        llm_client.close()
         state_manager.close()
-        print("STAR Answer Generation System shutdown complete")
+        logger.info("STAR Answer Generation System shutdown complete")
+        stop_logging()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,120 @@
+"""
+Staged Pipeline Module
+
+This module runs the three processing stages concurrently instead of one after
+another. Each stage runs on its own thread and hands every finished item to
+the next stage through a bounded queue, so STAR answers are generated while
+later sub-prompts are still being written, and conversations while later STAR
+answers are. A full queue holds the stage feeding it back until the next stage
+catches up.
+
+State is committed per item exactly as in sequential runs, so --resume picks
+up where an interrupted pipeline stopped.
+"""
+
+import queue
+import threading
+
+from logger_setup import logger
+from state_manager import StateManager
+
+# Finished items buffered between two stages before the upstream stage waits
+PIPELINE_QUEUE_SIZE = 32
+
+def _run_stage(name, stage, output_queue, results):
+    """
+    Run one stage and mark the end of its output.
+    
+    Args:
+        name (str): Stage name, used for logging and as the results key
+        stage (callable): Runs the stage and returns its result
+        output_queue (queue.Queue): Queue the stage writes to; None is put on
+            it once the stage finishes, even if the stage raised
+        results (dict): Receives the stage's result, or the exception it raised
+    """
+    try:
+        results[name] = stage()
+    except Exception as e:
+        logger.error(f"Error in pipeline stage {name}: {e}")
+        results[name] = e
+    finally:
+        output_queue.put(None)
+
+def run_pipeline(config, db_path, llm_client, args=None):
+    """
+    Run sub-prompt generation, STAR answer generation and conversational
+    transformation concurrently.
+    
+    Args:
+        config (dict): Configuration dictionary
+        db_path (str): Path to the state database
+        llm_client (LLMClient): LLM client shared by all stages
+        args (argparse.Namespace, optional): Command-line arguments
+    
+    Returns:
+        bool: True if every stage completed without errors, False otherwise
+    """
+    from subprompt_generator import generate_subprompts
+    from star_answer_generator import process_star_answers
+    from conversational_transformer import process_conversations, process_conversation_queue
+    
+    subprompt_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    star_answer_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    results = {}
+    
+    # Each stage thread opens its own state manager, since the StateManager
+    # cursor cannot be shared between threads
+    def sub_prompts():
+        state_manager = StateManager(db_path)
+        try:
+            return generate_subprompts(config, state_manager, llm_client, args, output_queue=subprompt_queue)
+        finally:
+            state_manager.close()
+    
+    def star_answers():
+        state_manager = StateManager(db_path)
+        try:
+            return process_star_answers(
+                config, state_manager, llm_client, args,
+                subprompt_files=iter(subprompt_queue.get, None),
+                output_queue=star_answer_queue
+            )
+        except Exception:
+            # Discard the remaining sub-prompt files so that stage is not left
+            # waiting on a full queue
+            for _ in iter(subprompt_queue.get, None):
+                pass
+            raise
+        finally:
+            state_manager.close()
+    
+    threads = [
+        threading.Thread(target=_run_stage, args=('sub_prompts', sub_prompts, subprompt_queue, results), daemon=True),
+        threading.Thread(target=_run_stage, args=('star_answers', star_answers, star_answer_queue, results), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    
+    # The conversational stage consumes on this thread's worker pool until the STAR stage finishes
+    conversation_stats = process_conversation_queue(config, star_answer_queue, db_path, llm_client)
+    for thread in threads:
+        thread.join()
+    
+    logger.info(f"Pipeline conversational stage: {conversation_stats}")
+    
+    # Answers completed before a resumed run are never queued, so finish with a
+    # pass over the answers directory; anything already converted is skipped
+    state_manager = StateManager(db_path)
+    try:
+        process_conversations(config, state_manager=state_manager, llm_client=llm_client)
+    finally:
+        state_manager.close()
+    
+    sub_prompts_result = results.get('sub_prompts')
+    star_answers_result = results.get('star_answers')
+    if isinstance(sub_prompts_result, Exception) or isinstance(star_answers_result, Exception):
+        return False
+    
+    return bool(sub_prompts_result) and not (
+        star_answers_result.get('total', 0) > 0 and star_answers_result.get('processed', 0) == 0
+    )
@@ -8,14 +8,156 @@ It includes functions for loading role-specific skills and other dynamic content
 import os
 import re
 import json
+import time
+import logging
+import functools
 from pathlib import Path
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from logger_setup import logger
 
+# Configuration used when a caller does not pass one
+DEFAULT_CONFIG_PATH = 'config.yaml'
+
+# Directory holding the per-role skills files
+SKILLS_DIR = 'prompt_templates/role_skills'
+
+# Role name with its abbreviation in parentheses, e.g. "Technical Delivery Manager (TDM)"
+_ROLE_BASE_RE = re.compile(r'(.+?)\s*\([^)]+\)')
+_ABBR_RE = re.compile(r'\(([^)]+)\)')
+
+# Question number in a question or prompt ID, e.g. "Q1"
+_QNUM_RE = re.compile(r'Q(\d+)')
+
+# Template placeholders: [PARAM_NAME] (used in stage1 and stage2) or
+# {{PARAM_NAME}} (used in stage3 - conversational)
+_PLACEHOLDER_RE = re.compile(r'\[(\w+)\]|\{\{(\w+)\}\}')
+
+# Parameters recorded in the header of saved prompt logs
+_PROMPT_LOG_PARAMS = (
+    'TARGET_ROLE', 'TARGET_INDUSTRY', 'CORE_INTERVIEW_QUESTION',
+    'SKILL_FOCUS', 'SOFT_SKILL_HIGHLIGHT', 'SCENARIO_THEME_HINT',
+    'PROMPT_ID'
+)
+
+# Common patterns for STAR answer filenames, tried in order. The groups of
+# pattern n are named role{n}, q{n} and ind{n}
+_STAR_FILE_PATTERNS = (
+    r'(?P<role1>[a-z]+)_q(?P<q1>\d+)_(?P<ind1>[a-z]+)_\d+_star',  # tdm_q1_fin_1_star.json
+    r'(?P<role2>[a-z]+)_q?(?P<q2>\d+)_(?P<ind2>[a-z]+)\w*\.json',  # any variation with role, q, industry
+    r'(?P<role3>[a-z]{2,5}).*?(?P<q3>[0-9]+).*?(?P<ind3>[a-z]{2,5})',  # fallback - extract any likely abbr+number+abbr pattern
+)
+
+# The patterns above as one regex. Each alternative is anchored at the start
+# with a lazy prefix, so the engine exhausts an earlier pattern before trying
+# the next and matches the same text as trying the patterns in order
+_STAR_FILE_RE = re.compile('|'.join(f'(?s:.*?){pattern}' for pattern in _STAR_FILE_PATTERNS))
+
+# Writes saved prompt logs in the background, in submission order; callers
+# never read the log files back, so they need not wait for the write
+_prompt_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prompt-log')
+
+@functools.lru_cache(maxsize=16)
+def _ensure_dir(path):
+    """
+    Create a directory once per process.
+    
+    Args:
+        path (str): Directory to create
+    """
+    os.makedirs(path, exist_ok=True)
+
+def _write_prompt_file(file_path, content):
+    """
+    Write a saved prompt log; runs on the prompt log writer thread.
+    
+    Args:
+        file_path (str): Path to the log file
+        content (str): Complete file content
+    """
+    try:
+        # One encode and one binary write, without the text layer's buffering
+        with open(file_path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        logger.info(f"Saved full prompt to: {file_path}")
+    except Exception as e:
+        logger.error(f"Error saving full prompt: {e}")
+
+def wait_for_prompt_logs():
+    """
+    Block until every prompt log submitted so far has been written.
+    """
+    # The writer runs one task at a time in order, so once this no-op has run
+    # all earlier writes have finished
+    _prompt_writer.submit(lambda: None).result()
+
+def _get_default_config():
+    """
+    Get the configuration from config.yaml, parsed once per version of the file.
+    
+    The dictionary is shared between calls, so callers must not modify it.
+    
+    Returns:
+        dict: The configuration, or an empty dictionary if it could not be loaded
+    """
+    try:
+        mtime_ns = os.stat(DEFAULT_CONFIG_PATH).st_mtime_ns
+    except OSError:
+        mtime_ns = None
+    return _cached_default_config(mtime_ns)
+
+@functools.lru_cache(maxsize=1)
+def _cached_default_config(mtime_ns):
+    """
+    Load config.yaml, cached on its modification time.
+    
+    Args:
+        mtime_ns (int): Modification time of the file, part of the cache key
+        
+    Returns:
+        dict: The configuration, or an empty dictionary if it could not be loaded
+    """
+    from config import load_config
+    logger.debug(f"Loaded config from {DEFAULT_CONFIG_PATH} for prompt processing")
+    return load_config(DEFAULT_CONFIG_PATH) or {}
+
+@functools.lru_cache(maxsize=256)
+def _read_file_cached(abs_path, mtime_ns):
+    """
+    Read a text file, cached on its path and modification time.
+    
+    Args:
+        abs_path (str): Absolute path to the file
+        mtime_ns (int): Modification time of the file, part of the cache key
+        
+    Returns:
+        str: The file content
+    """
+    with open(abs_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _read_text_file(file_path):
+    """
+    Read a text file through the cache, so an unchanged file is only read once.
+    
+    Args:
+        file_path (str): Path to the file
+        
+    Returns:
+        tuple: (file content, True if it came from the cache)
+    """
+    abs_path = os.path.abspath(file_path)
+    mtime_ns = os.stat(abs_path).st_mtime_ns
+    misses = _read_file_cached.cache_info().misses
+    content = _read_file_cached(abs_path, mtime_ns)
+    return content, _read_file_cached.cache_info().misses == misses
+
 def load_prompt_template(template_path):
     """
     Load a prompt template from a file.
     
+    Templates are cached per path and modification time, so repeated loads
+    of an unchanged file cost a stat instead of a read.
+    
     Args:
         template_path (str): Path to the template file
         
@@ -23,46 +165,64 @@ def load_prompt_template(template_path):
         str: The template content, or None if loading failed
     """
     try:
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template = f.read()
-        print(f"Loaded prompt template from {template_path}")
-        logger.debug(f"Loaded prompt template from {template_path}")
+        template, cached = _read_text_file(template_path)
+        if not cached:
+            logger.debug(f"Loaded prompt template from {template_path}")
         return template
     except FileNotFoundError:
-        print(f"Template file not found: {template_path}")
         logger.error(f"Template file not found: {template_path}")
         return None
     except Exception as e:
-        print(f"Error loading template {template_path}: {e}")
         logger.error(f"Error loading template {template_path}: {e}")
         return None
 
-def load_role_skills(role_name, config=None):
+def _skills_dir_listing():
     """
-    Load skills for a specific role from the corresponding skills file.
+    List the skills directory, cached until the directory changes.
+    
+    Returns:
+        dict: Actual file names keyed by their lowercase form
+    """
+    try:
+        mtime_ns = os.stat(SKILLS_DIR).st_mtime_ns
+    except OSError:
+        return {}
+    return _cached_skills_dir_listing(mtime_ns)
+
+@functools.lru_cache(maxsize=1)
+def _cached_skills_dir_listing(mtime_ns):
+    """
+    List the skills directory, cached on its modification time.
     
     Args:
-        role_name (str): The name of the role (e.g., "Technical Delivery Manager (TDM)")
-        config (dict, optional): Configuration dictionary containing role_mappings
+        mtime_ns (int): Modification time of the directory, part of the cache key
         
     Returns:
-        str: The role-specific skills content, or a default message if loading failed
+        dict: Actual file names keyed by their lowercase form
     """
-    # Try to load config if not provided
-    if config is None:
-        try:
-            from config import load_config
-            config = load_config('config.yaml')
-        except Exception as e:
-            logger.error(f"Error loading config for role mappings: {e}")
-            config = {}
+    # scandir reports each entry's type from the directory listing, so
+    # subdirectories are skipped without a stat per entry
+    with os.scandir(SKILLS_DIR) as entries:
+        return {entry.name.lower(): entry.name for entry in entries if entry.is_file()}
+
+@functools.lru_cache(maxsize=64)
+def _resolve_skills_file(role_name, skills_files):
+    """
+    Find the skills file for a role, cached per role and role mappings.
     
-    role_mappings = config.get('role_mappings', {})
+    Args:
+        role_name (str): The name of the role (e.g., "Technical Delivery Manager (TDM)")
+        skills_files (tuple): (mapped role, skills file) pairs from role_mappings
+        
+    Returns:
+        str or None: Path to the skills file, or None if none could be found
+    """
+    role_mappings = dict(skills_files)
     skills_file = None
     base_role_name = None
     
     # First, extract the base role name (without the abbreviation in parentheses)
-    match = re.search(r'(.+?)\s*\([^)]+\)', role_name)
+    match = _ROLE_BASE_RE.search(role_name)
     if match:
         base_role_name = match.group(1).strip()
     else:
@@ -70,63 +230,83 @@ def load_role_skills(role_name, config=None):
     
     # Try to find a direct match in role_mappings
     if base_role_name in role_mappings:
-        role_info = role_mappings[base_role_name]
-        skills_file = role_info.get('skills_file')
+        skills_file = role_mappings[base_role_name]
         logger.debug(f"Found exact role mapping for '{base_role_name}': {skills_file}")
     else:
         # Try to find a partial match (role name might be slightly different)
-        for mapped_role, role_info in role_mappings.items():
+        for mapped_role, mapped_skills_file in role_mappings.items():
             if base_role_name.startswith(mapped_role) or mapped_role.startswith(base_role_name):
-                skills_file = role_info.get('skills_file')
+                skills_file = mapped_skills_file
                 logger.debug(f"Found partial role mapping for '{base_role_name}' via '{mapped_role}': {skills_file}")
                 break
     
+    # Extract abbreviation if present
+    abbr_match = _ABBR_RE.search(role_name)
+    if abbr_match:
+        abbr = abbr_match.group(1)
+    else:
+        # No abbreviation, try to create one from the role name
+        words = role_name.split()
+        if len(words) > 1 and len(words[-1]) <= 5 and words[-1][0].isupper():
+            abbr = words[-1].upper()
+        else:
+            abbr = ''.join(word[0] for word in words if word[0].isupper())
+    
     if not skills_file:
         # Fallback to the old method if no mapping found
         logger.warning(f"No skill file mapping found for role: {role_name}")
-        
-        # Extract abbreviation if present
-        abbr_match = re.search(r'\(([^)]+)\)', role_name)
-        if abbr_match:
-            abbr = abbr_match.group(1)
-            skills_file = f"prompt_templates/role_skills/{abbr}-Skills.md"
-        else:
-            # No abbreviation, try to create one from the role name
-            words = role_name.split()
-            if len(words) > 1 and len(words[-1]) <= 5 and words[-1][0].isupper():
-                abbr = words[-1].upper()
-            else:
-                abbr = ''.join(word[0] for word in words if word[0].isupper())
-            
-            skills_file = f"prompt_templates/role_skills/{abbr}-Skills.md"
+        skills_file = f"{SKILLS_DIR}/{abbr}-Skills.md"
     
     # Check if the file exists, if not try alternative formats
     if not os.path.exists(skills_file):
-        # Try without the hyphen
-        skills_file = f"prompt_templates/role_skills/{role_abbr}Skills.md"
+        # Match the other spellings (without the hyphen, any case) against one
+        # listing of the skills directory instead of probing each name
+        listing = _skills_dir_listing()
+        for candidate in (f"{abbr}-Skills.md", f"{abbr}Skills.md"):
+            file_name = listing.get(candidate.lower())
+            if file_name:
+                return f"{SKILLS_DIR}/{file_name}"
         
-        if not os.path.exists(skills_file):
-            # Try with lowercase abbreviation
-            skills_file = f"prompt_templates/role_skills/{role_abbr.lower()}-Skills.md"
-            
-            if not os.path.exists(skills_file):
-                # Try with uppercase abbreviation
-                skills_file = f"prompt_templates/role_skills/{role_abbr.upper()}-Skills.md"
-                
-                if not os.path.exists(skills_file):
-                    print(f"Could not find skills file for role: {role_name} (tried abbreviation: {role_abbr})")
-                    logger.warning(f"Could not find skills file for role: {role_name} (tried abbreviation: {role_abbr})")
-                    return f"Skills specific to the {role_name} role"
+        logger.warning(f"Could not find skills file for role: {role_name} (tried abbreviation: {abbr})")
+        return None
+    
+    return skills_file
+
+def load_role_skills(role_name, config=None):
+    """
+    Load skills for a specific role from the corresponding skills file.
+    
+    Args:
+        role_name (str): The name of the role (e.g., "Technical Delivery Manager (TDM)")
+        config (dict, optional): Configuration dictionary containing role_mappings
+        
+    Returns:
+        str: The role-specific skills content, or a default message if loading failed
+    """
+    # Try to load config if not provided
+    if config is None:
+        try:
+            config = _get_default_config()
+        except Exception as e:
+            logger.error(f"Error loading config for role mappings: {e}")
+            config = {}
+    
+    # Resolving the file is cached per role, keyed on the role mappings it depends on
+    skills_files = tuple(
+        (mapped_role, role_info.get('skills_file'))
+        for mapped_role, role_info in config.get('role_mappings', {}).items()
+    )
+    skills_file = _resolve_skills_file(role_name, skills_files)
+    if skills_file is None:
+        return f"Skills specific to the {role_name} role"
     
     # Load the skills file content
     try:
-        with open(skills_file, 'r', encoding='utf-8') as f:
-            skills_content = f.read()
-        print(f"Loaded skills for {role_name} from {skills_file}")
-        logger.debug(f"Loaded skills for {role_name} from {skills_file}")
+        skills_content, cached = _read_text_file(skills_file)
+        if not cached:
+            logger.debug(f"Loaded skills for {role_name} from {skills_file}")
         return skills_content
     except Exception as e:
-        print(f"Error loading skills file {skills_file}: {e}")
         logger.error(f"Error loading skills file {skills_file}: {e}")
         return f"Skills specific to the {role_name} role"
 
@@ -134,6 +314,9 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
     """
     Save the full prompt to a file after parameter substitution.
     
+    The file is written by a background thread, so this returns without
+    waiting on disk I/O.
+    
     Args:
         prompt_text (str): The complete prompt text after parameter substitution
         stage_name (str): The name of the stage (e.g., 'subprompt', 'star_answer', 'conversational')
@@ -141,22 +324,16 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
         config (dict, optional): Configuration dictionary
         
     Returns:
-        str: Path to the saved file, or None if saving failed
+        str: Path the prompt is being saved to, or None if saving failed
     """
     # Load config if not provided
     if not config:
         try:
-            from config import load_config
-            config = load_config('config.yaml')
-            logger.debug(f"Loaded config for prompt logging")
+            config = _get_default_config()
         except Exception as e:
             logger.error(f"Error loading config for prompt logging: {e}")
             return None
     
-    # Always enable prompt logging by default if not specified
-    if 'save_full_prompts' not in config:
-        config['save_full_prompts'] = True
-        
     # Check if prompt logging is enabled
     if not config.get('save_full_prompts', True):  # Default to True 
         logger.debug(f"Prompt logging is disabled in config")
@@ -170,10 +347,7 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
         prompt_logs_dir = os.path.join(base_dir, config.get('prompt_logs_dir', 'prompt_logs'))
         
         # Create directory if it doesn't exist
-        os.makedirs(prompt_logs_dir, exist_ok=True)
-        
-        # Create a filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        _ensure_dir(prompt_logs_dir)
         
         # Extract identifiers from parameters if available
         role_abbr = "unknown_role"
@@ -185,7 +359,7 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
             if 'TARGET_ROLE' in parameters:
                 role = parameters['TARGET_ROLE']
                 # Try to extract abbreviation from parentheses (e.g., "Technical Delivery Manager (TDM)")
-                match = re.search(r'\(([^)]+)\)', role)
+                match = _ABBR_RE.search(role)
                 if match:
                     role_abbr = match.group(1).lower()
                 else:
@@ -194,8 +368,10 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
                         # Try to get abbreviation from config
                         if config and 'role_mappings' in config:
                             role_mappings = config.get('role_mappings', {})
+                            # Lowercase the role once; an equal name is also contained in it
+                            role_lower = role.lower()
                             for mapped_role, role_info in role_mappings.items():
-                                if mapped_role.lower() == role.lower() or mapped_role.lower() in role.lower():
+                                if mapped_role.lower() in role_lower:
                                     role_abbr = role_info.get('abbreviation', '').lower()
                                     break
                     except Exception:
@@ -211,24 +387,15 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
                 star_file = parameters['STAR_ANSWER_FILE']
                 logger.info(f"DEBUGGING - STAR_ANSWER_FILE value: {star_file}")
                 
-                # Common patterns for STAR answer filenames
-                patterns = [
-                    r'([a-z]+)_q(\d+)_([a-z]+)_\d+_star',  # tdm_q1_fin_1_star.json
-                    r'([a-z]+)_q?(\d+)_([a-z]+)\w*\.json',  # any variation with role, q, industry 
-                    r'([a-z]{2,5}).*?([0-9]+).*?([a-z]{2,5})'   # fallback - extract any likely abbr+number+abbr pattern
-                ]
-                
-                match = None
-                for pattern in patterns:
-                    match = re.search(pattern, star_file.lower())
-                    if match:
-                        logger.info(f"DEBUGGING - Matched pattern: {pattern}")
-                        break
-                        
+                # One match against the combined patterns; the industry group
+                # closes last, so its name tells which pattern matched
+                match = _STAR_FILE_RE.match(star_file.lower())
                 if match:
-                    role_abbr = match.group(1)  # e.g., 'tdm'
-                    question_id = f"q{match.group(2)}"  # e.g., 'q1'
-                    industry_abbr = match.group(3)  # e.g., 'fin'
+                    n = match.lastgroup[len('ind'):]
+                    logger.info(f"DEBUGGING - Matched pattern: {_STAR_FILE_PATTERNS[int(n) - 1]}")
+                    role_abbr = match.group(f'role{n}')  # e.g., 'tdm'
+                    question_id = f"q{match.group(f'q{n}')}"  # e.g., 'q1'
+                    industry_abbr = match.group(f'ind{n}')  # e.g., 'fin'
                     logger.info(f"DEBUGGING - Extracted role_abbr={role_abbr}, question_id={question_id}, industry_abbr={industry_abbr} from {star_file}")
                 else:
                     logger.warning(f"DEBUGGING - Failed to extract metadata from STAR_ANSWER_FILE: {star_file}")
@@ -237,12 +404,11 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
             elif 'CORE_INTERVIEW_QUESTION' in parameters:
                 question = parameters['CORE_INTERVIEW_QUESTION']
                 # Look for Q followed by a number in the question or parameters
-                match = re.search(r'Q(\d+)', question)
+                match = _QNUM_RE.search(question)
                 if match:
                     question_id = f"q{match.group(1)}"
-                elif 'PROMPT_ID' in parameters and re.search(r'Q\d+', parameters['PROMPT_ID']):
+                elif 'PROMPT_ID' in parameters and (match := _QNUM_RE.search(parameters['PROMPT_ID'])):
                     # Try to extract from PROMPT_ID if available
-                    match = re.search(r'Q(\d+)', parameters['PROMPT_ID'])
                     question_id = f"q{match.group(1)}"
                 else:
                     question_id = "q1"  # Default to q1 if no pattern found
@@ -254,8 +420,9 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
                 try:
                     if config and 'industry_mappings' in config:
                         industry_mappings = config.get('industry_mappings', {})
+                        industry_lower = industry.lower()
                         for mapped_industry, industry_info in industry_mappings.items():
-                            if mapped_industry.lower() == industry.lower() or mapped_industry.lower() in industry.lower():
+                            if mapped_industry.lower() in industry_lower:
                                 if isinstance(industry_info, dict):
                                     industry_abbr = industry_info.get('abbreviation', '').lower()
                                 else:
@@ -272,37 +439,50 @@ def save_full_prompt(prompt_text, stage_name, parameters=None, config=None):
         filename = f"{role_abbr}_{question_id}_{industry_abbr}_{stage_name}_prompt.txt"
         file_path = os.path.join(prompt_logs_dir, filename)
         
-        # Write prompt to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            # Write metadata
-            f.write("===== PROMPT METADATA =====\n")
-            f.write(f"Stage: {stage_name}\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            
-            # Write parameters if available
-            if parameters:
-                f.write("\n===== PARAMETERS =====\n")
-                # Only write key parameters to avoid very large files
-                key_params = [
-                    'TARGET_ROLE', 'TARGET_INDUSTRY', 'CORE_INTERVIEW_QUESTION', 
-                    'SKILL_FOCUS', 'SOFT_SKILL_HIGHLIGHT', 'SCENARIO_THEME_HINT',
-                    'PROMPT_ID'
-                ]
-                for key in key_params:
-                    if key in parameters:
-                        f.write(f"{key}: {parameters[key]}\n")
-            
-            # Write the full prompt
-            f.write("\n===== FULL PROMPT =====\n")
-            f.write(prompt_text)
+        # Format the metadata header and parameters block as whole strings. The
+        # timestamp only appears in the header, not the filename; time.strftime
+        # formats it without building a datetime object
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        header = f"===== PROMPT METADATA =====\nStage: {stage_name}\nTimestamp: {timestamp}\n"
+        params_block = ""
+        if parameters:
+            # Only write key parameters to avoid very large files
+            params_block = "\n===== PARAMETERS =====\n" + "".join(
+                f"{key}: {parameters[key]}\n" for key in _PROMPT_LOG_PARAMS if key in parameters
+            )
         
-        logger.info(f"Saved full prompt to: {file_path}")
+        # The file is written on the background writer; wait_for_prompt_logs
+        # blocks until it exists
+        content = header + params_block + "\n===== FULL PROMPT =====\n" + prompt_text
+        _prompt_writer.submit(_write_prompt_file, file_path, content)
         return file_path
     
     except Exception as e:
         logger.error(f"Error saving full prompt: {e}")
         return None
 
+@functools.lru_cache(maxsize=32)
+def _compile_template(template):
+    """
+    Split a template at its placeholders, cached per template.
+    
+    Args:
+        template (str): The template string with placeholders
+        
+    Returns:
+        tuple: (literal text around the placeholders, one more than there are
+            placeholders; (parameter name, placeholder text) for each placeholder)
+    """
+    literals = []
+    placeholders = []
+    last_end = 0
+    for match in _PLACEHOLDER_RE.finditer(template):
+        literals.append(template[last_end:match.start()])
+        placeholders.append((match.group(1) or match.group(2), match.group(0)))
+        last_end = match.end()
+    literals.append(template[last_end:])
+    return tuple(literals), tuple(placeholders)
+
 def substitute_parameters(template, parameters, stage_name=None, config=None):
     """
     Substitute parameters in a template.
@@ -325,25 +505,32 @@ def substitute_parameters(template, parameters, stage_name=None, config=None):
             stage_name = 'star_answer'
         elif 'STAR_ANSWER' in parameters:
             stage_name = 'conversational'
-    result = template
-    
-    # Process special parameters that require function calls
-    if 'TARGET_ROLE' in parameters and 'TARGET_ROLE_SKILLS' not in parameters:
-        parameters['TARGET_ROLE_SKILLS'] = load_role_skills(parameters['TARGET_ROLE'])
     
-    # Substitute all parameters
-    for param_name, param_value in parameters.items():
-        # Handle [PARAM_NAME] format (used in stage1 and stage2)
-        placeholder = f"[{param_name}]"
-        result = result.replace(placeholder, str(param_value))
+    if '[' not in template and '{{' not in template:
+        # Nothing to substitute; this also keeps one-off text such as
+        # already-substituted prompts out of the template cache
+        result = template
+    else:
+        # Process special parameters that require function calls
+        if 'TARGET_ROLE' in parameters and 'TARGET_ROLE_SKILLS' not in parameters:
+            parameters['TARGET_ROLE_SKILLS'] = load_role_skills(parameters['TARGET_ROLE'], config)
+        
+        # Convert each value to a string once, however many placeholders use it
+        str_params = {name: value if type(value) is str else str(value) for name, value in parameters.items()}
         
-        # Handle {{PARAM_NAME}} format (used in stage3 - conversational)
-        placeholder = f"{{{{{param_name}}}}}"
-        result = result.replace(placeholder, str(param_value))
+        # Substitute all parameters in one pass over the cached placeholder
+        # positions; placeholders without a parameter are left as they are
+        literals, placeholders = _compile_template(template)
+        parts = [literals[0]]
+        for (name, placeholder), literal in zip(placeholders, literals[1:]):
+            parts.append(str_params.get(name, placeholder))
+            parts.append(literal)
+        result = ''.join(parts)
     
-    # Add debug logging to help diagnose substitution issues
-    logger.debug(f"Parameter substitution completed. Template starts with: {result[:200]}...")
-    print(f"Parameter substitution completed. First 100 chars: {result[:100]}...")
+    # Add debug logging to help diagnose substitution issues; the check skips
+    # building the preview when debug output is off
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Parameter substitution completed. Template starts with: {result[:200]}...")
     
     # Save the full prompt if stage_name is provided
     if stage_name:
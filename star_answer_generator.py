@@ -13,20 +13,74 @@ The module follows the same resilient design principles as the rest of the syste
 """
 
 import os
-import json
+import re
 import time
+import asyncio
+import sqlite3
+import hashlib
+import functools
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
 
+import json_utils
 from logger_setup import logger
 from state_manager import StateManager, STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_COMPLETE, STATUS_FAILED
 from llm_client import LLMClient
 from prompt_processor import load_prompt_template, substitute_parameters, load_role_skills
 
-# Print statements alongside logger calls for critical operations
-print("Initializing STAR Answer Generator module")
+# STAR section labels, e.g. "Situation:", matched in any case
+_STAR_SECTION_RE = re.compile(r'(situation|task|action|result):', re.IGNORECASE)
+
+# Sub-prompt fields interpolated into the STAR answer prompt, in the order
+# _prepare_star_answer unpacks them
+_EXPLICIT_PROMPT_FIELDS = (
+    'scenario_theme_hint', 'tech_context_hint', 'stakeholder_interaction_hint', 'org_context_hint',
+    'additional_considerations', 'skill_focus', 'soft_skill_highlight'
+)
+
+# The question part of a sub-prompt file ID, e.g. "q3" in "role_q3_industry":
+# the first underscore-separated part that is "q" followed by digits
+_FILE_ID_QUESTION_RE = re.compile(r'(?:^|_)(q\d+)(?=_|$)')
+
+# Threads reading sub-prompt files ahead of the STAR answer loop
+SUBPROMPT_PRELOAD_WORKERS = 16
+
 logger.info("Initializing STAR Answer Generator module")
 
+@functools.lru_cache(maxsize=256)
+def _ensure_dir(path: str) -> None:
+    """
+    Create a directory once per process.
+    
+    Answers for the same role, question and industry share a directory, so
+    only the first answer saved there pays for os.makedirs.
+    
+    Args:
+        path (str): Directory to create
+    """
+    os.makedirs(path, exist_ok=True)
+
+# (second, formatted timestamp) of the last answer timestamp
+_answer_ts = (0, "")
+
+def _answer_timestamp() -> str:
+    """
+    Get the current local time for answer metadata, formatted once per second.
+    
+    Answers finishing within the same second share the formatted string.
+    
+    Returns:
+        str: The time as "%Y-%m-%d %H:%M:%S"
+    """
+    global _answer_ts
+    now = int(time.time())
+    second, timestamp = _answer_ts
+    if second != now:
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _answer_ts = (now, timestamp)
+    return timestamp
+
 def load_subprompts(subprompt_file_path: str) -> List[Dict[str, Any]]:
     """
     Load sub-prompts from a JSON file.
@@ -38,22 +92,17 @@ def load_subprompts(subprompt_file_path: str) -> List[Dict[str, Any]]:
         List[Dict[str, Any]]: List of sub-prompts, or empty list if loading failed
     """
     try:
-        with open(subprompt_file_path, 'r', encoding='utf-8') as f:
-            subprompts = json.load(f)
+        subprompts = json_utils.load_file(subprompt_file_path)
         
-        print(f"Loaded {len(subprompts)} sub-prompts from {subprompt_file_path}")
         logger.info(f"Loaded {len(subprompts)} sub-prompts from {subprompt_file_path}")
         return subprompts
     except FileNotFoundError:
-        print(f"Sub-prompt file not found: {subprompt_file_path}")
         logger.error(f"Sub-prompt file not found: {subprompt_file_path}")
         return []
-    except json.JSONDecodeError as e:
-        print(f"Error parsing sub-prompt file {subprompt_file_path}: {e}")
+    except json_utils.JSONDecodeError as e:
         logger.error(f"Error parsing sub-prompt file {subprompt_file_path}: {e}")
         return []
     except Exception as e:
-        print(f"Error loading sub-prompts from {subprompt_file_path}: {e}")
         logger.error(f"Error loading sub-prompts from {subprompt_file_path}: {e}")
         return []
 
@@ -116,31 +165,33 @@ def parse_star_answer(response_text: str) -> Dict[str, str]:
     
     # Try to extract the STAR sections
     try:
-        # Look for Situation section
-        situation_start = response_text.lower().find("situation:")
-        task_start = response_text.lower().find("task:")
-        
-        if situation_start != -1 and task_start != -1:
-            result["situation"] = response_text[situation_start + 10:task_start].strip()
+        # Find the first occurrence of each label in one pass over the text,
+        # without lowercasing a copy of it
+        labels = {}
+        for match in _STAR_SECTION_RE.finditer(response_text):
+            labels.setdefault(match.group(1).lower(), match)
+            if len(labels) == 4:
+                break
         
-        # Look for Task section
-        action_start = response_text.lower().find("action:")
+        situation = labels.get("situation")
+        task = labels.get("task")
+        action = labels.get("action")
+        result_label = labels.get("result")
         
-        if task_start != -1 and action_start != -1:
-            result["task"] = response_text[task_start + 5:action_start].strip()
+        # Each section runs from the end of its label to the start of the next one
+        if situation and task:
+            result["situation"] = response_text[situation.end():task.start()].strip()
         
-        # Look for Action section
-        result_start = response_text.lower().find("result:")
+        if task and action:
+            result["task"] = response_text[task.end():action.start()].strip()
         
-        if action_start != -1 and result_start != -1:
-            result["action"] = response_text[action_start + 7:result_start].strip()
+        if action and result_label:
+            result["action"] = response_text[action.end():result_label.start()].strip()
         
-        # Look for Result section
-        if result_start != -1:
-            result["result"] = response_text[result_start + 7:].strip()
+        if result_label:
+            result["result"] = response_text[result_label.end():].strip()
     
     except Exception as e:
-        print(f"Error parsing STAR answer: {e}")
         logger.error(f"Error parsing STAR answer: {e}")
     
     return result
@@ -163,7 +214,7 @@ def save_star_answer(
     """
     try:
         # Create the output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        _ensure_dir(os.path.dirname(output_path))
         
         # Combine the answer and metadata
         output_data = {
@@ -171,46 +222,135 @@ def save_star_answer(
             "answer": answer
         }
         
-        # Save to file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, indent=2)
+        # Save to file, encoded with orjson when it is installed
+        json_utils.dump_file(output_data, output_path)
         
-        print(f"Saved STAR answer to {output_path}")
         logger.info(f"Saved STAR answer to {output_path}")
         return True
     
     except Exception as e:
-        print(f"Error saving STAR answer to {output_path}: {e}")
         logger.error(f"Error saving STAR answer to {output_path}: {e}")
         return False
 
-def generate_star_answer(
-    llm_client: LLMClient,
+def _build_identifier_lookups(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Index the role, industry and question identifiers used in answer filenames.
+    
+    Built once per run so each answer looks its identifiers up in dictionaries
+    instead of walking the configuration.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: 'roles' and 'industries' map names to their configured
+            abbreviations; 'questions' maps role names to (question_id, lowercase text) pairs
+    """
+    roles = {
+        mapped_role: role_info.get('abbreviation')
+        for mapped_role, role_info in config.get('role_mappings', {}).items()
+    }
+    # Industry mappings may also give the abbreviation directly instead of a dictionary
+    industries = {
+        mapped_industry: industry_info.get('abbreviation') if isinstance(industry_info, dict) else industry_info
+        for mapped_industry, industry_info in config.get('industry_mappings', {}).items()
+    }
+    
+    questions = {}
+    for role_config in config.get('target_roles', []):
+        # Check for new interview_questions format first
+        interview_questions = role_config.get('interview_questions', {})
+        if interview_questions:
+            role_questions = [(q_id.lower(), q_text.lower()) for q_id, q_text in interview_questions.items()]
+        else:
+            # Fallback to old questions format
+            role_questions = []
+            for i, q in enumerate(role_config.get('questions', [])):
+                q_text = q.get('text', '') if isinstance(q, dict) else q
+                q_id = q['id'].lower() if isinstance(q, dict) and 'id' in q else f"q{i+1}"
+                role_questions.append((q_id, q_text.lower()))
+        questions[role_config.get('name')] = role_questions
+    
+    return {'roles': roles, 'industries': industries, 'questions': questions}
+
+def _resolve_identifiers(
+    config: Dict[str, Any],
+    role_name: str,
+    industry: str,
+    question: str,
+    lookups: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Tuple[str, str, str]:
+    """
+    Resolve the role, industry and question identifiers for answer filenames.
+    
+    These depend only on the role, industry and question, so they are resolved
+    once per sub-prompt file and shared by all of its answers.
+    
+    Args:
+        config (Dict[str, Any]): Configuration dictionary
+        role_name (str): The target role
+        industry (str): The target industry
+        question (str): The interview question
+        lookups (Dict[str, Dict[str, Any]], optional): Identifier lookups from
+            _build_identifier_lookups; built from config if not given
+        
+    Returns:
+        Tuple[str, str, str]: (role_abbr, industry_abbr, question_id), lowercase
+    """
+    if lookups is None:
+        lookups = _build_identifier_lookups(config)
+    
+    # Get role abbreviation from config
+    role_base = role_name.split('(')[0].strip()
+    role_abbr = lookups['roles'].get(role_base)
+    
+    if not role_abbr:
+        # Fallback to simplified role name if no abbreviation found
+        role_abbr = role_name.split(' ')[0].lower()  # Just take the first word of the role
+    else:
+        role_abbr = role_abbr.lower()  # Ensure lowercase for filenames
+    
+    # Get industry abbreviation from config
+    industry_abbr = lookups['industries'].get(industry)
+    
+    if not industry_abbr:
+        # Fallback to cleaned industry name if no abbreviation found
+        industry_abbr = industry.replace(' / ', '_').replace(' ', '_').lower()
+    else:
+        industry_abbr = str(industry_abbr).lower()  # Ensure lowercase for filenames
+    
+    # Get question ID by matching the question text against the role's questions
+    question_id = "q1"  # Default format
+    question_lower = question.lower()
+    for q_id, q_text in lookups['questions'].get(role_base, ()):
+        if question_lower in q_text:
+            question_id = q_id
+            break
+    
+    return role_abbr, industry_abbr, question_id
+
+def _prepare_star_answer(
     state_manager: StateManager,
     template_path: str,
     subprompt: Dict[str, Any],
     role_name: str,
     industry: str,
-    question: str,
-    output_dir: str,
-    config: Dict[str, Any]
-) -> Tuple[bool, Optional[str]]:
+    question: str
+) -> Dict[str, Any]:
     """
-    Generate a STAR answer for a single sub-prompt.
+    Check state and build the prompt for a single sub-prompt.
     
     Args:
-        llm_client (LLMClient): The LLM client to use
         state_manager (StateManager): The state manager
         template_path (str): Path to the main context prompt template
         subprompt (Dict[str, Any]): The sub-prompt to use
         role_name (str): The target role
         industry (str): The target industry
         question (str): The interview question
-        output_dir (str): Directory to save the answer
-        config (Dict[str, Any]): Configuration dictionary
         
     Returns:
-        Tuple[bool, Optional[str]]: Success flag and path to the saved answer file
+        Dict[str, Any]: Either {'result': (success, output_file)} when no LLM call is
+            needed, or the 'file_id', 'prompt_id' and 'prompt' for the request
     """
     # Create a unique file ID for this answer
     prompt_id = subprompt.get('prompt_id', 'unknown')
@@ -219,9 +359,8 @@ def generate_star_answer(
     # Check if this file has already been processed
     status = state_manager.get_file_status(file_id)
     if status == STATUS_COMPLETE:
-        print(f"STAR answer for {file_id} already generated, skipping")
         logger.info(f"STAR answer for {file_id} already generated, skipping")
-        return True, state_manager.get_processed_file_path(file_id)
+        return {'result': (True, state_manager.get_processed_file_path(file_id))}
     
     # Add to state manager with in-progress status
     state_manager.add_file(file_id, 'star_answer')
@@ -230,10 +369,9 @@ def generate_star_answer(
     # Load the main context prompt template
     template = load_prompt_template(template_path)
     if not template:
-        print(f"Failed to load template from {template_path}")
         logger.error(f"Failed to load template from {template_path}")
         state_manager.update_status(file_id, STATUS_FAILED, error_message=f"Failed to load template from {template_path}")
-        return False, None
+        return {'result': (False, None)}
     
     # Load role-specific skills
     role_skills = load_role_skills(role_name)
@@ -247,6 +385,11 @@ def generate_star_answer(
     # Generate the original prompt by substituting parameters
     template_prompt = substitute_parameters(template, params)
     
+    # Sub-prompt fields used in the prompt, read in one pass
+    theme, tech, stakeholders, org, considerations, skill_focus, soft_skill = (
+        subprompt.get(key, '') for key in _EXPLICIT_PROMPT_FIELDS
+    )
+    
     # Create a more direct and explicit prompt structure
     # This approach is based on the successful MyTest_BA_Only implementation
     explicit_prompt = f"""
@@ -257,11 +400,11 @@ def generate_star_answer(
     QUESTION: {question}
     
     ADDITIONAL GUIDANCE: 
-    {subprompt.get('scenario_theme_hint', '')}
-    {subprompt.get('tech_context_hint', '')}
-    {subprompt.get('stakeholder_interaction_hint', '')}
-    {subprompt.get('org_context_hint', '')}
-    {subprompt.get('additional_considerations', '')}
+    {theme}
+    {tech}
+    {stakeholders}
+    {org}
+    {considerations}
     
     Your answer MUST:
     1. Follow the STAR format exactly with clear Markdown headings (# Situation, # Task, # Action, # Result)
@@ -270,28 +413,77 @@ def generate_star_answer(
     4. Include realistic details about teams, systems, and processes
     5. Be detailed and comprehensive (at least 400-600 words)
     6. Be formatted in Markdown with proper structure and organization
-    7. Focus on skills: {subprompt.get('skill_focus', '')}
-    8. Highlight soft skill: {subprompt.get('soft_skill_highlight', '')}
+    7. Focus on skills: {skill_focus}
+    8. Highlight soft skill: {soft_skill}
     
     Do not provide any explanations or notes - respond ONLY with the STAR answer in proper Markdown format.
     """
     
     # Use this explicit prompt instead of the template-based one
-    prompt = explicit_prompt
+    return {
+        'file_id': file_id,
+        'prompt_id': prompt_id,
+        'prompt': explicit_prompt
+    }
+
+def _star_answer_base_path(output_dir: str, identifiers: Tuple[str, str, str], subprompt: Dict[str, Any]) -> str:
+    """
+    Build the path of a STAR answer's files, without the extension.
     
-    # Call the LLM to generate the STAR answer
-    try:
-        print(f"Generating STAR answer for {file_id}...")
-        logger.info(f"Generating STAR answer for {file_id}...")
+    Args:
+        output_dir (str): Directory to save the answer
+        identifiers (Tuple[str, str, str]): (role_abbr, industry_abbr, question_id)
+            from _resolve_identifiers
+        subprompt (Dict[str, Any]): The sub-prompt the answer is for
         
-        response = llm_client.generate_response(
-            prompt=prompt,
-            max_tokens=config.get('step2_max_tokens', 4000),
-            temperature=0.7
-        )
+    Returns:
+        str: The path, e.g. "<output_dir>/tdm_q1_fin_3_star"
+    """
+    role_abbr, industry_abbr, question_id = identifiers
+    
+    # Extract prompt number
+    prompt_number = subprompt.get('prompt_number', 1)  # Get prompt number or default to 1
+    
+    return os.path.join(output_dir, f"{role_abbr}_{question_id}_{industry_abbr}_{prompt_number}_star")
+
+def _finish_star_answer(
+    state_manager: StateManager,
+    file_id: str,
+    prompt_id: str,
+    subprompt: Dict[str, Any],
+    role_name: str,
+    industry: str,
+    question: str,
+    output_dir: str,
+    config: Dict[str, Any],
+    response: Optional[Dict[str, Any]],
+    identifiers: Optional[Tuple[str, str, str]] = None,
+    markdown_written: bool = False
+) -> Tuple[bool, Optional[str]]:
+    """
+    Save the LLM response for a sub-prompt as a STAR answer.
+    
+    Args:
+        state_manager (StateManager): The state manager
+        file_id (str): ID of the answer in the state database
+        prompt_id (str): ID of the sub-prompt
+        subprompt (Dict[str, Any]): The sub-prompt that was used
+        role_name (str): The target role
+        industry (str): The target industry
+        question (str): The interview question
+        output_dir (str): Directory to save the answer
+        config (Dict[str, Any]): Configuration dictionary
+        response (Dict[str, Any], optional): The LLM response, or None if the request failed
+        identifiers (Tuple[str, str, str], optional): (role_abbr, industry_abbr, question_id)
+            from _resolve_identifiers; resolved from config if not given
+        markdown_written (bool, optional): Whether the response text is already in
+            the markdown file, having been written as it streamed in
         
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved answer file
+    """
+    try:
         if not response:
-            print(f"Failed to get response from LLM for {file_id}")
             logger.error(f"Failed to get response from LLM for {file_id}")
             state_manager.update_status(file_id, STATUS_FAILED, error_message="No response from LLM")
             return False, None
@@ -314,86 +506,27 @@ def generate_star_answer(
             "soft_skill_highlight": subprompt.get('soft_skill_highlight', 'unknown'),
             "scenario_theme_hint": subprompt.get('scenario_theme_hint', 'unknown'),
             "llm_provider": response.get('provider', 'unknown'),
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": _answer_timestamp()
         }
         
-        # Get role abbreviation from config
-        role_base = role_name.split('(')[0].strip()
-        role_abbr = None
+        if identifiers is None:
+            identifiers = _resolve_identifiers(config, role_name, industry, question)
         
-        # Look up role abbreviation
-        role_mappings = config.get('role_mappings', {})
-        for mapped_role, role_info in role_mappings.items():
-            if role_base == mapped_role:
-                role_abbr = role_info.get('abbreviation')
-                break
-                
-        if not role_abbr:
-            # Fallback to simplified role name if no abbreviation found
-            role_abbr = role_name.split(' ')[0].lower()  # Just take the first word of the role
-        else:
-            role_abbr = role_abbr.lower()  # Ensure lowercase for filenames
-        
-        # Get industry abbreviation from config
-        industry_abbr = None
-        industry_mappings = config.get('industry_mappings', {})
-        if industry in industry_mappings:
-            industry_abbr = industry_mappings[industry].get('abbreviation')
-            
-        if not industry_abbr:
-            # Fallback to cleaned industry name if no abbreviation found
-            industry_abbr = industry.replace(' / ', '_').replace(' ', '_').lower()
-        else:
-            industry_abbr = industry_abbr.lower()  # Ensure lowercase for filenames
-        
-        # Get question ID from config
-        question_id = "q1"  # Default format
-        for role_config in config.get('target_roles', []):
-            if role_config.get('name') == role_base:
-                # Check for new interview_questions format first
-                interview_questions = role_config.get('interview_questions', {})
-                if interview_questions:
-                    # Look for a matching question text in the new format
-                    for q_id, q_text in interview_questions.items():
-                        if question.lower() in q_text.lower():
-                            question_id = q_id.lower()
-                            break
-                else:
-                    # Fallback to old questions format
-                    questions = role_config.get('questions', [])
-                    # Find the right question by matching text
-                    for i, q in enumerate(questions):
-                        q_text = q.get('text', '') if isinstance(q, dict) else q
-                        if question.lower() in q_text.lower():
-                            if isinstance(q, dict) and 'id' in q:
-                                question_id = q['id'].lower()
-                            else:
-                                question_id = f"q{i+1}"
-                            break
-        
-        # Extract prompt number
-        prompt_number = subprompt.get('prompt_number', 1)  # Get prompt number or default to 1
-        
-        # Create filename using the standardized abbreviations with _star suffix
-        output_file = os.path.join(
-            output_dir, 
-            f"{role_abbr}_{question_id}_{industry_abbr}_{prompt_number}_star.json"
-        )
-        
-        # Also create a markdown file for direct viewing
-        markdown_file = os.path.join(
-            output_dir, 
-            f"{role_abbr}_{question_id}_{industry_abbr}_{prompt_number}_star.md"
-        )
+        # Create filenames using the standardized abbreviations with _star suffix:
+        # the answer as JSON, and a markdown file for direct viewing
+        base_path = _star_answer_base_path(output_dir, identifiers, subprompt)
+        output_file = base_path + '.json'
+        markdown_file = base_path + '.md'
         
         # Save the raw markdown answer to a .md file for easy viewing
-        os.makedirs(os.path.dirname(markdown_file), exist_ok=True)
-        try:
-            with open(markdown_file, 'w', encoding='utf-8') as f:
-                f.write(response['text'])
-            logger.info(f"Saved markdown answer to {markdown_file}")
-        except Exception as e:
-            logger.warning(f"Failed to save markdown file: {e}")
+        _ensure_dir(output_dir)
+        if not markdown_written:
+            try:
+                with open(markdown_file, 'w', encoding='utf-8') as f:
+                    f.write(response['text'])
+                logger.info(f"Saved markdown answer to {markdown_file}")
+            except Exception as e:
+                logger.warning(f"Failed to save markdown file: {e}")
         
         # Save the STAR answer
         if save_star_answer(answer, output_file, metadata):
@@ -404,12 +537,456 @@ def generate_star_answer(
             return False, None
         
     except Exception as e:
-        print(f"Error generating STAR answer for {file_id}: {e}")
         logger.error(f"Error generating STAR answer for {file_id}: {e}")
         state_manager.update_status(file_id, STATUS_FAILED, error_message=str(e))
         return False, None
 
-def process_star_answers(config: Dict[str, Any], state_manager: StateManager = None, llm_client: LLMClient = None, args = None) -> Dict[str, int]:
+def generate_star_answer(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template_path: str,
+    subprompt: Dict[str, Any],
+    role_name: str,
+    industry: str,
+    question: str,
+    output_dir: str,
+    config: Dict[str, Any],
+    identifiers: Optional[Tuple[str, str, str]] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Generate a STAR answer for a single sub-prompt.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template_path (str): Path to the main context prompt template
+        subprompt (Dict[str, Any]): The sub-prompt to use
+        role_name (str): The target role
+        industry (str): The target industry
+        question (str): The interview question
+        output_dir (str): Directory to save the answer
+        config (Dict[str, Any]): Configuration dictionary
+        identifiers (Tuple[str, str, str], optional): (role_abbr, industry_abbr, question_id)
+            from _resolve_identifiers; resolved from config if not given
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved answer file
+    """
+    prepared = _prepare_star_answer(state_manager, template_path, subprompt, role_name, industry, question)
+    if 'result' in prepared:
+        return prepared['result']
+    
+    file_id = prepared['file_id']
+    
+    # Call the LLM to generate the STAR answer
+    try:
+        logger.debug(f"Generating STAR answer for {file_id}...")
+        
+        response = llm_client.generate_response(
+            prompt=prepared['prompt'],
+            max_tokens=config.get('step2_max_tokens', 4000),
+            temperature=0.7,
+            cache_context=_cache_context(role_name, industry, question)
+        )
+    except Exception as e:
+        logger.error(f"Error generating STAR answer for {file_id}: {e}")
+        state_manager.update_status(file_id, STATUS_FAILED, error_message=str(e))
+        return False, None
+    
+    return _finish_star_answer(
+        state_manager, file_id, prepared['prompt_id'], subprompt, role_name, industry, question,
+        output_dir, config, response, identifiers
+    )
+
+def _cache_context(role_name: str, industry: str, question: str) -> str:
+    """
+    Describe what a STAR answer prompt is about for the LLM response cache.
+    
+    Sub-prompts for the same role, industry and question differ only in detail,
+    so the response cache may reuse an answer between them when it is
+    configured with a similarity threshold.
+    
+    Args:
+        role_name (str): The target role
+        industry (str): The target industry
+        question (str): The interview question
+        
+    Returns:
+        str: The cache context
+    """
+    return f"star_answer\0{role_name}\0{industry}\0{question}"
+
+async def _acoalesced_response(
+    llm_client: LLMClient,
+    inflight: Dict[bytes, asyncio.Future],
+    prompt: str,
+    max_tokens: int,
+    temperature: float,
+    cache_context: Optional[str] = None,
+    on_text: Optional[Callable[[str], Any]] = None
+) -> Any:
+    """
+    Request a response, sharing one request between identical prompts in flight.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        inflight (Dict[bytes, asyncio.Future]): Requests in flight in the current
+            event loop, keyed by a digest of the request
+        prompt (str): The prompt to send
+        max_tokens (int): Maximum number of tokens in the response
+        temperature (float): Sampling temperature
+        cache_context (str, optional): Passed to agenerate_response for its
+            similarity cache lookup
+        on_text (Callable[[str], Any], optional): Passed to agenerate_response when
+            this call sends the request; calls sharing another's request get no text
+        
+    Returns:
+        Any: The LLM response, or None if the request failed
+    """
+    key = hashlib.sha256(f"{max_tokens}\0{temperature}\0{prompt}".encode('utf-8')).digest()
+    if key in inflight:
+        logger.info("Identical STAR answer prompt already in flight, sharing its response")
+        return await inflight[key]
+    
+    future = asyncio.get_running_loop().create_future()
+    inflight[key] = future
+    response = None
+    try:
+        response = await llm_client.agenerate_response(
+            prompt=prompt, max_tokens=max_tokens, temperature=temperature, cache_context=cache_context,
+            on_text=on_text
+        )
+        return response
+    finally:
+        # Callers sharing a failed request see no response
+        del inflight[key]
+        future.set_result(response)
+
+async def agenerate_star_answer(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template_path: str,
+    subprompt: Dict[str, Any],
+    role_name: str,
+    industry: str,
+    question: str,
+    output_dir: str,
+    config: Dict[str, Any],
+    identifiers: Optional[Tuple[str, str, str]] = None,
+    inflight: Optional[Dict[bytes, asyncio.Future]] = None
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async version of generate_star_answer for generating many answers concurrently.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template_path (str): Path to the main context prompt template
+        subprompt (Dict[str, Any]): The sub-prompt to use
+        role_name (str): The target role
+        industry (str): The target industry
+        question (str): The interview question
+        output_dir (str): Directory to save the answer
+        config (Dict[str, Any]): Configuration dictionary
+        identifiers (Tuple[str, str, str], optional): (role_abbr, industry_abbr, question_id)
+            from _resolve_identifiers; resolved from config if not given
+        inflight (Dict[bytes, asyncio.Future], optional): Requests in flight, shared
+            by concurrent calls so identical prompts are sent once
+        
+    Returns:
+        Tuple[bool, Optional[str]]: Success flag and path to the saved answer file
+    """
+    prepared = _prepare_star_answer(state_manager, template_path, subprompt, role_name, industry, question)
+    if 'result' in prepared:
+        return prepared['result']
+    
+    file_id = prepared['file_id']
+    
+    # Write the markdown file as the response streams in, so the answer can be
+    # read while it is still being generated
+    markdown = None
+    streamed = []
+    stream_failed = False
+    if config.get('stream_star_answers', True):
+        if identifiers is None:
+            identifiers = _resolve_identifiers(config, role_name, industry, question)
+        markdown_file = _star_answer_base_path(output_dir, identifiers, subprompt) + '.md'
+        try:
+            _ensure_dir(output_dir)
+            markdown = open(markdown_file, 'w', encoding='utf-8')
+        except OSError as e:
+            logger.warning(f"Failed to open markdown file {markdown_file} for streaming: {e}")
+    
+    def on_text(text):
+        nonlocal stream_failed
+        streamed.append(text)
+        if stream_failed:
+            return
+        try:
+            markdown.write(text)
+            markdown.flush()
+        except OSError as e:
+            # The whole answer is written again once it is complete
+            logger.warning(f"Failed to stream to markdown file {markdown_file}: {e}")
+            stream_failed = True
+    
+    # Call the LLM to generate the STAR answer
+    response = None
+    try:
+        logger.debug(f"Generating STAR answer for {file_id}...")
+        
+        if inflight is None:
+            response = await llm_client.agenerate_response(
+                prompt=prepared['prompt'],
+                max_tokens=config.get('step2_max_tokens', 4000),
+                temperature=0.7,
+                cache_context=_cache_context(role_name, industry, question),
+                on_text=on_text if markdown is not None else None
+            )
+        else:
+            response = await _acoalesced_response(
+                llm_client, inflight, prepared['prompt'], config.get('step2_max_tokens', 4000), 0.7,
+                _cache_context(role_name, industry, question),
+                on_text if markdown is not None else None
+            )
+    except Exception as e:
+        logger.error(f"Error generating STAR answer for {file_id}: {e}")
+        state_manager.update_status(file_id, STATUS_FAILED, error_message=str(e))
+        return False, None
+    finally:
+        if markdown is not None:
+            markdown.close()
+            if not response:
+                # Do not leave a partial answer behind for a failed request
+                try:
+                    os.remove(markdown_file)
+                except OSError:
+                    pass
+    
+    # Text from a failed attempt may have been streamed before the one that
+    # succeeded, in which case the markdown file is written again
+    markdown_written = (
+        markdown is not None and not stream_failed and response is not None
+        and ''.join(streamed) == response['text']
+    )
+    
+    return _finish_star_answer(
+        state_manager, file_id, prepared['prompt_id'], subprompt, role_name, industry, question,
+        output_dir, config, response, identifiers, markdown_written
+    )
+
+async def _agenerate_star_answers(
+    llm_client: LLMClient,
+    state_manager: StateManager,
+    template_path: str,
+    jobs: List[Tuple[str, Dict[str, Any], str, str, str, Tuple[str, str, str]]],
+    output_dir: str,
+    config: Dict[str, Any]
+) -> List[Any]:
+    """
+    Generate STAR answers for many sub-prompts concurrently.
+    
+    The LLM client's async connections stay open for the next call in the same
+    event loop; close them with llm_client.aclose() before the loop ends.
+    
+    Args:
+        llm_client (LLMClient): The LLM client to use
+        state_manager (StateManager): The state manager
+        template_path (str): Path to the main context prompt template
+        jobs (List[Tuple[str, Dict[str, Any], str, str, str, Tuple[str, str, str]]]): (file_id,
+            subprompt, role_name, industry, question, identifiers) for each answer to generate
+        output_dir (str): Directory to save the answers
+        config (Dict[str, Any]): Configuration dictionary
+        
+    Returns:
+        List[Any]: The (success, output_file) tuple for each job in order, or the
+            exception it raised
+    """
+    # Bound the number of requests in flight to stay within provider rate limits
+    semaphore = asyncio.Semaphore(max(1, config.get('max_concurrency', 8)))
+    
+    # Identical prompts in flight together share one request
+    inflight = {} if config.get('coalesce_duplicate_prompts', True) else None
+    
+    async def run(subprompt, role_name, industry, question, identifiers):
+        async with semaphore:
+            return await agenerate_star_answer(
+                llm_client=llm_client,
+                state_manager=state_manager,
+                template_path=template_path,
+                subprompt=subprompt,
+                role_name=role_name,
+                industry=industry,
+                question=question,
+                output_dir=output_dir,
+                config=config,
+                identifiers=identifiers,
+                inflight=inflight
+            )
+    
+    return await asyncio.gather(*(run(*job[1:]) for job in jobs), return_exceptions=True)
+
+def _record_subprompt_file_status(
+    state_manager: StateManager,
+    file_id: str,
+    successes: int,
+    total: int,
+    output_dir: str
+) -> None:
+    """
+    Record the star_answer stage status of a sub-prompt file from its answer counts.
+    
+    Args:
+        state_manager (StateManager): The state manager
+        file_id (str): ID of the sub-prompt file
+        successes (int): Number of STAR answers generated successfully
+        total (int): Number of sub-prompts in the file
+        output_dir (str): Directory holding the file's answers
+    """
+    star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
+    if successes == total:
+        # All sub-prompts processed successfully
+        state_manager.update_status(star_file_id, STATUS_COMPLETE, 
+                                 processed_file_path=output_dir)
+        logger.info(f"Successfully processed all {total} sub-prompts for {file_id}")
+    elif successes > 0:
+        # Some sub-prompts processed successfully
+        state_manager.update_status(star_file_id, STATUS_COMPLETE, 
+                                 processed_file_path=output_dir,
+                                 error_message=f"Partially successful: {successes}/{total} generated")
+        logger.warning(f"Partially processed {successes}/{total} sub-prompts for {file_id}")
+    else:
+        # No sub-prompts processed successfully
+        state_manager.update_status(star_file_id, STATUS_FAILED,
+                                  error_message="Failed to generate any STAR answers")
+        logger.error(f"Failed to process any sub-prompts for {file_id}")
+
+def _completed_subprompts(state_manager: StateManager) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    Get the completed sub-prompt files recorded in the state database.
+    
+    Each file's star_answer status comes back from the same query, so resume
+    mode needs no per-file lookup. Whether the file still exists is left to
+    load_subprompts, which reports a missing file when it is opened.
+    
+    Args:
+        state_manager (StateManager): State manager instance
+        
+    Returns:
+        List[Tuple[str, str, Optional[str]]]: (file_id, processed_file_path, star_answer status)
+            for each completed sub-prompt file with a recorded path
+    """
+    # The star_answer stage records each sub-prompt file under the compound ID "<file_id>:star_answer"
+    try:
+        query = """
+        SELECT a.file_path, a.processed_file_path, b.status
+        FROM processing_state a
+        LEFT JOIN processing_state b ON b.file_path = a.file_path || ':star_answer' AND b.stage = 'star_answer'
+        WHERE a.stage = ? AND a.status = ?
+        """
+        state_manager.cursor.execute(query, ('sub_prompt', STATUS_COMPLETE))
+        results = state_manager.cursor.fetchall()
+        
+        completed_subprompts = []
+        for file_id, processed_file_path, star_answer_status in results:
+            if processed_file_path:
+                completed_subprompts.append((file_id, processed_file_path, star_answer_status))
+            else:
+                logger.warning(f"Completed sub-prompt {file_id} has no file path recorded")
+                
+        logger.info(f"Found {len(completed_subprompts)} completed sub-prompts with file paths")
+        return completed_subprompts
+    except Exception as e:
+        logger.error(f"Error querying database for completed sub-prompts: {e}")
+        return []
+
+def _role_name_from_slug(role_slug: str, role_mappings: Dict[str, Any]) -> str:
+    """
+    Resolve the role name for the role part of a sub-prompt file ID.
+    
+    Args:
+        role_slug (str): Role part of the file ID, e.g. "product_manager_pdm"
+        role_mappings (Dict[str, Any]): role_mappings from the configuration
+        
+    Returns:
+        str: The role name, e.g. "Product Manager (PDM)"
+    """
+    # Convert slug to title case for comparison with config
+    base_role_parts = role_slug.split('_')
+    
+    # Remove potential abbreviation if it's at the end (e.g., 'product_manager_pdm')
+    potential_abbr = None
+    if len(base_role_parts) >= 2 and len(base_role_parts[-1]) <= 5 and base_role_parts[-1].isalpha():
+        potential_abbr = base_role_parts[-1]
+        base_role_parts = base_role_parts[:-1]
+    
+    # Convert to title case for matching with config keys
+    base_role = ' '.join(part.title() for part in base_role_parts)
+    
+    # Try to find an exact match first
+    if base_role in role_mappings:
+        abbr = role_mappings[base_role].get('abbreviation')
+        logger.debug(f"Found exact role mapping match: {base_role} -> {abbr}")
+        return f"{base_role} ({abbr})"
+    
+    # Try partial matches
+    for mapped_role, role_info in role_mappings.items():
+        if base_role.startswith(mapped_role) or mapped_role.startswith(base_role):
+            abbr = role_info.get('abbreviation')
+            logger.debug(f"Found partial role mapping match: {base_role} via {mapped_role} -> {abbr}")
+            return f"{mapped_role} ({abbr})"
+    
+    # If no match in mappings, use fallback logic
+    if potential_abbr:
+        return f"{base_role} ({potential_abbr.upper()})"
+    return role_slug.replace('_', ' ').title()
+
+def _industry_from_slug(industry_slug: str, industry_slugs: List[Tuple[str, str]]) -> str:
+    """
+    Resolve the industry name for the industry part of a sub-prompt file ID.
+    
+    Args:
+        industry_slug (str): Industry part of the file ID, e.g. "finance___financial_services"
+        industry_slugs (List[Tuple[str, str]]): (slug, name) for each configured target industry
+        
+    Returns:
+        str: The first target industry whose slug appears in industry_slug, or
+            industry_slug in title case if there is none
+    """
+    for ind_slug, ind in industry_slugs:
+        if ind_slug in industry_slug:
+            return ind
+    return industry_slug.replace('_', ' ').title()
+
+def _filter_skip_reason(file_id: str, role_filter: Optional[str], question_filter: Optional[str],
+                        industry_filter: Optional[str]) -> Optional[str]:
+    """
+    Check a sub-prompt file against the role, question and industry filters.
+    
+    Args:
+        file_id (str): The sub-prompt file ID, e.g. "role_q1_industry"
+        role_filter (str, optional): Substring the file ID must contain
+        question_filter (str, optional): Substring the question part of the file ID must contain
+        industry_filter (str, optional): Substring the file ID must contain
+        
+    Returns:
+        Optional[str]: Why the file is filtered out, or None if it passes every filter
+    """
+    if role_filter and role_filter.lower() not in file_id.lower():
+        return f"Skipping {file_id} due to role filter: {role_filter}"
+        
+    if question_filter:
+        match = _FILE_ID_QUESTION_RE.search(file_id)
+        if not match or question_filter.lower() not in match.group(1).lower():
+            return f"Skipping {file_id} due to question filter: {question_filter}"
+            
+    if industry_filter and industry_filter.lower() not in file_id.lower():
+        return f"Skipping {file_id} due to industry filter: {industry_filter}"
+    
+    return None
+
+def process_star_answers(config: Dict[str, Any], state_manager: StateManager = None, llm_client: LLMClient = None, args = None,
+                         subprompt_files: Optional[Iterable[Tuple[str, str]]] = None, output_queue = None) -> Dict[str, int]:
     """
     Process all sub-prompts to generate STAR answers.
     
@@ -418,6 +995,10 @@ def process_star_answers(config: Dict[str, Any], state_manager: StateManager = N
         state_manager (StateManager, optional): State manager instance
         llm_client (LLMClient, optional): LLM client instance
         args (argparse.Namespace, optional): Command-line arguments
+        subprompt_files (Iterable[Tuple[str, str]], optional): (file_id, sub-prompt file) pairs to
+            process as they arrive, instead of the completed sub-prompts recorded in the database
+        output_queue (queue.Queue, optional): Receives the path of each STAR answer once its
+            state is committed, so the next stage can start on it
         
     Returns:
         Dict[str, int]: Statistics about the processing
@@ -454,7 +1035,6 @@ def process_star_answers(config: Dict[str, Any], state_manager: StateManager = N
     # Check if we're in resume mode
     resume_mode = args.resume if args and hasattr(args, 'resume') else False
     if resume_mode:
-        print("Running in resume mode - will skip already completed files")
         logger.info("Running in resume mode - will skip already completed files")
     
     # Get the main context prompt template path
@@ -465,211 +1045,261 @@ def process_star_answers(config: Dict[str, Any], state_manager: StateManager = N
     industry_filter = args.industry if args and hasattr(args, 'industry') and args.industry else config.get('industry_filter', None) 
     question_filter = args.question if args and hasattr(args, 'question') and args.question else config.get('question_filter', None)
     
-    # Get all sub-prompts from state manager and manually filter for completed ones
-    # This approach is needed because we need to access all files, not just pending ones
-    try:
-        query = "SELECT file_path, processed_file_path FROM processing_state WHERE stage = ? AND status = ?"
-        state_manager.cursor.execute(query, ('sub_prompt', STATUS_COMPLETE))
-        results = state_manager.cursor.fetchall()
+    if subprompt_files is not None:
+        # Sub-prompt files are streamed in by the previous stage as they are
+        # written; their star_answer status is looked up as they arrive
+        completed_subprompts = ((file_id, subprompt_file, None) for file_id, subprompt_file in subprompt_files)
+    else:
+        completed_subprompts = _completed_subprompts(state_manager)
         
-        # Convert results to a list of tuples (file_id, processed_file_path)
-        completed_subprompts = []
-        for file_id, processed_file_path in results:
-            if processed_file_path and os.path.exists(processed_file_path):
-                completed_subprompts.append((file_id, processed_file_path))
-            else:
-                logger.warning(f"Completed sub-prompt {file_id} has no valid file path or file doesn't exist: {processed_file_path}")
-                
-        print(f"Found {len(completed_subprompts)} completed sub-prompts with valid files")
-        logger.info(f"Found {len(completed_subprompts)} completed sub-prompts with valid files")
-    except Exception as e:
-        logger.error(f"Error querying database for completed sub-prompts: {e}")
-        completed_subprompts = []
-    
-    print(f"Found {len(completed_subprompts)} completed sub-prompts to potentially process")
-    logger.info(f"Found {len(completed_subprompts)} completed sub-prompts to potentially process")
+        logger.info(f"Found {len(completed_subprompts)} completed sub-prompts to potentially process")
+        
+        if not completed_subprompts:
+            logger.warning("No completed sub-prompts found to process. Please generate sub-prompts first.")
+            return stats
     
-    if not completed_subprompts:
-        print("No completed sub-prompts found to process. Please generate sub-prompts first.")
-        return stats
+    # Read the sub-prompt files that will be processed on a thread pool, so the
+    # reads overlap each other and the LLM calls instead of running one per file
+    # in the loop. Streamed files are read as they arrive.
+    preloaded = {}
+    if subprompt_files is None:
+        preload_files = [
+            subprompt_file for file_id, subprompt_file, star_answer_status in completed_subprompts
+            if not _filter_skip_reason(file_id, role_filter, question_filter, industry_filter)
+            and not (resume_mode and star_answer_status == STATUS_COMPLETE)
+        ]
+        if preload_files:
+            executor = ThreadPoolExecutor(max_workers=min(SUBPROMPT_PRELOAD_WORKERS, len(preload_files)))
+            preloaded = {path: executor.submit(load_subprompts, path) for path in preload_files}
+            # Submitted reads still run; the threads exit once they are done
+            executor.shutdown(wait=False)
     
-    # Get target roles, industries, and questions from config for reference
-    target_roles = config.get('target_roles', [])
-    target_industries = config.get('target_industries', [])
+    # Get role mappings, industries, and questions from config for reference
+    role_mappings = config.get('role_mappings', {})
+    identifier_lookups = _build_identifier_lookups(config)
+    industry_slugs = [
+        (ind.replace(" ", "_").replace("/", "_").lower(), ind) for ind in config.get('target_industries', [])
+    ]
     target_questions = config.get('target_questions', [])
     
-    # Process each completed sub-prompt
-    for file_id, subprompt_file in completed_subprompts:
-        # Apply filters if specified
-        if role_filter and role_filter.lower() not in file_id.lower():
-            logger.debug(f"Skipping {file_id} due to role filter: {role_filter}")
-            continue
+    # Role and industry names resolved so far, by their slug in the file ID
+    role_names = {}
+    industry_names = {}
+    
+    # In batch mode, requests are queued across all files and sent to the
+    # provider's batch API together after the loop
+    use_batch_api = config.get('llm', {}).get('use_batch_api', False)
+    batch_requests = []
+    batch_pending = {}
+    
+    # (successes, total, output directory) per sub-prompt file awaiting its status update
+    file_results = {}
+    
+    # Otherwise sub-prompts are queued across files and generated concurrently,
+    # max_concurrency requests at a time; a file's status is recorded once its
+    # last queued answer is done
+    max_concurrency = max(1, config.get('max_concurrency', 8))
+    star_jobs = []
+    jobs_remaining = {}
+    
+    # Every group runs in one event loop, so its async HTTP connections are
+    # opened once and reused for the whole phase
+    loop = asyncio.new_event_loop()
+    
+    # Sub-prompt files with answers whose status could not be written; their
+    # file status is left in progress so --resume generates them again
+    unrecorded_files = set()
+    
+    def run_star_jobs():
+        # The group's status updates are written in one transaction once it is
+        # done, and no transaction stays open while the requests are in flight
+        try:
+            with state_manager.deferred_updates():
+                results = loop.run_until_complete(_agenerate_star_answers(
+                    llm_client, state_manager, template_path, star_jobs, answers_dir, config
+                ))
+        except sqlite3.Error as e:
+            logger.error(f"Error recording {len(star_jobs)} STAR answers, their files will be retried on resume: {e}")
+            results = [(False, None)] * len(star_jobs)
+            unrecorded_files.update(file_id for file_id, *_ in star_jobs)
+        for (file_id, *_), result in zip(star_jobs, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Error generating STAR answer for {file_id}: {result}")
+                result = (False, None)
+            success, output_file = result
+            if success:
+                file_results[file_id][0] += 1
+                stats["processed"] += 1
+                if output_queue is not None and output_file:
+                    output_queue.put(output_file)
+            else:
+                stats["failed"] += 1
             
-        if question_filter:
-            question_part = next((part for part in file_id.split('_') if part.startswith('q') and part[1:].isdigit()), None)
-            if not question_part or question_filter.lower() not in question_part.lower():
-                logger.debug(f"Skipping {file_id} due to question filter: {question_filter}")
+            jobs_remaining[file_id] -= 1
+            if not jobs_remaining[file_id]:
+                del jobs_remaining[file_id]
+                if file_id in unrecorded_files:
+                    file_results.pop(file_id)
+                else:
+                    _record_subprompt_file_status(state_manager, file_id, *file_results.pop(file_id))
+        star_jobs.clear()
+    
+    try:
+        # Process each completed sub-prompt
+        for file_id, subprompt_file, star_answer_status in completed_subprompts:
+            # Apply filters if specified
+            skip_reason = _filter_skip_reason(file_id, role_filter, question_filter, industry_filter)
+            if skip_reason:
+                logger.debug(skip_reason)
                 continue
-                
-        if industry_filter and industry_filter.lower() not in file_id.lower():
-            logger.debug(f"Skipping {file_id} due to industry filter: {industry_filter}")
-            continue
-        
-        # Check if this file has already been processed in the star_answer stage
-        if resume_mode:
-            # Using direct SQL query to check if this file_id exists with stage='star_answer' and status='complete'
-            try:
-                query = "SELECT status FROM processing_state WHERE file_path = ? AND stage = ?"
-                state_manager.cursor.execute(query, (file_id, 'star_answer'))
-                result = state_manager.cursor.fetchone()
-                star_answer_status = result[0] if result else None
+            
+            # Check if this file has already been processed in the star_answer stage
+            if resume_mode:
+                if subprompt_files is not None:
+                    star_answer_status = state_manager.get_file_status(f"{file_id}:star_answer")
                 
                 if star_answer_status == STATUS_COMPLETE:
                     logger.info(f"Skipping already completed STAR answer for {file_id} (resume mode)")
-                    print(f"Skipping already completed STAR answer for {file_id} (resume mode)")
                     stats["skipped"] += 1
                     continue
-            except Exception as e:
-                logger.error(f"Error checking if {file_id} is already processed: {e}")
-                star_answer_status = None
-        
-        # Parse file_id to extract role, question, and industry
-        # Assuming format like "role_q1_industry"
-        file_parts = file_id.split('_')
-        
-        # Find the question part (starts with q followed by digit)
-        q_part_index = next((i for i, part in enumerate(file_parts) if part.startswith('q') and part[1:].isdigit()), -1)
-        
-        if q_part_index == -1:
-            logger.warning(f"Could not parse question index from file_id: {file_id}, skipping")
-            stats["skipped"] += 1
-            continue
             
-        # Extract role (everything before q*)
-        role_slug = '_'.join(file_parts[:q_part_index])
-        
-        # Convert slug to title case for comparison with config
-        base_role_parts = role_slug.split('_')
-        
-        # Remove potential abbreviation if it's at the end (e.g., 'product_manager_pdm')
-        potential_abbr = None
-        if len(base_role_parts) >= 2 and len(base_role_parts[-1]) <= 5 and base_role_parts[-1].isalpha():
-            potential_abbr = base_role_parts[-1]
-            base_role_parts = base_role_parts[:-1]
-        
-        # Convert to title case for matching with config keys
-        base_role = ' '.join(part.title() for part in base_role_parts)
-        
-        # Look up in role_mappings from config
-        role_mappings = config.get('role_mappings', {})
-        role_name = None
-        
-        # Try to find an exact match first
-        if base_role in role_mappings:
-            role_info = role_mappings[base_role]
-            abbr = role_info.get('abbreviation')
-            role_name = f"{base_role} ({abbr})"
-            logger.debug(f"Found exact role mapping match: {base_role} -> {abbr}")
-        else:
-            # Try partial matches
-            for mapped_role, role_info in role_mappings.items():
-                if base_role.startswith(mapped_role) or mapped_role.startswith(base_role):
-                    abbr = role_info.get('abbreviation')
-                    role_name = f"{mapped_role} ({abbr})"
-                    logger.debug(f"Found partial role mapping match: {base_role} via {mapped_role} -> {abbr}")
-                    break
-        
-        # If no match in mappings, use fallback logic
-        if not role_name:
-            if potential_abbr:
-                role_name = f"{base_role} ({potential_abbr.upper()})"
-            else:
-                role_name = role_slug.replace('_', ' ').title()
-        
-        # Extract question number and get the actual question text
-        question_part = file_parts[q_part_index]
-        question_index = int(question_part[1:]) if question_part[1:].isdigit() else 1
+            # Parse file_id to extract role, question, and industry
+            # Assuming format like "role_q1_industry"
+            match = _FILE_ID_QUESTION_RE.search(file_id)
+            if match is None:
+                logger.warning(f"Could not parse question index from file_id: {file_id}, skipping")
+                stats["skipped"] += 1
+                continue
+            
+            # Role is everything before q*, industry everything after it
+            role_slug = file_id[:match.start()]
+            question_part = match.group(1)
+            industry_slug = file_id[match.end() + 1:] if match.end() < len(file_id) else "general"
+            
+            # Files for the same role or industry resolve to the same name
+            role_name = role_names.get(role_slug)
+            if role_name is None:
+                role_name = role_names[role_slug] = _role_name_from_slug(role_slug, role_mappings)
+            
+            industry = industry_names.get(industry_slug)
+            if industry is None:
+                industry = industry_names[industry_slug] = _industry_from_slug(industry_slug, industry_slugs)
+            
+            # Get the question text from config if possible
+            question_index = int(question_part[1:])
+            try:
+                question = target_questions[question_index-1] if target_questions else f"Question {question_index}"
+            except IndexError:
+                question = f"Question {question_index}"
+            
+            # The answer filename identifiers are the same for every sub-prompt in the file
+            identifiers = _resolve_identifiers(config, role_name, industry, question, identifier_lookups)
+            
+            # Load the sub-prompts file, or take it from the preloaded reads
+            preload = preloaded.pop(subprompt_file, None)
+            subprompts = preload.result() if preload is not None else load_subprompts(subprompt_file)
+            if not subprompts:
+                logger.warning(f"No valid sub-prompts found in {subprompt_file}, skipping")
+                stats["skipped"] += 1
+                continue
+            
+            # Add entry to the state manager for the star_answer stage if not already there
+            star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
+            state_manager.add_file(star_file_id, 'star_answer')
+            state_manager.update_status(star_file_id, STATUS_IN_PROGRESS)
+            
+            stats["total"] += len(subprompts)
+            logger.info(f"Processing {len(subprompts)} sub-prompts for {role_name}, Question {question_index}, {industry}")
+            
+            # Process each sub-prompt in the file
+            successes = 0
+            # Sub-prompts queued for the batch API are marked in progress with one
+            # transaction per file
+            with state_manager.deferred_updates():
+                for i, subprompt in enumerate(subprompts):
+                    if use_batch_api:
+                        # Queue the request for the batch; answers that need no LLM call finish now
+                        prepared = _prepare_star_answer(state_manager, template_path, subprompt, role_name, industry, question)
+                        if 'result' not in prepared:
+                            custom_id = f"star-{len(batch_requests)}"
+                            batch_requests.append({
+                                'custom_id': custom_id,
+                                'prompt': prepared['prompt'],
+                                'max_tokens': config.get('step2_max_tokens', 4000),
+                                'temperature': 0.7
+                            })
+                            batch_pending[custom_id] = (file_id, prepared, subprompt, role_name, industry, question, identifiers)
+                            continue
+                        success, output_file = prepared['result']
+                    else:
+                        # Queue the STAR answer for concurrent generation
+                        star_jobs.append((file_id, subprompt, role_name, industry, question, identifiers))
+                        continue
+                    
+                    if success:
+                        successes += 1
+                        stats["processed"] += 1
+                        if output_queue is not None and output_file:
+                            output_queue.put(output_file)
+                    else:
+                        stats["failed"] += 1
+            
+            # Update the status based on results, once any batched or queued answers are in
+            file_results[file_id] = [successes, len(subprompts), os.path.join(answers_dir, role_slug, question_part, industry_slug)]
+            if not use_batch_api:
+                jobs_remaining[file_id] = len(subprompts)
+                # Files streamed from the previous stage are generated right away
+                # rather than held back until the next file arrives
+                if len(star_jobs) >= max_concurrency or subprompt_files is not None:
+                    run_star_jobs()
         
-        # Get the question text from config if possible
-        try:
-            question = target_questions[question_index-1] if target_questions else f"Question {question_index}"
-        except IndexError:
-            question = f"Question {question_index}"
-        
-        # Extract industry (everything after q*)
-        industry_slug = '_'.join(file_parts[q_part_index+1:]) if q_part_index < len(file_parts) - 1 else "general"
-        
-        # Try to find the industry name from config if possible
-        industry = None
-        for ind in target_industries:
-            ind_slug = ind.replace(" ", "_").replace("/", "_").lower()
-            if ind_slug in industry_slug:
-                industry = ind
-                break
+        if star_jobs:
+            run_star_jobs()
         
-        if not industry:
-            industry = industry_slug.replace('_', ' ').title()
-        
-        # Load the sub-prompts file
-        subprompts = load_subprompts(subprompt_file)
-        if not subprompts:
-            logger.warning(f"No valid sub-prompts found in {subprompt_file}, skipping")
-            print(f"No valid sub-prompts found in {subprompt_file}, skipping")
-            stats["skipped"] += 1
-            continue
-        
-        # Add entry to the state manager for the star_answer stage if not already there
-        star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
-        state_manager.add_file(star_file_id, 'star_answer')
-        state_manager.update_status(star_file_id, STATUS_IN_PROGRESS)
-        
-        stats["total"] += len(subprompts)
-        logger.info(f"Processing {len(subprompts)} sub-prompts for {role_name}, Question {question_index}, {industry}")
-        print(f"Processing {len(subprompts)} sub-prompts for {role_name}, Question {question_index}, {industry}")
-        
-        # Process each sub-prompt in the file
-        successes = 0
-        for i, subprompt in enumerate(subprompts):
-            # Generate the STAR answer
-            success, output_file = generate_star_answer(
-                llm_client=llm_client,
-                state_manager=state_manager,
-                template_path=template_path,
-                subprompt=subprompt,
-                role_name=role_name,
-                industry=industry,
-                question=question,
-                output_dir=answers_dir,
-                config=config
-            )
+        if batch_pending:
+            # Submit everything queued above as one batch and save the answers as the results come back
+            batch_id = llm_client.submit_batch(batch_requests)
+            responses = None
+            if batch_id:
+                logger.info(f"Submitted batch {batch_id} with {len(batch_requests)} STAR answer requests, waiting for results")
+                responses = llm_client.poll_batch(batch_id, timeout=config.get('llm', {}).get('batch_timeout_seconds'))
             
-            if success:
-                successes += 1
-                stats["processed"] += 1
+            if responses is not None:
+                # Save every answer, then write their status updates in one transaction
+                # before passing any of them on
+                finished = []
+                with state_manager.deferred_updates():
+                    for custom_id, (file_id, prepared, subprompt, role_name, industry, question, identifiers) in batch_pending.items():
+                        finished.append((file_id, _finish_star_answer(
+                            state_manager, prepared['file_id'], prepared['prompt_id'], subprompt, role_name, industry, question,
+                            answers_dir, config, responses.get(custom_id), identifiers
+                        )))
+                
+                for file_id, (success, output_file) in finished:
+                    if success:
+                        file_results[file_id][0] += 1
+                        stats["processed"] += 1
+                        if output_queue is not None and output_file:
+                            output_queue.put(output_file)
+                    else:
+                        stats["failed"] += 1
             else:
-                stats["failed"] += 1
-        
-        # Update the status based on results
-        output_dir = os.path.join(answers_dir, role_slug, question_part, industry_slug)
-        if successes == len(subprompts):
-            # All sub-prompts processed successfully
-            star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
-            state_manager.update_status(star_file_id, STATUS_COMPLETE, 
-                                     processed_file_path=output_dir)
-            print(f"Successfully processed all {len(subprompts)} sub-prompts for {file_id}")
-        elif successes > 0:
-            # Some sub-prompts processed successfully
-            star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
-            state_manager.update_status(star_file_id, STATUS_COMPLETE, 
-                                     processed_file_path=output_dir,
-                                     error_message=f"Partially successful: {successes}/{len(subprompts)} generated")
-            print(f"Partially processed {successes}/{len(subprompts)} sub-prompts for {file_id}")
-        else:
-            # No sub-prompts processed successfully
-            star_file_id = f"{file_id}:star_answer"  # Create compound ID with stage
-            state_manager.update_status(star_file_id, STATUS_FAILED,
-                                      error_message="Failed to generate any STAR answers")
-            print(f"Failed to process any sub-prompts for {file_id}")
+                # Fall back to generating the queued answers concurrently, as
+                # without the batch API, if the batch could not be submitted or
+                # did not finish in time; each file's status is recorded once its
+                # last answer is done
+                logger.warning(f"Batch API unavailable, generating {len(batch_pending)} STAR answers concurrently instead")
+                for file_id, prepared, subprompt, role_name, industry, question, identifiers in batch_pending.values():
+                    star_jobs.append((file_id, subprompt, role_name, industry, question, identifiers))
+                    jobs_remaining[file_id] = jobs_remaining.get(file_id, 0) + 1
+                run_star_jobs()
+    finally:
+        # The async HTTP clients are tied to the event loop
+        loop.run_until_complete(llm_client.aclose())
+        loop.close()
+    
+    for file_id, (successes, total, file_output_dir) in file_results.items():
+        _record_subprompt_file_status(state_manager, file_id, successes, total, file_output_dir)
     
     # Print statistics
     print("\nSTAR Answer Generation Statistics:")
@@ -683,6 +1313,9 @@ def process_star_answers(config: Dict[str, Any], state_manager: StateManager = N
 if __name__ == "__main__":
     # This allows the module to be run directly for testing
     from config import load_config
+    from logger_setup import setup_logging
+    
+    setup_logging(log_to_file=False)
     
     # Load configuration
     config = load_config('config.yaml')
@@ -8,6 +8,7 @@ status of files throughout the STAR answer generation pipeline.
 import os
 import sqlite3
 import time
+import contextlib
 from pathlib import Path
 from logger_setup import logger, setup_logging
 
@@ -35,6 +36,11 @@ class StateManager:
         self.db_path = db_path
         self.conn = None
         self.cursor = None
+        # Write batching state, see batch()
+        self._batch_flush_every = None
+        self._batch_pending = 0
+        # Buffered (added files, status updates) inside deferred_updates(), else None
+        self._deferred = None
         self._connect()
         self._create_table()
     
@@ -45,6 +51,12 @@ class StateManager:
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
             self.cursor = self.conn.cursor()
+            # WAL lets readers run alongside the pipeline and, with synchronous=NORMAL,
+            # avoids an fsync of the main database file on every commit
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+            self.cursor.execute("PRAGMA temp_store=MEMORY")
+            self.cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
             # Use print for initial connection since logger might not be initialized yet
             print(f"Connected to state database: {self.db_path}")
         except sqlite3.Error as e:
@@ -73,6 +85,8 @@ class StateManager:
             self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_status ON processing_state (status)')
             self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_file_path ON processing_state (file_path)')
             self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_stage ON processing_state (stage)')
+            # Covering index for per-stage status counts (GROUP BY stage, status)
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_stage_status ON processing_state (stage, status)')
             self.conn.commit()
             # Use print since logger might not be initialized yet
             print("Table 'processing_state' ensured to exist with indexes.")
@@ -81,6 +95,126 @@ class StateManager:
             print(f"Error creating table or indexes: {e}")
             raise
     
+    def _commit(self):
+        """Commits the current write, or counts it toward the next flush inside batch()."""
+        if self._batch_flush_every is None:
+            self.conn.commit()
+            return
+        
+        self._batch_pending += 1
+        if self._batch_pending >= self._batch_flush_every:
+            self.conn.commit()
+            self._batch_pending = 0
+    
+    @contextlib.contextmanager
+    def batch(self, flush_every=64):
+        """
+        Defers commits so that many writes share one transaction.
+        
+        Writes made inside the block are committed every flush_every writes
+        and once more when the block exits, even if it raises.
+        
+        Args:
+            flush_every (int, optional): Number of writes per commit
+        """
+        if self._batch_flush_every is not None:
+            # Already batching; the outer block owns the commits
+            yield self
+            return
+        
+        self._batch_flush_every = flush_every
+        self._batch_pending = 0
+        try:
+            yield self
+        finally:
+            self._batch_flush_every = None
+            self._batch_pending = 0
+            self.conn.commit()
+    
+    @contextlib.contextmanager
+    def deferred_updates(self):
+        """
+        Buffers add_file and update_status calls and writes them in one transaction.
+        
+        Unlike batch(), no transaction is held open while the block runs, so
+        other connections to the database can still write in the meantime,
+        for example while the block waits on the LLM. Reads inside the block do
+        not see the buffered writes, and add_file returns None. The buffer is
+        written when the block exits, even if it raises.
+        
+        Raises:
+            sqlite3.Error: If the buffered writes could not be written; none of
+                them are applied, so callers must not record anything that
+                depends on them
+        """
+        if self._deferred is not None:
+            # Already deferring; the outer block writes the buffer
+            yield self
+            return
+        
+        self._deferred = ([], [])
+        try:
+            yield self
+        finally:
+            added, updates = self._deferred
+            self._deferred = None
+            written = self._write_files_and_updates(added, updates)
+        if not written:
+            raise sqlite3.Error(f"Failed to write {len(added)} new files and {len(updates)} deferred status updates")
+    
+    def _write_files_and_updates(self, added, updates):
+        """
+        Inserts new files and applies status updates, committing once.
+        
+        The writes are made under a savepoint, so a failure undoes all of them
+        without discarding other writes pending in an enclosing batch().
+        
+        Args:
+            added (list): (file_path, stage, timestamp) tuples for add_file
+            updates (list): (file_path, status, processed_file_path, error_message,
+                increment_attempt, timestamp) tuples for update_status
+            
+        Returns:
+            bool: True if the writes were successful, False otherwise
+        """
+        if not added and not updates:
+            return True
+        
+        try:
+            self.cursor.execute('SAVEPOINT write_files_and_updates')
+            self.cursor.executemany('''
+            INSERT OR IGNORE INTO processing_state (file_path, status, stage, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ''', [(file_path, STATUS_PENDING, stage, timestamp, timestamp) for file_path, stage, timestamp in added])
+            # A None path or message keeps the stored value, as in update_status
+            self.cursor.executemany('''
+            UPDATE processing_state SET status = ?, updated_at = ?,
+                processed_file_path = COALESCE(?, processed_file_path),
+                error_message = COALESCE(?, error_message),
+                attempts = attempts + ?,
+                last_attempt_timestamp = CASE WHEN ? THEN ? ELSE last_attempt_timestamp END
+            WHERE file_path = ?
+            ''', [
+                (status, timestamp, processed_file_path, error_message,
+                 int(increment_attempt), increment_attempt, timestamp, file_path)
+                for file_path, status, processed_file_path, error_message, increment_attempt, timestamp in updates
+            ])
+            self.cursor.execute('RELEASE write_files_and_updates')
+            self._commit()
+            logger.info(f"Wrote {len(added)} new files and {len(updates)} status updates to the state DB")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error writing {len(added)} new files and {len(updates)} status updates: {e}")
+            # Undo whatever part of the writes was applied, so a later commit
+            # does not store it
+            try:
+                self.cursor.execute('ROLLBACK TO write_files_and_updates')
+                self.cursor.execute('RELEASE write_files_and_updates')
+            except sqlite3.Error as rollback_error:
+                logger.error(f"Error rolling back the failed writes: {rollback_error}")
+                self.conn.rollback()
+            return False
+    
     def add_file(self, file_path, stage):
         """
         Adds a file to the database with pending status if it doesn't exist.
@@ -90,15 +224,19 @@ class StateManager:
             stage (str): Processing stage (sub_prompt, star_answer, conversational)
             
         Returns:
-            int or None: ID of the added file, or None if operation failed
+            int or None: ID of the added file, or None if operation failed or
+                the write is deferred
         """
         timestamp = time.time()
+        if self._deferred is not None:
+            self._deferred[0].append((file_path, stage, timestamp))
+            return None
         try:
             self.cursor.execute('''
             INSERT OR IGNORE INTO processing_state (file_path, status, stage, created_at, updated_at)
             VALUES (?, ?, ?, ?, ?)
             ''', (file_path, STATUS_PENDING, stage, timestamp, timestamp))
-            self.conn.commit()
+            self._commit()
             if self.cursor.rowcount > 0:
                 logger.debug(f"Added new file to state DB: {file_path} (stage: {stage})")
             return self.cursor.lastrowid or self.get_file_id(file_path)
@@ -106,6 +244,24 @@ class StateManager:
             logger.error(f"Error adding file {file_path}: {e}")
             return None
     
+    def add_files(self, file_paths, stage):
+        """
+        Adds many files with pending status in one transaction, skipping existing ones.
+        
+        Args:
+            file_paths (iterable): Paths of the files to add
+            stage (str): Processing stage (sub_prompt, star_answer, conversational)
+            
+        Returns:
+            bool: True if the files were added, False otherwise
+        """
+        timestamp = time.time()
+        added = [(file_path, stage, timestamp) for file_path in file_paths]
+        if self._deferred is not None:
+            self._deferred[0].extend(added)
+            return True
+        return self._write_files_and_updates(added, [])
+    
     def get_file_status(self, file_path):
         """
         Gets the current status of a file.
@@ -154,9 +310,12 @@ class StateManager:
             increment_attempt (bool, optional): Whether to increment the attempt counter
             
         Returns:
-            bool: True if update was successful, False otherwise
+            bool: True if update was successful (or deferred), False otherwise
         """
         timestamp = time.time()
+        if self._deferred is not None:
+            self._deferred[1].append((file_path, status, processed_file_path, error_message, increment_attempt, timestamp))
+            return True
         try:
             # Build the update query dynamically based on provided parameters
             update_fields = ['status = ?', 'updated_at = ?']
@@ -180,13 +339,36 @@ class StateManager:
             params.append(file_path)
             
             self.cursor.execute(query, params)
-            self.conn.commit()
+            self._commit()
             logger.info(f"Updated status for {file_path} to {status}. Attempt incremented: {increment_attempt}")
             return True
         except sqlite3.Error as e:
             logger.error(f"Error updating status for {file_path} to {status}: {e}")
             return False
     
+    def update_status_many(self, updates, increment_attempt=True):
+        """
+        Updates the status of many files in one transaction.
+        
+        Args:
+            updates (iterable): (file_path, status, processed_file_path, error_message)
+                tuples; as with update_status, a None path or message leaves the
+                stored value unchanged
+            increment_attempt (bool, optional): Whether to increment the attempt counters
+            
+        Returns:
+            bool: True if the updates were successful, False otherwise
+        """
+        timestamp = time.time()
+        rows = [
+            (file_path, status, processed_file_path, error_message, increment_attempt, timestamp)
+            for file_path, status, processed_file_path, error_message in updates
+        ]
+        if self._deferred is not None:
+            self._deferred[1].extend(rows)
+            return True
+        return self._write_files_and_updates([], rows)
+    
     def get_pending_files(self, stage=None, limit=None):
         """
         Gets a list of files with pending status, optionally filtered by stage.
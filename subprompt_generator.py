@@ -14,7 +14,7 @@ import random
 
 # Import project modules
 # Use print instead of logger for initialization
-from prompt_processor import load_prompt_template, substitute_parameters
+from prompt_processor import load_prompt_template, substitute_parameters, load_role_skills
 from llm_client import LLMClient
 from state_manager import StateManager, STATUS_PENDING, STATUS_IN_PROGRESS, STATUS_COMPLETE, STATUS_FAILED
 
@@ -33,7 +33,6 @@ def generate_subprompt_parameters(config, role, question, industry, num_prompts=
         dict: Dictionary of parameters for the template
     """
     # Load role-specific skills
-    from prompt_processor import load_role_skills
     role_skills = load_role_skills(role, config)
     
     return {
@@ -44,29 +43,34 @@ def generate_subprompt_parameters(config, role, question, industry, num_prompts=
         "TARGET_ROLE_SKILLS": role_skills  # Add the role skills for consistent parameter naming
     }
 
-def parse_subprompt_json(json_text):
+def parse_subprompt_json(json_text, parsed=None):
     """
     Parse the JSON output from the LLM response.
     
     Args:
         json_text (str): JSON text from LLM response
+        parsed (Any, optional): The response as already decoded by the LLM client, if any
         
     Returns:
         list: List of sub-prompt dictionaries, or None if parsing failed
     """
     try:
-        # Find JSON array in the text (it might be surrounded by other text)
-        start_idx = json_text.find('[')
-        end_idx = json_text.rfind(']') + 1
-        
-        if start_idx == -1 or end_idx == 0:
-            print("No JSON array found in the response")
-            return None
+        if isinstance(parsed, list):
+            # The LLM client already decoded the array, so there is nothing to parse
+            subprompts = parsed
+        else:
+            # Find JSON array in the text (it might be surrounded by other text)
+            start_idx = json_text.find('[')
+            end_idx = json_text.rfind(']') + 1
             
-        json_array_text = json_text[start_idx:end_idx]
-        
-        # Parse the JSON array
-        subprompts = json.loads(json_array_text)
+            if start_idx == -1 or end_idx == 0:
+                print("No JSON array found in the response")
+                return None
+                
+            json_array_text = json_text[start_idx:end_idx]
+            
+            # Parse the JSON array
+            subprompts = json.loads(json_array_text)
         
         # Validate the structure
         if not isinstance(subprompts, list):
@@ -171,7 +175,7 @@ def save_subprompts(subprompts, output_dir, role_name, question_index, industry)
         print(f"Error saving sub-prompts: {e}")
         return None
 
-def generate_subprompts(config, state_manager, llm_client, args=None):
+def generate_subprompts(config, state_manager, llm_client, args=None, output_queue=None):
     """
     Generate sub-prompts for all role/question/industry combinations.
     
@@ -180,6 +184,8 @@ def generate_subprompts(config, state_manager, llm_client, args=None):
         state_manager (StateManager): State manager instance
         llm_client (LLMClient): LLM client instance
         args (argparse.Namespace, optional): Command-line arguments
+        output_queue (queue.Queue, optional): Receives a (file_id, output_file) tuple for
+            each sub-prompt file once its state is committed, so the next stage can start on it
         
     Returns:
         bool: True if all sub-prompts were generated successfully, False otherwise
@@ -331,6 +337,8 @@ def generate_subprompts(config, state_manager, llm_client, args=None):
                     status = state_manager.get_file_status(file_id)
                     if status == STATUS_COMPLETE:
                         print(f"Skipping already completed: {role_name}, Q{q_index+1}, {industry}")
+                        if output_queue is not None:
+                            output_queue.put((file_id, state_manager.get_processed_file_path(file_id)))
                         continue
                 
                 # Add to state manager with pending status
@@ -356,7 +364,8 @@ def generate_subprompts(config, state_manager, llm_client, args=None):
                         prompt=full_prompt,
                         max_tokens=config.get('step1_max_tokens', 4000),
                         temperature=0.7,
-                        json_mode=True
+                        json_mode=True,
+                        stream=True
                     )
                     
                     if not response:
@@ -366,7 +375,7 @@ def generate_subprompts(config, state_manager, llm_client, args=None):
                         continue
                     
                     # Parse the JSON response
-                    subprompts = parse_subprompt_json(response['text'])
+                    subprompts = parse_subprompt_json(response['text'], response.get('parsed'))
                     
                     if not subprompts:
                         print(f"Failed to parse sub-prompts for {file_id}")
@@ -387,6 +396,9 @@ def generate_subprompts(config, state_manager, llm_client, args=None):
                     state_manager.update_status(file_id, STATUS_COMPLETE, processed_file_path=output_file)
                     print(f"Successfully generated sub-prompts for: {role_name}, Q{q_index+1}, {industry}")
                     
+                    if output_queue is not None:
+                        output_queue.put((file_id, output_file))
+                    
                     # Add a small delay to avoid rate limiting
                     time.sleep(config.get('api_delay_seconds', 2))
                     
@@ -112,7 +112,7 @@ def main():
     success, output_file = generate_conversation(
         llm_client=llm_client,
         state_manager=state_manager,
-        template_path=template_path,
+        template=template,
         star_answer_path=str(star_answer_file),
         output_dir=conversations_dir,
         config=config
@@ -166,4 +166,6 @@ def main():
     print("=" * 80)
 
 if __name__ == "__main__":
+    from logger_setup import setup_logging
+    setup_logging(log_to_file=False)
     main()
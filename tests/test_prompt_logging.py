@@ -28,7 +28,8 @@ from prompt_processor import (
     substitute_parameters,
     generate_sub_prompt,
     generate_main_context,
-    generate_conversation_prompt
+    generate_conversation_prompt,
+    wait_for_prompt_logs
 )
 
 def test_prompt_logging():
@@ -121,7 +122,8 @@ def test_prompt_logging():
     print("\nAll prompt logging tests completed. Check the following directory for logs:")
     print(prompt_logs_dir)
     
-    # List generated log files
+    # List generated log files once the background writer has finished
+    wait_for_prompt_logs()
     log_files = list(Path(prompt_logs_dir).glob("*.txt"))
     if log_files:
         print(f"\nGenerated {len(log_files)} log files:")
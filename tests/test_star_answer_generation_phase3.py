@@ -210,4 +210,6 @@ def main():
     print("=" * 80)
 
 if __name__ == "__main__":
+    from logger_setup import setup_logging
+    setup_logging(log_to_file=False)
     main()